@@ -0,0 +1,21 @@
+import hashlib
+
+import joblib
+
+
+def file_version(path):
+    """Content hash identifying a saved model artifact."""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()[:12]
+
+
+def load_artifact(path):
+    """The saved model artifact as a dict with at least 'model' and 'label_encoders'."""
+    artifact = joblib.load(path)
+    if isinstance(artifact, tuple):
+        # Legacy artifacts are a (model, label_encoders) pair
+        artifact = {'model': artifact[0], 'label_encoders': artifact[1]}
+    return artifact
@@ -9,18 +9,345 @@ import os
 import warnings
 warnings.filterwarnings("ignore", message="LightGBM binary classifier with TreeExplainer shap values output has changed to a list of ndarray")
 import argparse
+import copy
+import hashlib
 import json
+import pickle
 import sys
+import threading
+import time
+from collections import OrderedDict
+
+from artifacts import file_version, load_artifact
+from monitoring import DriftMonitor, build_baseline
+from native_backend import load_native, native_available
+
+DEFAULT_HASH_BUCKETS = 1024
+# Validation split used for early stopping, recorded in the artifact so --evaluate can rebuild it
+VALIDATION_SIZE = 0.2
+SPLIT_SEED = 42
+
+
+def hash_encode(values, n_buckets):
+    """Map categorical values to stable bucket ids without a stored vocabulary."""
+    hashed = pd.util.hash_pandas_object(pd.Series(values).astype(str), index=False).to_numpy()
+    return (hashed % np.uint64(n_buckets)).astype(np.int64)
+
+
+class ScoreCache:
+    """Thread-safe LRU cache of scoring results with an optional TTL (seconds)."""
+
+    def __init__(self, max_size=10000, ttl=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            stored_at, value = entry
+            if self.ttl is not None and time.monotonic() - stored_at > self.ttl:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
+
+
+def transaction_fingerprint(trans_dict):
+    """Stable key for a transaction: its TransactionID, else a hash of the normalized row."""
+    if trans_dict.get('TransactionID') is not None:
+        return ('id', str(trans_dict['TransactionID']))
+    normalized = {
+        k: (None if v is None or (isinstance(v, float) and np.isnan(v)) else v)
+        for k, v in trans_dict.items()
+    }
+    payload = json.dumps(normalized, sort_keys=True, default=str)
+    return ('row', hashlib.sha1(payload.encode()).hexdigest())
+
+
+def threshold_sweep(y_true, scores, fp_cost=1.0, fn_cost=10.0):
+    """Confusion-derived metrics for every distinct threshold in one sorted cumulative pass.
+
+    Row i of the result describes flagging every transaction with score >= thresholds[i],
+    which is the same decision as score > t for any t in [thresholds[i + 1], thresholds[i]).
+    """
+    y_true = np.asarray(y_true, dtype=np.int64)
+    scores = np.asarray(scores, dtype=np.float64)
+    if len(y_true) == 0:
+        raise ValueError("threshold_sweep needs at least one scored transaction")
+    order = np.argsort(-scores, kind='mergesort')
+    scores, y_true = scores[order], y_true[order]
+    # Keep the last row of each run of equal scores so ties are flagged together
+    last = np.r_[np.flatnonzero(np.diff(scores)), len(scores) - 1]
+    tp = np.cumsum(y_true)[last]
+    fp = (last + 1) - tp
+    positives = int(y_true.sum())
+    negatives = len(y_true) - positives
+    with np.errstate(divide='ignore', invalid='ignore'):
+        precision = np.where(tp + fp > 0, tp / (tp + fp), 1.0)
+        recall = tp / positives if positives else np.zeros(len(tp))
+        fpr = fp / negatives if negatives else np.zeros(len(fp))
+    return {
+        'thresholds': scores[last],
+        'tp': tp,
+        'fp': fp,
+        'precision': precision,
+        'recall': recall,
+        'fpr': fpr,
+        'cost': fn_cost * (positives - tp) + fp_cost * fp,
+        'positives': positives,
+        'negatives': negatives,
+        'fp_cost': fp_cost,
+        'fn_cost': fn_cost,
+    }
+
+
+def evaluation_report(sweep, threshold=0.5, curve_points=101, model_version=None):
+    """Compact JSON-serialisable summary of a threshold sweep."""
+    thresholds = sweep['thresholds']
+
+    def point(i):
+        return {
+            'threshold': float(thresholds[i]),
+            'precision': float(sweep['precision'][i]),
+            'recall': float(sweep['recall'][i]),
+            'fpr': float(sweep['fpr'][i]),
+            'flagged': int(sweep['tp'][i] + sweep['fp'][i]),
+            'cost': float(sweep['cost'][i]),
+        }
+
+    fpr = np.r_[0.0, sweep['fpr']]
+    tpr = np.r_[0.0, sweep['recall']]
+    auc = float(np.sum(np.diff(fpr) * (tpr[1:] + tpr[:-1]) / 2))
+    # Transactions are flagged when score > threshold; thresholds are sorted descending,
+    # so this finds the last one still strictly above it
+    current = int(np.searchsorted(-thresholds, -threshold, side='left')) - 1
+    curve_idx = np.unique(np.linspace(0, len(thresholds) - 1, curve_points).astype(int))
+    return {
+        'model_version': model_version,
+        'n': sweep['positives'] + sweep['negatives'],
+        'positives': sweep['positives'],
+        'auc': auc,
+        'fp_cost': sweep['fp_cost'],
+        'fn_cost': sweep['fn_cost'],
+        'current_threshold': point(current) if current >= 0 else {'threshold': threshold, 'flagged': 0},
+        'min_cost': point(int(np.argmin(sweep['cost']))),
+        'curve': [point(i) for i in curve_idx],
+    }
+
+
+class ModelState:
+    """Everything scoring needs from one artifact, swapped in as a single reference."""
+
+    def __init__(self, model, encoding='label', label_encoders=None, hash_buckets=None, version=None,
+                 baseline=None, split=None):
+        self.model = model
+        self.encoding = encoding
+        self.label_encoders = label_encoders or {}
+        self.hash_buckets = hash_buckets or {}
+        self.version = version
+        self.feature_names = model.feature_name()
+        self.label_mappings = {
+            col: {cls: idx for idx, cls in enumerate(le.classes_)}
+            for col, le in self.label_encoders.items()
+        }
+        self.explainer = shap.TreeExplainer(model)
+        # Replaced by a compiled predictor when the native backend is enabled and verified
+        self.predict = model.predict
+        self.backend = 'booster'
+        self.baseline = baseline
+        self.split = split
+        # Live traffic histograms start empty for every newly activated model
+        self.monitor = DriftMonitor(baseline) if baseline else None
+        self.loaded_at = time.time()
+
 
 class FraudDetector:
-    def __init__(self, model_path=None):
+    def __init__(self, model_path=None, encoding='label', hash_buckets=DEFAULT_HASH_BUCKETS,
+                 column_buckets=None, cache_size=0, cache_ttl=None, threshold=0.5, native=False):
+        if encoding not in ('label', 'hash'):
+            raise ValueError(f"Unknown encoding: {encoding}")
         self.model = None
+        self.encoding = encoding
         self.label_encoders = {}
+        # Bucket count per categorical column for the hashing trick (hash encoding only)
+        self.hash_buckets = dict(column_buckets or {})
+        self.default_hash_buckets = hash_buckets
+        # Transactions scoring above this probability are flagged as fraud
+        self.threshold = threshold
+        self.native = native
+        self.model_version = None
+        self.model_path = model_path
+        # Optional result cache so retried/redelivered transactions are scored once
+        self.score_cache = ScoreCache(cache_size, cache_ttl) if cache_size else None
+        self._state = None
+        self._swap_lock = threading.Lock()
+        self._watcher = None
+        self._stop_watch = threading.Event()
+        self.baseline = None
+        # How the training data was split into train/validation (see holdout_frame)
+        self.split = None
+        self.reload_count = 0
+        self.last_reload_seconds = None
+        self.last_reload_error = None
         if model_path and os.path.exists(model_path):
-            self.model, self.label_encoders = joblib.load(model_path)
+            self._activate(self._load_state(model_path))
         elif model_path:
             raise FileNotFoundError(f"Model file not found: {model_path}")
 
+    def _load_state(self, model_path):
+        artifact = load_artifact(model_path)
+        state = ModelState(
+            artifact['model'],
+            encoding=artifact.get('encoding', 'label'),
+            label_encoders=artifact.get('label_encoders', {}),
+            hash_buckets=artifact.get('hash_buckets', {}),
+            version=file_version(model_path),
+            baseline=artifact.get('baseline'),
+            split=artifact.get('split'),
+        )
+        return self._attach_native(state, model_path)
+
+    def _attach_native(self, state, model_path):
+        if not self.native:
+            return state
+        if not native_available():
+            print("[WARN] treelite/tl2cgen not installed; using the LightGBM booster")
+            return state
+        try:
+            state.predict = load_native(state.model, model_path, state.version).predict
+            state.backend = 'native'
+        except Exception as e:
+            print(f"[WARN] Native predictor unavailable, using the LightGBM booster: {e}")
+        return state
+
+    def _activate(self, state):
+        # Scoring reads self._state once per call, so in-flight calls keep the old state
+        with self._swap_lock:
+            self._state = state
+            self.model = state.model
+            self.encoding = state.encoding
+            self.label_encoders = state.label_encoders
+            self.hash_buckets = state.hash_buckets
+            self.baseline = state.baseline
+            self.split = state.split
+            self.model_version = state.version
+        if self.score_cache is not None:
+            self.score_cache.clear()
+
+    def reload(self, model_path=None):
+        """Load an artifact off the scoring path and atomically swap it in."""
+        model_path = model_path or self.model_path
+        if not model_path or not os.path.exists(model_path):
+            raise FileNotFoundError(f"Model file not found: {model_path}")
+        start = time.perf_counter()
+        state = self._load_state(model_path)
+        self._activate(state)
+        self.model_path = model_path
+        self.reload_count += 1
+        self.last_reload_seconds = time.perf_counter() - start
+        self.last_reload_error = None
+        print(f"[INFO] Loaded model {state.version} from {model_path} "
+              f"in {self.last_reload_seconds:.3f}s")
+        return state.version
+
+    def watch(self, interval=5.0):
+        """Poll model_path in a background thread and reload whenever the file changes."""
+        if self._watcher is not None:
+            return
+        self._stop_watch.clear()
+
+        def file_stamp():
+            try:
+                st = os.stat(self.model_path)
+            except OSError:
+                return None
+            return (st.st_mtime_ns, st.st_size)
+
+        # Taken before the thread starts so a change made right after watch() returns is seen
+        last = file_stamp()
+
+        def poll(last=last):
+            while not self._stop_watch.wait(interval):
+                current = file_stamp()
+                if current is None or current == last:
+                    continue
+                last = current
+                try:
+                    self.reload()
+                except Exception as e:
+                    self.last_reload_error = str(e)
+                    print(f"[WARN] Model reload failed, keeping {self.model_version}: {e}")
+
+        self._watcher = threading.Thread(target=poll, name='fraud-model-watcher', daemon=True)
+        self._watcher.start()
+
+    def stop_watching(self):
+        if self._watcher is not None:
+            self._stop_watch.set()
+            self._watcher.join()
+            self._watcher = None
+
+    def model_info(self):
+        state = self._state
+        return {
+            'version': state.version if state else None,
+            'backend': state.backend if state else None,
+            'model_path': self.model_path,
+            'loaded_at': state.loaded_at if state else None,
+            'reload_count': self.reload_count,
+            'last_reload_seconds': self.last_reload_seconds,
+            'last_reload_error': self.last_reload_error,
+            'watching': self._watcher is not None,
+        }
+
+    def _artifact(self):
+        return {
+            'model': self.model,
+            'encoding': self.encoding,
+            'label_encoders': self.label_encoders,
+            'hash_buckets': self.hash_buckets,
+            'baseline': self.baseline,
+            'split': self.split,
+        }
+
     def load_data(self, path_trans, path_id):
         df_trans = pd.read_csv(path_trans)
         df_id    = pd.read_csv(path_id)
@@ -30,7 +357,17 @@ class FraudDetector:
         df = df.copy()
         df.fillna(-999, inplace=True)
         cat_cols = df.select_dtypes('object').columns
+        if self.encoding == 'hash':
+            # Scoring hashes every column listed here, so a non-categorical one
+            # would be raw at training and hashed at scoring
+            for col in sorted(set(self.hash_buckets) - set(cat_cols)):
+                print(f"[WARN] Ignoring hash bucket count for non-categorical column {col}")
+                del self.hash_buckets[col]
         for col in cat_cols:
+            if self.encoding == 'hash':
+                n_buckets = self.hash_buckets.setdefault(col, self.default_hash_buckets)
+                df[col] = hash_encode(df[col], n_buckets)
+                continue
             le = LabelEncoder()
             df[col] = le.fit_transform(df[col].astype(str))
             self.label_encoders[col] = le
@@ -44,8 +381,15 @@ class FraudDetector:
         print("[INFO] Preprocessing...")
         X, y = self.preprocess(df)
         X_train, X_val, y_train, y_val = train_test_split(
-            X, y, test_size=0.2, stratify=y, random_state=42
+            X, y, test_size=VALIDATION_SIZE, stratify=y, random_state=SPLIT_SEED
         )
+        self.split = {
+            'train_trans': train_trans_path,
+            'train_id': train_id_path,
+            'rows': len(df),
+            'test_size': VALIDATION_SIZE,
+            'random_state': SPLIT_SEED,
+        }
         print("[INFO] Training model...")
         train_data = lgb.Dataset(X_train, label=y_train)
         val_data   = lgb.Dataset(X_val,   label=y_val, reference=train_data)
@@ -71,25 +415,142 @@ class FraudDetector:
             valid_sets=[train_data, val_data],
             callbacks=callbacks
         )
-        joblib.dump((self.model, self.label_encoders), model_out_path)
+        print("[INFO] Building drift monitoring baseline...")
+        self.baseline = build_baseline(X_val, self.model.predict(X_val))
+        joblib.dump(self._artifact(), model_out_path)
+        state = ModelState(
+            self.model, self.encoding, self.label_encoders, self.hash_buckets,
+            version=file_version(model_out_path), baseline=self.baseline, split=self.split,
+        )
+        self._activate(self._attach_native(state, model_out_path))
+        self.model_path = model_out_path
         print(f"[INFO] Model + encoders saved to {model_out_path}")
+        self.report(model_out_path)
+
+    def report(self, model_path):
+        """Print the validation AUC and artifact footprint for the current encoding."""
+        val_auc = self.model.best_score.get('valid_1', {}).get('auc')
+        encoders = self.hash_buckets if self.encoding == 'hash' else self.label_encoders
+        encoder_bytes = len(pickle.dumps(encoders))
+        if val_auc is not None:
+            print(f"[INFO] Validation AUC ({self.encoding} encoding): {val_auc:.5f}")
+        print(f"[INFO] Artifact size: {os.path.getsize(model_path)} bytes "
+              f"(encoders: {encoder_bytes} bytes)")
+
+    @staticmethod
+    def _encode_categoricals(df, state):
+        if state.encoding == 'hash':
+            for col, n_buckets in state.hash_buckets.items():
+                if col in df.columns:
+                    df[col] = hash_encode(df[col], n_buckets)
+            return df
+        for col, mapping in state.label_mappings.items():
+            if col in df.columns:
+                # Encoders were fitted on string values, unseen values map to -1
+                df[col] = df[col].astype(str).map(mapping).fillna(-1).astype(int)
+        return df
+
+    def score_frame(self, df, monitor=True):
+        """Fraud probabilities for every row of a raw transaction frame, in one batch.
+
+        With monitor=True the rows also feed the drift monitor as live traffic.
+        """
+        state = self._state
+        if state is None:
+            raise ValueError("No model loaded. Train first or provide a valid model_path.")
+        df = df.copy()
+        df.fillna(-999, inplace=True)
+        df = self._encode_categoricals(df, state)
+        X = df.reindex(columns=state.feature_names, fill_value=-999)
+        scores = state.predict(X)
+        if monitor and state.monitor is not None:
+            state.monitor.update_batch(X[state.monitor.features].to_numpy(dtype=np.float64), scores)
+        return scores
+
+    def holdout_frame(self):
+        """Rebuild the validation rows held out when the current model was trained."""
+        split = self.split
+        if split is None:
+            raise ValueError("The model artifact records no training split; "
+                             "pass a labelled set with --eval-trans/--eval-id")
+        df = self.load_data(split['train_trans'], split['train_id'])
+        if len(df) != split['rows']:
+            raise ValueError(f"Training data changed since the model was trained "
+                             f"({len(df)} rows, expected {split['rows']}); the held-out split cannot be rebuilt")
+        _, val_rows = train_test_split(
+            np.arange(len(df)), test_size=split['test_size'], stratify=df['isFraud'],
+            random_state=split['random_state'],
+        )
+        return df.iloc[np.sort(val_rows)]
+
+    def evaluate(self, trans_path=None, id_path=None, fp_cost=1.0, fn_cost=10.0, curve_points=101):
+        """Score a labelled set once and sweep every decision threshold.
+
+        Without trans_path the validation split held out during training is rebuilt and used.
+        """
+        print("[INFO] Loading evaluation data...")
+        if trans_path is None:
+            df = self.holdout_frame()
+        else:
+            df = self.load_data(trans_path, id_path)
+            if 'isFraud' not in df.columns:
+                raise ValueError(f"{trans_path} has no 'isFraud' label column (the IEEE-CIS test files are "
+                                 "unlabelled); evaluate on labelled data or omit --eval-trans to use the "
+                                 "held-out training split")
+        if not len(df):
+            raise ValueError("No transactions to evaluate")
+        y = df['isFraud'].astype(int).to_numpy()
+        print(f"[INFO] Scoring {len(df)} transactions...")
+        scores = self.score_frame(df.drop(columns=['isFraud']), monitor=False)
+        sweep = threshold_sweep(y, scores, fp_cost=fp_cost, fn_cost=fn_cost)
+        return evaluation_report(sweep, self.threshold, curve_points, model_version=self.model_version)
+
+    def drift_snapshot(self, top=10):
+        """PSI/KS of live traffic against the train-time baseline, or None without one."""
+        state = self._state
+        if state is None or state.monitor is None:
+            return None
+        snapshot = state.monitor.snapshot(top=top)
+        snapshot['model_version'] = state.version
+        return snapshot
+
+    def cache_stats(self):
+        return self.score_cache.stats() if self.score_cache is not None else None
 
     def predict_and_explain(self, trans_dict, top_k=5):
-        if self.model is None:
+        state = self._state
+        if state is None:
             raise ValueError("No model loaded. Train first or provide a valid model_path.")
+        # Every scored row feeds the drift monitor, including repeats served from the cache
+        X = self._features(state, trans_dict) if state.monitor is not None else None
+        if self.score_cache is None:
+            result = self._predict_and_explain(state, trans_dict, top_k, X)
+        else:
+            key = (state.version, top_k, transaction_fingerprint(trans_dict))
+            cached = self.score_cache.get(key)
+            if cached is None:
+                cached = self._predict_and_explain(state, trans_dict, top_k, X)
+                self.score_cache.put(key, cached)
+            result = copy.deepcopy(cached)
+        if X is not None:
+            state.monitor.update(X[state.monitor.features].to_numpy(dtype=np.float64)[0],
+                                 result['fraud_probability'])
+        return result
+
+    def _features(self, state, trans_dict):
+        """One transaction encoded and aligned with the model's features."""
         df = pd.DataFrame([trans_dict])
         df.fillna(-999, inplace=True)
-        for col, le in self.label_encoders.items():
-            if col in df.columns:
-                mapping = {cls: idx for idx, cls in enumerate(le.classes_)}
-                df[col] = df[col].map(lambda x: mapping.get(x, -1)).astype(int)
-        feature_names = self.model.feature_name()
-        aligned = {feat: df.get(feat, -999) for feat in feature_names}
-        X = pd.DataFrame(aligned)
-        proba = float(self.model.predict(X)[0])
-        is_fraud = int(proba > 0.5)
-        explainer = shap.TreeExplainer(self.model)
-        raw_shap = explainer.shap_values(X)
+        df = self._encode_categoricals(df, state)
+        return pd.DataFrame({feat: df.get(feat, -999) for feat in state.feature_names})
+
+    def _predict_and_explain(self, state, trans_dict, top_k, X=None):
+        if X is None:
+            X = self._features(state, trans_dict)
+        feature_names = state.feature_names
+        proba = float(state.predict(X)[0])
+        is_fraud = int(proba > self.threshold)
+        raw_shap = state.explainer.shap_values(X)
         if isinstance(raw_shap, list) and len(raw_shap) > 1:
             shap_vals = raw_shap[1]
         else:
@@ -108,16 +569,60 @@ def main():
     parser.add_argument('--model', default='fraud_detector.pkl')
     parser.add_argument('--train-trans', default='train_transaction.csv')
     parser.add_argument('--train-id', default='train_identity.csv')
+    parser.add_argument('--encoding', choices=['label', 'hash'], default='label',
+                        help='Categorical encoding used when training')
+    parser.add_argument('--hash-buckets', type=int, default=DEFAULT_HASH_BUCKETS,
+                        help='Default bucket count per column for --encoding hash')
+    parser.add_argument('--hash-bucket', action='append', default=[], metavar='COL=N',
+                        help='Override the bucket count for one column (repeatable)')
+    parser.add_argument('--native', action='store_true',
+                        help='Score with a compiled native predictor (requires treelite, tl2cgen)')
+    parser.add_argument('--threshold', type=float, default=0.5,
+                        help='Fraud probability above which a transaction is flagged')
+    parser.add_argument('--evaluate', action='store_true',
+                        help='Score a labelled held-out set and write a threshold report')
+    parser.add_argument('--eval-trans', default=None,
+                        help='Labelled transactions to evaluate (default: the validation split held out '
+                             'when the model was trained)')
+    parser.add_argument('--eval-id', default=None,
+                        help='Identity file matching --eval-trans')
+    parser.add_argument('--report', default='evaluation_report.json')
+    parser.add_argument('--fp-cost', type=float, default=1.0,
+                        help='Cost of flagging a legitimate transaction')
+    parser.add_argument('--fn-cost', type=float, default=10.0,
+                        help='Cost of missing a fraudulent transaction')
     args, _ = parser.parse_known_args()
+    if (args.eval_trans is None) != (args.eval_id is None):
+        parser.error('--eval-trans and --eval-id must be given together')
+    column_buckets = {}
+    for spec in args.hash_bucket:
+        col, n = spec.split('=', 1)
+        column_buckets[col] = int(n)
+
+    def new_detector():
+        return FraudDetector(encoding=args.encoding, hash_buckets=args.hash_buckets,
+                             column_buckets=column_buckets)
+
     if args.train:
-        FraudDetector().train(args.train_trans, args.train_id, args.model)
+        new_detector().train(args.train_trans, args.train_id, args.model)
         return
     try:
-        fd = FraudDetector(model_path=args.model)
+        fd = FraudDetector(model_path=args.model, threshold=args.threshold, native=args.native)
     except FileNotFoundError:
         print(f"[WARN] Model not found; training...")
-        FraudDetector().train(args.train_trans, args.train_id, args.model)
-        fd = FraudDetector(model_path=args.model)
+        new_detector().train(args.train_trans, args.train_id, args.model)
+        fd = FraudDetector(model_path=args.model, threshold=args.threshold, native=args.native)
+
+    if args.evaluate:
+        report = fd.evaluate(args.eval_trans, args.eval_id, args.fp_cost, args.fn_cost)
+        with open(args.report, 'w') as f:
+            json.dump(report, f, indent=2)
+        best = report['min_cost']
+        print(f"[INFO] AUC: {report['auc']:.5f}")
+        print(f"[INFO] Min-cost threshold {best['threshold']:.4f}: precision {best['precision']:.3f}, "
+              f"recall {best['recall']:.3f}, FPR {best['fpr']:.4f}")
+        print(f"[INFO] Report written to {args.report}")
+        return
 
     input_data = sys.stdin.read().strip()
     if not input_data:
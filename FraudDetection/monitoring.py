@@ -0,0 +1,151 @@
+import threading
+
+import numpy as np
+
+DEFAULT_FEATURE_BINS = 10
+DEFAULT_SCORE_BINS = 20
+# Common PSI rules of thumb: < 0.1 stable, 0.1-0.25 moderate shift, > 0.25 major shift
+PSI_MODERATE = 0.1
+PSI_MAJOR = 0.25
+
+
+def build_baseline(X, scores, bins=DEFAULT_FEATURE_BINS, score_bins=DEFAULT_SCORE_BINS):
+    """Fixed-bin reference histograms for every feature and for the model score.
+
+    Feature bin edges are training quantiles, so each baseline bin holds a similar
+    share of rows; the score uses equal-width bins over [0, 1].
+    """
+    features = list(X.columns)
+    values = X.to_numpy(dtype=np.float64)
+    quantiles = np.linspace(0, 1, bins + 1)[1:-1]
+    edges = np.nanquantile(values, quantiles, axis=0).T
+    counts = np.stack([
+        np.bincount(np.searchsorted(edges[j], values[:, j], side='right'), minlength=bins)
+        for j in range(len(features))
+    ])
+    score_edges = np.linspace(0, 1, score_bins + 1)[1:-1]
+    score_counts = np.bincount(
+        np.searchsorted(score_edges, np.asarray(scores), side='right'), minlength=score_bins
+    )
+    return {
+        'features': features,
+        'edges': edges.tolist(),
+        'counts': counts.tolist(),
+        'score_edges': score_edges.tolist(),
+        'score_counts': score_counts.tolist(),
+    }
+
+
+def psi(expected, actual, eps=1e-4):
+    """Population stability index between histogram count arrays (last axis = bins)."""
+    e = np.asarray(expected, dtype=np.float64)
+    a = np.asarray(actual, dtype=np.float64)
+    e = np.clip(e / np.maximum(e.sum(axis=-1, keepdims=True), 1), eps, None)
+    a = np.clip(a / np.maximum(a.sum(axis=-1, keepdims=True), 1), eps, None)
+    return np.sum((a - e) * np.log(a / e), axis=-1)
+
+
+def ks(expected, actual):
+    """Kolmogorov-Smirnov distance between binned distributions (last axis = bins)."""
+    e = np.cumsum(expected, axis=-1, dtype=np.float64)
+    a = np.cumsum(actual, axis=-1, dtype=np.float64)
+    e /= np.maximum(e[..., -1:], 1)
+    a /= np.maximum(a[..., -1:], 1)
+    return np.max(np.abs(a - e), axis=-1)
+
+
+class DriftMonitor:
+    """Constant-memory live histograms compared against a train-time baseline.
+
+    Each update adds one row to a (features x bins) count matrix, so memory is fixed
+    no matter how much traffic is scored.
+    """
+
+    def __init__(self, baseline):
+        self.features = baseline['features']
+        self.edges = np.asarray(baseline['edges'], dtype=np.float64)
+        self.baseline_counts = np.asarray(baseline['counts'], dtype=np.int64)
+        self.score_edges = np.asarray(baseline['score_edges'], dtype=np.float64)
+        self.baseline_score_counts = np.asarray(baseline['score_counts'], dtype=np.int64)
+        self.counts = np.zeros_like(self.baseline_counts)
+        self.score_counts = np.zeros_like(self.baseline_score_counts)
+        self.n = 0
+        self._rows = np.arange(len(self.features))
+        self._lock = threading.Lock()
+
+    def update(self, row, score):
+        """Record one scored row; row is aligned with self.features."""
+        x = np.asarray(row, dtype=np.float64)
+        # Equivalent to a per-feature searchsorted(side='right'); NaN lands in the last bin
+        bins = (self.edges <= x[:, None]).sum(axis=1)
+        bins[np.isnan(x)] = self.edges.shape[1]
+        score_bin = int(np.searchsorted(self.score_edges, score, side='right'))
+        with self._lock:
+            self.counts[self._rows, bins] += 1
+            self.score_counts[score_bin] += 1
+            self.n += 1
+
+    def update_batch(self, X, scores):
+        """Record many scored rows at once; X columns are aligned with self.features."""
+        X = np.asarray(X, dtype=np.float64)
+        if not len(X):
+            return
+        n_bins = self.edges.shape[1] + 1
+        # searchsorted places NaN after every edge, i.e. in the last bin, as update does
+        counts = np.stack([
+            np.bincount(np.searchsorted(self.edges[j], X[:, j], side='right'), minlength=n_bins)
+            for j in range(len(self.features))
+        ])
+        score_counts = np.bincount(
+            np.searchsorted(self.score_edges, np.asarray(scores, dtype=np.float64), side='right'),
+            minlength=len(self.score_counts),
+        )
+        with self._lock:
+            self.counts += counts
+            self.score_counts += score_counts
+            self.n += len(X)
+
+    def reset(self):
+        with self._lock:
+            self.counts[:] = 0
+            self.score_counts[:] = 0
+            self.n = 0
+
+    def snapshot(self, top=10):
+        """JSON-serialisable PSI/KS summary for the score and the most drifted features."""
+        with self._lock:
+            counts = self.counts.copy()
+            score_counts = self.score_counts.copy()
+            n = self.n
+        feature_psi = psi(self.baseline_counts, counts)
+        feature_ks = ks(self.baseline_counts, counts)
+        order = np.argsort(-feature_psi)[:top]
+        score_psi = float(psi(self.baseline_score_counts, score_counts))
+        return {
+            'n': n,
+            'score': {
+                'psi': score_psi,
+                'ks': float(ks(self.baseline_score_counts, score_counts)),
+                'status': drift_status(score_psi) if n else 'no_data',
+                'histogram': score_counts.tolist(),
+            },
+            'features_moderate': int(np.sum(feature_psi >= PSI_MODERATE)) if n else 0,
+            'features_major': int(np.sum(feature_psi >= PSI_MAJOR)) if n else 0,
+            'top_features': [
+                {
+                    'feature': self.features[i],
+                    'psi': float(feature_psi[i]),
+                    'ks': float(feature_ks[i]),
+                    'status': drift_status(feature_psi[i]),
+                }
+                for i in order
+            ] if n else [],
+        }
+
+
+def drift_status(value):
+    if value >= PSI_MAJOR:
+        return 'major'
+    if value >= PSI_MODERATE:
+        return 'moderate'
+    return 'stable'
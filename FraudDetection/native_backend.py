@@ -0,0 +1,144 @@
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+from artifacts import file_version, load_artifact
+
+try:
+    import treelite
+    import tl2cgen
+except ImportError:
+    treelite = None
+    tl2cgen = None
+
+if sys.platform == 'win32':
+    LIB_EXT = '.dll'
+elif sys.platform == 'darwin':
+    LIB_EXT = '.dylib'
+else:
+    LIB_EXT = '.so'
+
+
+def native_available():
+    return treelite is not None and tl2cgen is not None
+
+
+def native_lib_path(model_path, version):
+    """Compiled libraries are keyed by model version so a stale one is never loaded."""
+    return f"{os.path.splitext(model_path)[0]}.{version}{LIB_EXT}"
+
+
+def compile_native(booster, libpath, toolchain='gcc', nthread=None):
+    """Compile a LightGBM booster into a native shared library with the system compiler."""
+    model = treelite.frontend.from_lightgbm(booster)
+    tl2cgen.export_lib(
+        model,
+        toolchain=toolchain,
+        libpath=libpath,
+        params={'parallel_comp': os.cpu_count() or 1},
+        nthread=nthread,
+    )
+    return libpath
+
+
+class NativePredictor:
+    """Drop-in replacement for Booster.predict backed by a compiled tree library."""
+
+    def __init__(self, libpath, nthread=1):
+        self.libpath = libpath
+        self._predictor = tl2cgen.Predictor(libpath, nthread=nthread)
+
+    def predict(self, X):
+        values = np.ascontiguousarray(np.asarray(X, dtype=np.float64))
+        return self._predictor.predict(tl2cgen.DMatrix(values)).reshape(len(values))
+
+
+def verification_rows(booster, n_rows=512, seed=0):
+    """Rows placed just either side of the booster's split thresholds, plus missing values.
+
+    Sampling around real thresholds exercises both branches of most splits, which is
+    where a compiled model would disagree with the booster if anything went wrong.
+    """
+    rng = np.random.default_rng(seed)
+    feature_names = booster.feature_name()
+    splits = booster.trees_to_dataframe()
+    splits = splits[splits['split_feature'].notna()]
+    thresholds = splits.groupby('split_feature')['threshold'].apply(lambda s: s.to_numpy())
+    rows = np.full((n_rows, len(feature_names)), -999.0)
+    for j, name in enumerate(feature_names):
+        values = thresholds.get(name)
+        if values is None or not len(values):
+            continue
+        picked = rng.choice(values.astype(np.float64), size=n_rows)
+        rows[:, j] = picked + rng.choice([-1e-3, 1e-3], size=n_rows) * np.maximum(np.abs(picked), 1)
+    rows[rng.random(rows.shape) < 0.05] = np.nan
+    return rows
+
+
+def verify_native(booster, predictor, rows=None, atol=1e-6):
+    """Return the max absolute difference between booster and native predictions."""
+    if rows is None:
+        rows = verification_rows(booster)
+    diff = np.abs(booster.predict(rows) - predictor.predict(rows))
+    max_diff = float(diff.max()) if len(diff) else 0.0
+    if max_diff > atol:
+        raise ValueError(f"Native predictions differ from the booster by up to {max_diff:.3g}")
+    return max_diff
+
+
+def load_native(booster, model_path, version, toolchain='gcc'):
+    """Compile (once per model version), load and verify a native predictor."""
+    libpath = native_lib_path(model_path, version)
+    if not os.path.exists(libpath):
+        start = time.perf_counter()
+        compile_native(booster, libpath, toolchain=toolchain)
+        print(f"[INFO] Compiled native predictor {libpath} in {time.perf_counter() - start:.1f}s")
+    predictor = NativePredictor(libpath)
+    max_diff = verify_native(booster, predictor)
+    print(f"[INFO] Native predictor verified (max abs diff {max_diff:.2e})")
+    return predictor
+
+
+def _time_per_call(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def benchmark(booster, predictor, single_repeat=2000, batch_rows=10000, batch_repeat=5):
+    """Single-row and batch latency of the booster against the native predictor."""
+    rows = verification_rows(booster, n_rows=batch_rows)
+    single = rows[:1]
+    results = {}
+    for name, predict in (('booster', booster.predict), ('native', predictor.predict)):
+        predict(single)
+        results[name] = {
+            'single_row_us': _time_per_call(lambda: predict(single), single_repeat) * 1e6,
+            'batch_ms': _time_per_call(lambda: predict(rows), batch_repeat) * 1e3,
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compile, verify and benchmark the native predictor')
+    parser.add_argument('--model', default='fraud_detector.pkl')
+    parser.add_argument('--toolchain', default='gcc')
+    parser.add_argument('--batch-rows', type=int, default=10000)
+    args = parser.parse_args()
+    if not native_available():
+        print("[ERROR] treelite and tl2cgen are required: pip install treelite tl2cgen")
+        sys.exit(1)
+    booster = load_artifact(args.model)['model']
+    predictor = load_native(booster, args.model, file_version(args.model), toolchain=args.toolchain)
+    results = benchmark(booster, predictor, batch_rows=args.batch_rows)
+    print(f"{'backend':<10}{'single row (us)':>18}{f'batch {args.batch_rows} (ms)':>22}")
+    for name, r in results.items():
+        print(f"{name:<10}{r['single_row_us']:>18.1f}{r['batch_ms']:>22.2f}")
+
+
+if __name__ == '__main__':
+    main()
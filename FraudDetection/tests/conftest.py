@@ -0,0 +1,53 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from main import FraudDetector
+
+
+def synthetic_frames(n=2000, seed=0):
+    """Small transaction and identity frames with the IEEE-CIS layout and a learnable label."""
+    rng = np.random.default_rng(seed)
+    amount = rng.exponential(100, n)
+    card = rng.choice(['visa', 'mastercard', 'amex', 'discover'], n)
+    label = ((amount > 200) & (rng.random(n) < 0.7)) | (rng.random(n) < 0.03)
+    transactions = pd.DataFrame({
+        'TransactionID': np.arange(n),
+        'isFraud': label.astype(int),
+        'TransactionAmt': amount,
+        'card4': card,
+        'dist1': np.where(rng.random(n) < 0.2, np.nan, rng.normal(50, 20, n)),
+    })
+    identity = pd.DataFrame({
+        'TransactionID': np.arange(0, n, 2),
+        'DeviceType': rng.choice(['mobile', 'desktop'], n // 2),
+    })
+    return transactions, identity
+
+
+@pytest.fixture(scope='session')
+def data_paths(tmp_path_factory):
+    root = tmp_path_factory.mktemp('data')
+    transactions, identity = synthetic_frames()
+    paths = (str(root / 'train_transaction.csv'), str(root / 'train_identity.csv'))
+    transactions.to_csv(paths[0], index=False)
+    identity.to_csv(paths[1], index=False)
+    return paths
+
+
+@pytest.fixture(scope='session')
+def model_path(data_paths, tmp_path_factory):
+    path = str(tmp_path_factory.mktemp('model') / 'fraud_detector.pkl')
+    FraudDetector().train(*data_paths, model_out_path=path)
+    return path
+
+
+@pytest.fixture
+def transaction():
+    return {'TransactionID': 7, 'TransactionAmt': 321.5, 'card4': 'visa', 'dist1': None, 'DeviceType': 'mobile'}
@@ -0,0 +1,60 @@
+import os
+import subprocess
+import sys
+
+import numpy as np
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from main import FraudDetector, hash_encode
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+
+
+def test_hash_encode_is_stable_across_runs():
+    values = ['visa', 'mastercard', 'amex', 'W', 'mobile', '-999']
+    script = (
+        "import sys; sys.path.insert(0, '.'); from main import hash_encode; "
+        f"print(list(hash_encode({values!r}, 1024)))"
+    )
+    outputs = {
+        subprocess.run([sys.executable, '-c', script], cwd=ROOT, capture_output=True, text=True, check=True,
+                       env={**os.environ, 'PYTHONHASHSEED': seed}).stdout
+        for seed in ('0', '1', '12345')
+    }
+    assert len(outputs) == 1
+    assert outputs.pop().strip() == str(list(hash_encode(values, 1024)))
+
+
+def test_hash_encode_keeps_every_value_in_range():
+    values = [f'value-{i}' for i in range(5000)] + [None, 3.5, -999]
+    for n_buckets in (1, 7, 1024):
+        codes = hash_encode(values, n_buckets)
+        assert codes.dtype == np.int64
+        assert codes.min() >= 0 and codes.max() < n_buckets
+
+
+def test_hash_encoded_model_scores_unseen_categories(data_paths, tmp_path):
+    path = str(tmp_path / 'hashed.pkl')
+    FraudDetector(encoding='hash', hash_buckets=64, column_buckets={'card4': 8}).train(*data_paths, path)
+
+    fd = FraudDetector(model_path=path)
+    assert fd.encoding == 'hash'
+    assert fd.hash_buckets == {'card4': 8, 'DeviceType': 64}
+    result = fd.predict_and_explain({'TransactionAmt': 50.0, 'card4': 'never-seen-card', 'DeviceType': 'tv'})
+    assert 0.0 <= result['fraud_probability'] <= 1.0
+
+
+def test_hash_buckets_only_apply_to_categorical_columns(data_paths, tmp_path):
+    path = str(tmp_path / 'hashed.pkl')
+    trained = FraudDetector(encoding='hash', hash_buckets=64, column_buckets={'card4': 8, 'TransactionAmt': 16})
+    trained.train(*data_paths, path)
+    assert 'TransactionAmt' not in trained.hash_buckets
+
+    fd = FraudDetector(model_path=path)
+    assert fd.hash_buckets == {'card4': 8, 'DeviceType': 64}
+    # The numeric column reaches the model raw, as it did in training
+    low = fd.predict_and_explain({'TransactionAmt': 5.0, 'card4': 'visa'})
+    high = fd.predict_and_explain({'TransactionAmt': 5000.0, 'card4': 'visa'})
+    assert low['fraud_probability'] != high['fraud_probability']
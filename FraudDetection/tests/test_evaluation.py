@@ -0,0 +1,79 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from conftest import synthetic_frames
+from main import FraudDetector, evaluation_report, threshold_sweep
+
+
+def brute_force(y_true, scores, threshold, fp_cost, fn_cost):
+    flagged = scores >= threshold
+    tp = int(np.sum(flagged & (y_true == 1)))
+    fp = int(np.sum(flagged & (y_true == 0)))
+    fn = int(np.sum(~flagged & (y_true == 1)))
+    return tp, fp, fn_cost * fn + fp_cost * fp
+
+
+def test_sweep_matches_per_threshold_confusion_matrix():
+    rng = np.random.default_rng(3)
+    y_true = rng.integers(0, 2, 500)
+    # Rounded scores give many ties
+    scores = np.round(rng.random(500), 2)
+    sweep = threshold_sweep(y_true, scores, fp_cost=1.0, fn_cost=7.0)
+
+    assert list(sweep['thresholds']) == sorted(set(scores), reverse=True)
+    for i, threshold in enumerate(sweep['thresholds']):
+        tp, fp, cost = brute_force(y_true, scores, threshold, 1.0, 7.0)
+        assert (sweep['tp'][i], sweep['fp'][i]) == (tp, fp)
+        assert sweep['cost'][i] == pytest.approx(cost)
+        assert sweep['recall'][i] == pytest.approx(tp / y_true.sum())
+        assert sweep['fpr'][i] == pytest.approx(fp / (len(y_true) - y_true.sum()))
+
+
+def test_sweep_flags_tied_scores_together():
+    sweep = threshold_sweep([1, 0, 1, 0], [0.8, 0.8, 0.5, 0.5])
+    assert list(sweep['thresholds']) == [0.8, 0.5]
+    assert list(sweep['tp']) == [1, 2] and list(sweep['fp']) == [1, 2]
+
+
+def test_sweep_rejects_empty_input():
+    with pytest.raises(ValueError):
+        threshold_sweep([], [])
+
+
+def test_report_uses_the_strict_decision_boundary():
+    sweep = threshold_sweep([1, 1, 0, 0], [0.9, 0.5, 0.5, 0.1])
+    # proba > 0.5 flags only the 0.9 transaction
+    assert evaluation_report(sweep, threshold=0.5)['current_threshold']['flagged'] == 1
+    assert evaluation_report(sweep, threshold=0.49)['current_threshold']['flagged'] == 3
+    assert evaluation_report(sweep, threshold=0.95)['current_threshold']['flagged'] == 0
+    perfect = evaluation_report(threshold_sweep([1, 1, 0, 0], [0.9, 0.8, 0.2, 0.1]))
+    assert perfect['auc'] == pytest.approx(1.0)
+
+
+def test_predictions_follow_the_strict_boundary(model_path, transaction):
+    proba = FraudDetector(model_path=model_path).predict_and_explain(transaction)['fraud_probability']
+    assert FraudDetector(model_path=model_path, threshold=proba).predict_and_explain(transaction)['is_fraud'] == 0
+    assert FraudDetector(model_path=model_path, threshold=proba - 1e-9).predict_and_explain(transaction)['is_fraud'] == 1
+
+
+def test_default_evaluation_rebuilds_the_training_holdout(model_path):
+    fd = FraudDetector(model_path=model_path)
+    report = fd.evaluate()
+    assert report == fd.evaluate()
+    assert report['n'] == round(len(synthetic_frames()[0]) * fd.split['test_size'])
+    assert report['auc'] == pytest.approx(fd.model.best_score['valid_1']['auc'])
+
+
+def test_unlabelled_evaluation_data_is_rejected(model_path, tmp_path):
+    transactions, identity = synthetic_frames(n=50)
+    transactions.drop(columns=['isFraud']).to_csv(tmp_path / 'test_transaction.csv', index=False)
+    identity.to_csv(tmp_path / 'test_identity.csv', index=False)
+    fd = FraudDetector(model_path=model_path)
+    with pytest.raises(ValueError, match='isFraud'):
+        fd.evaluate(str(tmp_path / 'test_transaction.csv'), str(tmp_path / 'test_identity.csv'))
@@ -0,0 +1,76 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from main import FraudDetector
+from monitoring import DriftMonitor, build_baseline, ks, psi
+
+
+def histogram(sample, edges):
+    return np.bincount(np.searchsorted(edges, sample, side='right'), minlength=len(edges) + 1)
+
+
+def test_psi_and_ks_are_zero_on_identical_samples():
+    rng = np.random.default_rng(0)
+    edges = np.linspace(-2, 2, 9)
+    counts = histogram(rng.normal(size=10000), edges)
+    assert psi(counts, counts) == pytest.approx(0.0, abs=1e-12)
+    assert ks(counts, counts) == pytest.approx(0.0, abs=1e-12)
+    # Same distribution, different sample size
+    assert psi(counts, counts * 3) == pytest.approx(0.0, abs=1e-12)
+
+
+def test_psi_and_ks_grow_with_the_shift():
+    rng = np.random.default_rng(0)
+    edges = np.linspace(-2, 2, 9)
+    expected = histogram(rng.normal(size=10000), edges)
+    same = histogram(rng.normal(size=10000), edges)
+    shifted = histogram(rng.normal(1.5, 1, 10000), edges)
+    assert psi(expected, same) < 0.01 and ks(expected, same) < 0.03
+    assert psi(expected, shifted) > 1.0 and ks(expected, shifted) > 0.5
+    # Works row-wise on (features x bins) matrices
+    assert psi(np.stack([expected, expected]), np.stack([same, shifted])).shape == (2,)
+
+
+def test_monitor_flags_shifted_features_only():
+    rng = np.random.default_rng(1)
+    X = pd.DataFrame({'stable': rng.normal(size=5000), 'moved': rng.normal(size=5000)})
+    monitor = DriftMonitor(build_baseline(X, rng.random(5000)))
+    live = np.column_stack([rng.normal(size=2000), rng.normal(2, 1, 2000)])
+    monitor.update_batch(live, rng.random(2000))
+    snapshot = monitor.snapshot()
+    assert snapshot['n'] == 2000
+    by_feature = {f['feature']: f for f in snapshot['top_features']}
+    assert by_feature['moved']['status'] == 'major'
+    assert by_feature['stable']['status'] == 'stable'
+    assert snapshot['score']['status'] == 'stable'
+
+
+def test_batch_update_matches_row_updates():
+    rng = np.random.default_rng(2)
+    X = pd.DataFrame({'a': rng.normal(size=1000), 'b': rng.exponential(size=1000)})
+    baseline = build_baseline(X, rng.random(1000))
+    rows, scores = rng.normal(size=(200, 2)), rng.random(200)
+    rows[::7, 1] = np.nan
+    single, batch = DriftMonitor(baseline), DriftMonitor(baseline)
+    for row, score in zip(rows, scores):
+        single.update(row, score)
+    batch.update_batch(rows, scores)
+    assert np.array_equal(single.counts, batch.counts)
+    assert np.array_equal(single.score_counts, batch.score_counts)
+
+
+def test_cached_repeats_are_recorded(model_path, transaction):
+    fd = FraudDetector(model_path=model_path, cache_size=8)
+    for _ in range(5):
+        fd.predict_and_explain(transaction)
+    assert fd.cache_stats()['hits'] == 4
+    snapshot = fd.drift_snapshot()
+    assert snapshot['n'] == 5
+    assert sum(snapshot['score']['histogram']) == 5
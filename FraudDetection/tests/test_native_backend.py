@@ -0,0 +1,59 @@
+import os
+import shutil
+import sys
+
+import numpy as np
+import pytest
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import main
+import native_backend
+from main import FraudDetector
+
+
+def test_falls_back_to_booster_without_treelite(model_path, transaction, monkeypatch):
+    monkeypatch.setattr(native_backend, 'treelite', None)
+    monkeypatch.setattr(native_backend, 'tl2cgen', None)
+    assert not native_backend.native_available()
+    fd = FraudDetector(model_path=model_path, native=True)
+    assert fd.model_info()['backend'] == 'booster'
+    expected = FraudDetector(model_path=model_path).predict_and_explain(transaction)
+    assert fd.predict_and_explain(transaction) == expected
+
+
+def test_falls_back_to_booster_when_native_build_fails(model_path, monkeypatch):
+    monkeypatch.setattr(main, 'native_available', lambda: True)
+
+    def broken(*args, **kwargs):
+        raise RuntimeError('no compiler')
+
+    monkeypatch.setattr(main, 'load_native', broken)
+    fd = FraudDetector(model_path=model_path, native=True)
+    assert fd.model_info()['backend'] == 'booster'
+    assert fd._state.predict == fd.model.predict
+
+
+def test_verify_native_rejects_a_mismatching_predictor(model_path):
+    booster = FraudDetector(model_path=model_path).model
+
+    class Skewed:
+        def predict(self, X):
+            return booster.predict(X) + 1e-3
+
+    rows = native_backend.verification_rows(booster, n_rows=64)
+    assert native_backend.verify_native(booster, booster, rows) == 0.0
+    with pytest.raises(ValueError):
+        native_backend.verify_native(booster, Skewed(), rows)
+
+
+@pytest.mark.skipif(not native_backend.native_available() or shutil.which('gcc') is None,
+                    reason='treelite/tl2cgen or gcc not installed')
+def test_native_predictor_matches_booster(model_path, tmp_path):
+    live = str(tmp_path / 'model.pkl')
+    shutil.copy(model_path, live)
+    fd = FraudDetector(model_path=live, native=True)
+    assert fd.model_info()['backend'] == 'native'
+    rows = native_backend.verification_rows(fd.model, n_rows=256, seed=1)
+    np.testing.assert_allclose(fd._state.predict(rows), fd.model.predict(rows), atol=1e-6)
@@ -0,0 +1,103 @@
+import os
+import shutil
+import sys
+import threading
+import time
+
+import pytest
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from conftest import synthetic_frames
+from main import FraudDetector
+
+
+@pytest.fixture(scope='module')
+def other_model_path(tmp_path_factory):
+    root = tmp_path_factory.mktemp('other')
+    transactions, identity = synthetic_frames(seed=1)
+    transactions.to_csv(root / 't.csv', index=False)
+    identity.to_csv(root / 'i.csv', index=False)
+    path = str(root / 'other.pkl')
+    FraudDetector().train(str(root / 't.csv'), str(root / 'i.csv'), path)
+    return path
+
+
+def test_reload_swaps_model_and_clears_cache(model_path, other_model_path, transaction, tmp_path):
+    live = str(tmp_path / 'live.pkl')
+    shutil.copy(model_path, live)
+    fd = FraudDetector(model_path=live, cache_size=8)
+    old_version, old_state = fd.model_version, fd._state
+    fd.predict_and_explain(transaction)
+
+    shutil.copy(other_model_path, live)
+    new_version = fd.reload()
+    assert new_version != old_version and fd.model_version == new_version
+    assert fd._state is not old_state and fd.model is fd._state.model
+    assert fd.cache_stats()['size'] == 0
+    expected = FraudDetector(model_path=other_model_path).predict_and_explain(transaction)
+    assert fd.predict_and_explain(transaction)['fraud_probability'] == expected['fraud_probability']
+    assert fd.model_info()['reload_count'] == 1
+
+
+def test_scoring_during_reloads_sees_one_whole_model(model_path, other_model_path, transaction):
+    expected = {
+        FraudDetector(model_path=path).predict_and_explain(transaction)['fraud_probability']
+        for path in (model_path, other_model_path)
+    }
+    fd = FraudDetector(model_path=model_path)
+    seen, errors, stop = set(), [], threading.Event()
+
+    def score():
+        while not stop.is_set():
+            try:
+                seen.add(fd.predict_and_explain(transaction)['fraud_probability'])
+            except Exception as e:
+                errors.append(e)
+
+    workers = [threading.Thread(target=score) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    for i in range(6):
+        fd.reload(other_model_path if i % 2 == 0 else model_path)
+    stop.set()
+    for worker in workers:
+        worker.join()
+    assert not errors
+    assert seen <= expected
+
+
+def test_bad_artifact_keeps_the_old_model(model_path, transaction, tmp_path):
+    live = str(tmp_path / 'live.pkl')
+    shutil.copy(model_path, live)
+    fd = FraudDetector(model_path=live)
+    version = fd.model_version
+    before = fd.predict_and_explain(transaction)
+
+    with open(live, 'wb') as f:
+        f.write(b'not a model')
+    with pytest.raises(Exception):
+        fd.reload()
+    assert fd.model_version == version
+    assert fd.predict_and_explain(transaction) == before
+
+
+def test_watcher_reports_failed_reloads(model_path, transaction, tmp_path):
+    live = str(tmp_path / 'live.pkl')
+    shutil.copy(model_path, live)
+    fd = FraudDetector(model_path=live)
+    version = fd.model_version
+    fd.watch(interval=0.05)
+    try:
+        with open(live, 'wb') as f:
+            f.write(b'corrupt artifact')
+        deadline = time.time() + 5
+        while fd.last_reload_error is None and time.time() < deadline:
+            time.sleep(0.05)
+    finally:
+        fd.stop_watching()
+    assert fd.last_reload_error is not None
+    assert fd.model_version == version
+    assert fd.model_info()['watching'] is False
+    fd.predict_and_explain(transaction)
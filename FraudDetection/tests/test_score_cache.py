@@ -0,0 +1,48 @@
+import os
+import sys
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import main
+from main import FraudDetector, ScoreCache, transaction_fingerprint
+
+
+def test_lru_evicts_least_recently_used():
+    cache = ScoreCache(max_size=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1
+    cache.put('c', 3)
+    assert cache.get('b') is None
+    assert cache.get('a') == 1 and cache.get('c') == 3
+    stats = cache.stats()
+    assert (stats['size'], stats['evictions'], stats['hits'], stats['misses']) == (2, 1, 3, 1)
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(main.time, 'monotonic', lambda: now[0])
+    cache = ScoreCache(max_size=10, ttl=5)
+    cache.put('a', 1)
+    now[0] += 5
+    assert cache.get('a') == 1
+    now[0] += 0.1
+    assert cache.get('a') is None
+    assert cache.stats()['expirations'] == 1 and cache.stats()['size'] == 0
+
+
+def test_fingerprint_ignores_key_order_and_nan():
+    a = {'TransactionAmt': 10.0, 'card4': 'visa', 'dist1': float('nan')}
+    b = {'dist1': None, 'card4': 'visa', 'TransactionAmt': 10.0}
+    assert transaction_fingerprint(a) == transaction_fingerprint(b)
+    assert transaction_fingerprint({'TransactionID': 5, 'x': 1}) == transaction_fingerprint({'TransactionID': 5})
+
+
+def test_detector_serves_repeats_from_cache(model_path, transaction):
+    fd = FraudDetector(model_path=model_path, cache_size=8)
+    first = fd.predict_and_explain(transaction)
+    first['explanation'].clear()
+    second = fd.predict_and_explain(transaction)
+    assert second == FraudDetector(model_path=model_path).predict_and_explain(transaction)
+    assert fd.cache_stats()['hits'] == 1
@@ -52,15 +52,27 @@ except ImportError as e:
 except Exception as e:
     print(f"❌ Error initializing CrewAI service: {e}")
 
-# Try to initialize MCP Product Tool
+# Try to initialize the full-text Product Search Tool (raw text queries)
 try:
-    from tools.real_mcp_product_tool import RealMCPProductSearchTool
-    product_tool = RealMCPProductSearchTool()
-    print("✅ MCP Product Search Tool initialized")
+    from src.tools.text_search_tool import ProductTextSearchTool
+    product_tool = ProductTextSearchTool()
+    print("✅ Product Text Search Tool initialized")
 except ImportError as e:
-    print(f"⚠️ MCP tool not available: {e}")
+    print(f"⚠️ Product text search not available: {e}")
 except Exception as e:
-    print(f"❌ Error initializing MCP tool: {e}")
+    print(f"❌ Error initializing product text search: {e}")
+
+# Try to initialize the intent analyzer; its model loads on a background thread
+# so startup is not blocked, and direct searches rank by intent once it is ready
+intent_module = None
+try:
+    from src.tools import schema_intent_tool as intent_module
+    intent_module.start_warmup()
+    print("✅ Intent analyzer warming up")
+except ImportError as e:
+    print(f"⚠️ Intent analyzer not available: {e}")
+except Exception as e:
+    print(f"❌ Error initializing intent analyzer: {e}")
 
 # Try to initialize Voice Service (Deepgram)
 try:
@@ -79,6 +91,29 @@ def index():
     """Main voice shopping interface"""
     return render_template('voice_shopping.html')
 
+def intent_tool_ready():
+    """Whether the intent analyzer has finished loading its model and embeddings"""
+    return bool(intent_module and intent_module.is_ready())
+
+def direct_product_search(query, limit):
+    """
+    Search without the CrewAI pipeline: once the intent model is loaded, filter
+    and rank by the analyzed intent (weighted by how sure each match is), else
+    fall back to full-text search so a request never waits on the model load
+    """
+    if intent_tool_ready():
+        try:
+            from src.tools.real_mcp_product_tool import real_mcp_product_search_tool
+            intent, scores = intent_module.intent_analyzer_tool.analyze(query)
+            if intent:
+                search = json.loads(real_mcp_product_search_tool._run(
+                    json.dumps(intent), limit=limit, intent_scores=scores))
+                if search.get('products'):
+                    return search
+        except Exception as e:
+            logger.warning(f"⚠️ Intent search failed, using full-text search: {e}")
+    return json.loads(product_tool._run(query, limit=limit))
+
 @app.route('/api/health')
 def health_check():
     """Health check endpoint"""
@@ -90,6 +125,7 @@ def health_check():
             'voice_service': voice_service is not None,
             'shopping_service': shopping_service is not None,
             'product_tool': product_tool is not None,
+            'intent_tool_ready': intent_tool_ready(),
             'database': 'MongoDB via MCP',
             'ai_pipeline': 'CrewAI + Gemini'
         },
@@ -101,6 +137,27 @@ def health_check():
         }
     })
 
+@app.route('/api/metrics')
+def metrics():
+    """Runtime counters for the intent and search hot paths"""
+    # Only report modules that are already loaded; never trigger a model load here
+    query_module = sys.modules.get('src.tools.direct_mongodb_query_tool')
+    search_module = sys.modules.get('src.tools.real_mcp_product_tool')
+    text_module = sys.modules.get('src.tools.text_search_tool')
+    return jsonify({
+        'timestamp': datetime.now().isoformat(),
+        'intent_ready': intent_tool_ready(),
+        'intent_embedding_cache': intent_module.EMBEDDING_CACHE.stats() if intent_module else None,
+        'intent_batch_encoder': intent_module.BATCH_ENCODER.stats() if intent_module else None,
+        'query_plan_cache': query_module.FILTER_COMPILER.stats() if query_module else None,
+        'query_result_cache': {
+            'direct_mongodb_query': query_module.RESULT_CACHE.stats() if query_module else None,
+            'real_mcp_product_search': search_module.RESULT_CACHE.stats() if search_module else None,
+            'product_text_search': text_module.RESULT_CACHE.stats() if text_module else None,
+        },
+        'mongo_backend': query_module.MONGO_BACKEND.stats() if query_module and query_module.MONGO_BACKEND else None
+    })
+
 @app.route('/api/process-voice', methods=['POST'])
 def process_voice():
     """Process voice input using the complete pipeline: Deepgram → CrewAI → MCP → Response"""
@@ -178,19 +235,20 @@ def process_voice():
         # Step 3: Fallback to Direct MCP Search
         if product_tool:
             try:
-                logger.info("🔍 Direct MCP database search...")
-                # Fix the method call - use the correct parameter name
-                products = product_tool._run(transcription)
+                logger.info("🔍 Direct product search...")
+                search = direct_product_search(transcription, limit=10)
+                products = search.get('products', [])
+                total_found = search.get('total_found', len(products))
                 
                 results = {
                     'intent': 'search',
-                    'products': products[:10] if products else [],
-                    'total_found': len(products) if products else 0,
+                    'products': products,
+                    'total_found': total_found,
                     'query': transcription,
-                    'message': f"Found {len(products) if products else 0} products matching your search"
+                    'message': f"Found {total_found} products matching your search"
                 }
                 
-                logger.info(f"✅ MCP direct search: Found {len(products) if products else 0} products")
+                logger.info(f"✅ Text search: Found {total_found} products")
                 return jsonify({
                     'success': True,
                     'transcription': transcription,
@@ -265,19 +323,20 @@ def text_search():
         # Step 2: Direct MCP search
         if product_tool:
             try:
-                logger.info("🔍 Direct MCP database search...")
-                # Fix the method call - use the correct parameter name
-                products = product_tool._run(query)
+                logger.info("🔍 Direct product search...")
+                search = direct_product_search(query, limit=15)
+                products = search.get('products', [])
+                total_found = search.get('total_found', len(products))
                 
                 results = {
                     'intent': 'search',
-                    'products': products[:15] if products else [],
-                    'total_found': len(products) if products else 0,
+                    'products': products,
+                    'total_found': total_found,
                     'query': query,
-                    'message': f"Found {len(products) if products else 0} products"
+                    'message': f"Found {total_found} products"
                 }
                 
-                logger.info(f"✅ MCP search: Found {len(products) if products else 0} products")
+                logger.info(f"✅ Text search: Found {total_found} products")
                 return jsonify({
                     'success': True,
                     'query': query,
@@ -359,12 +418,13 @@ def simulate_voice():
         # Fallback to direct MCP
         if product_tool:
             try:
-                # Fix the method call
-                products = product_tool._run(query)
+                search = direct_product_search(query, limit=8)
+                products = search.get('products', [])
+                total_found = search.get('total_found', len(products))
                 results = {
                     'intent': 'search',
-                    'products': products[:8] if products else [],
-                    'total_found': len(products) if products else 0,
+                    'products': products,
+                    'total_found': total_found,
                     'query': query
                 }
                 
@@ -401,97 +461,98 @@ def simulate_voice():
         logger.error(f"❌ Simulation error: {e}")
         return jsonify({'error': f'Simulation failed: {str(e)}'}), 500
 
+# Demo products served when no product service is available
+MOCK_PRODUCTS = [
+    {
+        "name": "Elegant Red Party Dress",
+        "description": "Stunning red dress perfect for party occasions and special events",
+        "price": 1599,
+        "discount": 300,
+        "category": "Dresses",
+        "gender": "women",
+        "pattern": "solid",
+        "colors": ["red"],
+        "sizes": ["S", "M", "L", "XL"],
+        "rating": 4.7,
+        "stock": 15,
+        "tags": ["party", "elegant", "formal"]
+    },
+    {
+        "name": "Navy Blue Casual Shirt",
+        "description": "Comfortable navy blue shirt perfect for casual outings and daily wear",
+        "price": 999,
+        "discount": 150,
+        "category": "Casual",
+        "gender": "men",
+        "pattern": "solid",
+        "colors": ["navy blue"],
+        "sizes": ["M", "L", "XL"],
+        "rating": 4.4,
+        "stock": 30,
+        "tags": ["casual", "comfortable", "daily"]
+    },
+    {
+        "name": "Winter Black Jacket",
+        "description": "Warm black jacket perfect for winter weather and outdoor activities",
+        "price": 2499,
+        "discount": 400,
+        "category": "Jackets",
+        "gender": "unisex",
+        "pattern": "solid",
+        "colors": ["black"],
+        "sizes": ["M", "L", "XL"],
+        "rating": 4.6,
+        "stock": 20,
+        "tags": ["winter", "warm", "outdoor"]
+    },
+    {
+        "name": "Blue Denim Jeans",
+        "description": "Classic blue denim jeans for casual and everyday wear",
+        "price": 1299,
+        "discount": 200,
+        "category": "Casual",
+        "gender": "women",
+        "pattern": "solid",
+        "colors": ["blue"],
+        "sizes": ["S", "M", "L", "XL"],
+        "rating": 4.5,
+        "stock": 45,
+        "tags": ["denim", "casual", "everyday"]
+    },
+    {
+        "name": "Formal White Shirt",
+        "description": "Crisp white formal shirt perfect for office and business meetings",
+        "price": 899,
+        "discount": 100,
+        "category": "Formal",
+        "gender": "men",
+        "pattern": "solid",
+        "colors": ["white"],
+        "sizes": ["M", "L", "XL", "XXL"],
+        "rating": 4.3,
+        "stock": 50,
+        "tags": ["formal", "office", "business"]
+    }
+]
+
+# Built once; BM25 over name, description, tags and category
+try:
+    from src.tools.text_index import BM25Index
+    MOCK_PRODUCT_INDEX = BM25Index(MOCK_PRODUCTS)
+except Exception as e:
+    print(f"⚠️ Mock product index not available: {e}")
+    MOCK_PRODUCT_INDEX = None
+
 def get_mock_products_for_query(query):
-    """Get relevant mock products based on query keywords"""
-    query_lower = query.lower()
-    
-    all_mock_products = [
-        {
-            "name": "Elegant Red Party Dress",
-            "description": "Stunning red dress perfect for party occasions and special events",
-            "price": 1599,
-            "discount": 300,
-            "category": "Dresses",
-            "gender": "women",
-            "pattern": "solid",
-            "colors": ["red"],
-            "sizes": ["S", "M", "L", "XL"],
-            "rating": 4.7,
-            "stock": 15,
-            "tags": ["party", "elegant", "formal"]
-        },
-        {
-            "name": "Navy Blue Casual Shirt",
-            "description": "Comfortable navy blue shirt perfect for casual outings and daily wear",
-            "price": 999,
-            "discount": 150,
-            "category": "Casual",
-            "gender": "men",
-            "pattern": "solid",
-            "colors": ["navy blue"],
-            "sizes": ["M", "L", "XL"],
-            "rating": 4.4,
-            "stock": 30,
-            "tags": ["casual", "comfortable", "daily"]
-        },
-        {
-            "name": "Winter Black Jacket",
-            "description": "Warm black jacket perfect for winter weather and outdoor activities",
-            "price": 2499,
-            "discount": 400,
-            "category": "Jackets",
-            "gender": "unisex",
-            "pattern": "solid",
-            "colors": ["black"],
-            "sizes": ["M", "L", "XL"],
-            "rating": 4.6,
-            "stock": 20,
-            "tags": ["winter", "warm", "outdoor"]
-        },
-        {
-            "name": "Blue Denim Jeans",
-            "description": "Classic blue denim jeans for casual and everyday wear",
-            "price": 1299,
-            "discount": 200,
-            "category": "Casual",
-            "gender": "women",
-            "pattern": "solid",
-            "colors": ["blue"],
-            "sizes": ["S", "M", "L", "XL"],
-            "rating": 4.5,
-            "stock": 45,
-            "tags": ["denim", "casual", "everyday"]
-        },
-        {
-            "name": "Formal White Shirt",
-            "description": "Crisp white formal shirt perfect for office and business meetings",
-            "price": 899,
-            "discount": 100,
-            "category": "Formal",
-            "gender": "men",
-            "pattern": "solid",
-            "colors": ["white"],
-            "sizes": ["M", "L", "XL", "XXL"],
-            "rating": 4.3,
-            "stock": 50,
-            "tags": ["formal", "office", "business"]
-        }
-    ]
-    
-    # Filter products based on query keywords
+    """Get relevant mock products for a raw text query"""
     filtered_products = []
-    for product in all_mock_products:
-        # Check if any word in query matches product attributes
-        if (any(word in product['name'].lower() for word in query_lower.split()) or
-            any(word in product['description'].lower() for word in query_lower.split()) or
-            any(word in product['category'].lower() for word in query_lower.split()) or
-            any(color in query_lower for color in product['colors']) or
-            any(tag in query_lower for tag in product.get('tags', []))):
-            filtered_products.append(product)
+    if MOCK_PRODUCT_INDEX is not None:
+        filtered_products = [MOCK_PRODUCTS[position]
+                             for position, _ in MOCK_PRODUCT_INDEX.search(query, limit=len(MOCK_PRODUCTS))]
     
     # If no matches, return some products for demo
     if not filtered_products:
-        filtered_products = all_mock_products[:3]
+        filtered_products = MOCK_PRODUCTS[:3]
     
     return filtered_products
 
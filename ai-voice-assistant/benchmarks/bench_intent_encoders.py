@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Benchmark: PyTorch SentenceTransformer vs int8-quantized ONNX Runtime encoder.
+
+Checks that both backends produce the same matched intent attributes for a set of
+shopping queries and reports per-query encode latency.
+
+Usage: python benchmarks/bench_intent_encoders.py
+Requires: pip install sentence-transformers[onnx]
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.tools.schema_intent_tool import DB_SCHEMA, MODEL_NAME, _l2_normalize, match_intent
+from src.tools.intent_vocabulary import IntentVocabulary
+from src.tools.text_encoders import default_onnx_file, load_encoder
+from bench_intent_matching import QUERIES
+
+
+def tokenize(query):
+    return query.lower().replace(',', '').replace('.', '').split()
+
+
+def encode_latency(model, queries, repeat):
+    for query in queries[:2]:
+        model.encode(tokenize(query))
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for query in queries:
+            model.encode(tokenize(query))
+    return (time.perf_counter() - start) / (repeat * len(queries))
+
+
+def main(repeat=20):
+    onnx_file = os.getenv('INTENT_ONNX_FILE') or default_onnx_file()
+    encoders = {
+        'torch': load_encoder(MODEL_NAME, 'torch'),
+        'onnx': load_encoder(MODEL_NAME, 'onnx', onnx_file),
+    }
+    layouts = {}
+    for name, model in encoders.items():
+        vocabulary = IntentVocabulary(model.encode)
+        vocabulary.update(DB_SCHEMA)
+        layouts[name] = vocabulary.layout
+
+    mismatches = 0
+    min_cosine = 1.0
+    for query in QUERIES:
+        tokens = tokenize(query)
+        embeddings = {name: model.encode(tokens) for name, model in encoders.items()}
+        cosine = np.sum(
+            _l2_normalize(embeddings['torch']) * _l2_normalize(embeddings['onnx']), axis=1
+        )
+        min_cosine = min(min_cosine, float(cosine.min()))
+        matched = {
+            name: {k: set(v) for k, v in match_intent(
+                tokens, embeddings[name], layout=layouts[name]).items()}
+            for name in encoders
+        }
+        if matched['torch'] != matched['onnx']:
+            mismatches += 1
+            print(f"MISMATCH '{query}':\n  torch: {matched['torch']}\n  onnx:  {matched['onnx']}")
+
+    print(f"Model: {MODEL_NAME}  ONNX file: {onnx_file}")
+    print(f"Min token cosine(torch, onnx): {min_cosine:.4f}")
+    print(f"Queries with identical matched attributes: {len(QUERIES) - mismatches}/{len(QUERIES)}")
+    for name, model in encoders.items():
+        print(f"{name:<6} encode: {encode_latency(model, QUERIES, repeat) * 1e3:8.2f} ms/query")
+
+
+if __name__ == "__main__":
+    main()
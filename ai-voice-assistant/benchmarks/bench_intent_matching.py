@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Benchmark: intent matching with one cosine_similarity call per (token, schema key)
+versus a single matrix multiply against the stacked schema matrix.
+
+Usage: python benchmarks/bench_intent_matching.py
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+from sklearn.metrics.pairwise import cosine_similarity
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.tools import schema_intent_tool
+from src.tools.schema_intent_tool import DB_SCHEMA, match_intent
+
+QUERIES = [
+    "I want a red dress for party",
+    "Show me casual clothes for women",
+    "Find blue jeans for men",
+    "Looking for formal shirts for office wear",
+    "I need winter jackets for cold weather",
+    "I have a date tonight, give me something more special dresses",
+    "Can you find me ethnic wear for festivals in navy blue",
+    "printed cotton kurti for daily college use",
+]
+
+
+def legacy_match(prompt_tokens, token_embeddings, similarity_threshold=0.55):
+    """Previous implementation: one sklearn call per (token, key) pair."""
+    intent_json = {}
+    for i, token in enumerate(prompt_tokens):
+        token_embedding = token_embeddings[i:i+1]
+        for key, db_values in DB_SCHEMA.items():
+            similarities = cosine_similarity(token_embedding, schema_intent_tool.DB_EMBEDDINGS[key])
+            best_match_index = np.argmax(similarities)
+            if similarities[0, best_match_index] >= similarity_threshold:
+                intent_json.setdefault(key, set()).add(db_values[best_match_index])
+    return {key: list(values) for key, values in intent_json.items()}
+
+
+def time_per_call(fn, inputs, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for tokens, embeddings in inputs:
+            fn(tokens, embeddings)
+    return (time.perf_counter() - start) / (repeat * len(inputs))
+
+
+def main(repeat=200):
+    schema_intent_tool.ensure_ready()
+    model = schema_intent_tool.get_model()
+    inputs = []
+    for query in QUERIES:
+        tokens = query.lower().replace(',', '').replace('.', '').split()
+        inputs.append((tokens, model.encode(tokens)))
+
+    for tokens, embeddings in inputs:
+        legacy = {k: set(v) for k, v in legacy_match(tokens, embeddings).items()}
+        current = {k: set(v) for k, v in match_intent(tokens, embeddings).items()}
+        assert legacy == current, f"Mismatch for {tokens}: {legacy} != {current}"
+
+    legacy_s = time_per_call(legacy_match, inputs, repeat)
+    matmul_s = time_per_call(match_intent, inputs, repeat)
+    print(f"Queries: {len(QUERIES)}  schema values: {sum(len(v) for v in DB_SCHEMA.values())}")
+    print(f"Per-pair cosine_similarity: {legacy_s * 1e3:8.3f} ms/query")
+    print(f"Single matmul:              {matmul_s * 1e3:8.3f} ms/query")
+    print(f"Speedup:                    {legacy_s / matmul_s:8.1f}x  (outputs identical)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Benchmark: DirectMongoDBQueryTool filtering by full catalog scan (_matches_filter
+per product), by a scan with compiled predicate plans, and by the inverted index
+(bitmap union/intersection) with sorted range indexes, on synthetic catalogs of 10k to 1M SKUs sampled
+from the attribute values of the real catalog.
+
+Usage: python benchmarks/bench_product_query.py [sizes...]
+"""
+
+import json
+import os
+import random
+import sys
+import time
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.tools.direct_mongodb_query_tool import DirectMongoDBQueryTool, FILTER_COMPILER
+from src.tools.catalog_store import CatalogStore
+from src.tools.filter_compiler import FilterCompiler
+
+CATALOG_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', 'ecommerce.products.json')
+
+SCHEMAS = [
+    {"gender": ["women"], "category": ["Dresses"], "colors": ["red", "pink"]},
+    {"gender": ["men"], "occasion": ["office", "business"], "max_price": 2000},
+    {"colors": ["blue"], "sizes": ["M"]},
+    {"type": ["topwear"], "pattern": ["striped"], "tags": ["cotton"], "min_rating": 4.0},
+    {"category": ["T-Shirts"]},
+    {"gender": ["kids"], "occasion": ["party"], "colors": ["purple"], "sizes": ["XS", "S"]},
+    # Range-heavy: "dresses under 1000 rated 4+", and bargains that are in stock
+    {"category": ["Dresses"], "max_price": 1000, "min_rating": 4.0},
+    {"max_final_price": 400, "in_stock": True},
+    {"gender": ["men"], "price": {"min": 1000, "max": 1100}, "min_rating": 4.5},
+]
+
+
+def synthetic_catalog(n, seed=0):
+    """Products whose attributes are drawn independently from the real catalog's values."""
+    with open(CATALOG_PATH, encoding='utf-8') as f:
+        catalog = json.load(f)
+    rng = random.Random(seed)
+    products = []
+    for i in range(n):
+        product = {field: rng.choice(catalog)[field] for field in catalog[0] if field not in ('createdAt', 'updatedAt')}
+        product["_id"] = f"sku_{i:07d}"
+        product["price"] = rng.randint(299, 4999)
+        product["rating"] = round(rng.uniform(3.0, 5.0), 1)
+        product["discount"] = rng.choice((0, 0, 50, 100, 200))
+        product["stock"] = rng.randint(0, 100)
+        products.append(product)
+    return products
+
+
+def main(sizes=(10000, 100000, 1000000), repeat=3):
+    tool = DirectMongoDBQueryTool()
+    filters = [tool._build_mongo_filter(schema) for schema in SCHEMAS]
+    # Same semantics, but every condition compiled to a predicate (no index terms)
+    scan_compiler = FilterCompiler(flexible=FILTER_COMPILER.flexible)
+
+    start = time.perf_counter()
+    for mongo_filter in filters:
+        FilterCompiler(FILTER_COMPILER.indexed_fields, FILTER_COMPILER.range_fields,
+                       FILTER_COMPILER.flexible).compile(mongo_filter)
+    compile_us = (time.perf_counter() - start) / len(filters) * 1e6
+    start = time.perf_counter()
+    for _ in range(1000):
+        for mongo_filter in filters:
+            FILTER_COMPILER.compile(mongo_filter)
+    cached_us = (time.perf_counter() - start) / (1000 * len(filters)) * 1e6
+    print(f"Filter compile: {compile_us:.1f} us  cached plan lookup: {cached_us:.1f} us")
+
+    for n in sizes:
+        products = synthetic_catalog(n)
+        start = time.perf_counter()
+        store = CatalogStore(products)
+        store.index
+        store.range_indexes
+        products = store.products
+        build_s = time.perf_counter() - start
+
+        scan_s = compiled_s = index_s = 0.0
+        matched = 0
+        for mongo_filter in filters:
+            start = time.perf_counter()
+            expected = [p for p in products if tool._matches_filter(p, mongo_filter)]
+            scan_s += time.perf_counter() - start
+
+            start = time.perf_counter()
+            plan = scan_compiler.compile(mongo_filter)
+            compiled = [p for p in products if plan.matches(p)]
+            compiled_s += time.perf_counter() - start
+
+            start = time.perf_counter()
+            for _ in range(repeat):
+                found = store.query(FILTER_COMPILER.compile(mongo_filter))
+            index_s += (time.perf_counter() - start) / repeat
+            expected_ids = [p["_id"] for p in expected]
+            assert [p["_id"] for p in compiled] == expected_ids, mongo_filter
+            assert [p["_id"] for p in found] == expected_ids, mongo_filter
+            matched += len(found)
+
+        print(f"SKUs: {n:>8}  store + index build: {build_s:6.2f}s  avg matches/query: {matched // len(filters)}")
+        print(f"  full scan:      {scan_s / len(filters) * 1e3:10.2f} ms/query")
+        print(f"  compiled scan:  {compiled_s / len(filters) * 1e3:10.2f} ms/query  ({scan_s / compiled_s:.1f}x)")
+        print(f"  catalog store:  {index_s / len(filters) * 1e3:10.2f} ms/query  "
+              f"({scan_s / index_s:.0f}x, results identical)")
+
+
+if __name__ == "__main__":
+    main(tuple(int(arg) for arg in sys.argv[1:]) or (10000, 100000, 1000000))
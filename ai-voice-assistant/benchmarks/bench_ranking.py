@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Benchmark: top-k relevance ranking with the bounded heap and early stop versus
+scoring, sorting and materializing every candidate, on synthetic catalogs.
+
+Usage: python benchmarks/bench_ranking.py [sizes...]
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from bench_product_query import synthetic_catalog
+from src.tools.catalog_store import CatalogStore
+from src.tools.ranking import ATTRIBUTE_WEIGHT, rank, static_order
+
+
+def main(sizes=(10000, 100000, 1000000), k=10, repeat=5):
+    for n in sizes:
+        store = CatalogStore(synthetic_catalog(n))
+        static_order(store)
+        candidates = store.match_mask("gender", lambda g: g == "women")
+        attributes = [
+            (store.match_mask("colors", lambda c: c in ("red", "pink")), 0.9),
+            (store.match_mask("occasion", lambda o: o == "party"), 0.7),
+        ]
+
+        start = time.perf_counter()
+        for _ in range(repeat):
+            scores, _ = static_order(store)
+            scores = scores.copy()
+            for mask, similarity in attributes:
+                scores += ATTRIBUTE_WEIGHT * similarity * mask
+            positions = np.flatnonzero(candidates)
+            ordered = positions[np.lexsort((positions, -scores[positions]))]
+            full = [store.products[i] for i in ordered]
+        full_ms = (time.perf_counter() - start) / repeat * 1e3
+
+        start = time.perf_counter()
+        for _ in range(repeat):
+            top = [store.products[i] for i, _ in rank(store, candidates, attributes, k)]
+        top_ms = (time.perf_counter() - start) / repeat * 1e3
+        assert [p["_id"] for p in top] == [p["_id"] for p in full[:k]]
+
+        print(f"SKUs: {n:>8}  candidates: {int(candidates.sum()):>7}  "
+              f"full sort: {full_ms:8.2f} ms  top-{k} heap: {top_ms:6.2f} ms  ({full_ms / top_ms:.0f}x)")
+
+
+if __name__ == "__main__":
+    main(tuple(int(arg) for arg in sys.argv[1:]) or (10000, 100000, 1000000))
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Benchmark: raw text product search with the BM25 inverted index versus the
+per-word substring scan over every product field, on synthetic catalogs.
+
+Usage: python benchmarks/bench_text_search.py [sizes...]
+"""
+
+import os
+import sys
+import time
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from bench_product_query import synthetic_catalog
+from src.tools.text_index import BM25Index
+
+QUERIES = [
+    "red dress for party",
+    "warm winter hoodie",
+    "formal white shirt for office",
+    "casual blue jeans",
+]
+
+
+def substring_scan(products, query):
+    """Every product with a query word inside its name, description, category or tags."""
+    words = query.lower().split()
+    return [
+        product for product in products
+        if any(word in product['name'].lower() for word in words)
+        or any(word in product['description'].lower() for word in words)
+        or any(word in product['category'].lower() for word in words)
+        or any(tag in query.lower() for tag in product.get('tags', []))
+    ]
+
+
+def main(sizes=(10000, 100000), k=10, repeat=3):
+    for n in sizes:
+        products = synthetic_catalog(n)
+        start = time.perf_counter()
+        index = BM25Index(products)
+        build_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for query in QUERIES:
+                substring_scan(products, query)[:k]
+        scan_ms = (time.perf_counter() - start) / (repeat * len(QUERIES)) * 1e3
+
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for query in QUERIES:
+                [products[position] for position, _ in index.search(query, k)]
+        bm25_ms = (time.perf_counter() - start) / (repeat * len(QUERIES)) * 1e3
+
+        print(f"SKUs: {n:>7}  index build: {build_s:6.2f} s  ({len(index.postings)} terms)  "
+              f"substring scan: {scan_ms:8.2f} ms  BM25 top-{k}: {bm25_ms:6.2f} ms  ({scan_ms / bm25_ms:.0f}x)")
+
+
+if __name__ == "__main__":
+    main(tuple(int(arg) for arg in sys.argv[1:]) or (10000, 100000))
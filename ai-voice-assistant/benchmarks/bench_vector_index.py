@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Benchmark: exact NumPy brute-force search vs the IVF index for top-k product
+retrieval, on synthetic clustered embeddings (no model needed).
+
+Reports build time, per-query latency and recall@k of IVF against exact search.
+
+Usage: python benchmarks/bench_vector_index.py [num_products] [dim]
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.tools.vector_index import FlatIndex, IVFIndex
+
+
+def synthetic_embeddings(n, dim, seed=0):
+    """Normalized vectors around a few hundred 'product family' centres."""
+    rng = np.random.default_rng(seed)
+    centres = rng.normal(size=(500, dim)).astype(np.float32)
+    vectors = centres[rng.integers(0, len(centres), n)]
+    vectors += 0.6 * rng.normal(size=(n, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def per_query_ms(search, queries):
+    start = time.perf_counter()
+    for query in queries:
+        search(query)
+    return (time.perf_counter() - start) / len(queries) * 1e3
+
+
+def main(n=100000, dim=384, k=10, num_queries=200):
+    vectors = synthetic_embeddings(n, dim)
+    rng = np.random.default_rng(1)
+    queries = vectors[rng.integers(0, n, num_queries)] + 0.3 * rng.normal(size=(num_queries, dim))
+
+    flat = FlatIndex(vectors)
+    start = time.perf_counter()
+    ivf = IVFIndex.build(vectors)
+    build_s = time.perf_counter() - start
+    exact = [set(flat.search(query, k)[0]) for query in queries]
+
+    print(f"Products: {n}  dim: {dim}  k: {k}  IVF lists: {len(ivf.centroids)}  build: {build_s:.1f}s")
+    print(f"{'flat (exact)':<16} {per_query_ms(lambda q: flat.search(q, k), queries):8.3f} ms/query  recall@{k}: 1.000")
+    for nprobe in (4, 8, 16, 32):
+        latency = per_query_ms(lambda q: ivf.search(q, k, nprobe=nprobe), queries)
+        recall = np.mean([
+            len(truth & set(ivf.search(query, k, nprobe=nprobe)[0])) / k
+            for truth, query in zip(exact, queries)
+        ])
+        print(f"{f'ivf nprobe={nprobe}':<16} {latency:8.3f} ms/query  recall@{k}: {recall:.3f}")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
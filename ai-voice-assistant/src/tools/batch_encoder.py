@@ -0,0 +1,143 @@
+"""
+Batching Encoder
+Coalesces encode requests from concurrent threads into one batched forward pass
+"""
+
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class BatchingEncoder:
+    """
+    Encoding service shared by all request threads. Each call enqueues its texts
+    and waits on a future; a single worker thread collects requests for up to
+    max_wait_ms (or until max_batch_size texts), encodes the unique texts in one
+    call and hands each caller its rows. A window of 0 disables batching.
+    """
+
+    def __init__(
+        self,
+        encode_fn: Callable[[List[str]], np.ndarray],
+        max_wait_ms: float = 5.0,
+        max_batch_size: int = 64,
+    ):
+        self._encode_fn = encode_fn
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_batch_size = max_batch_size
+        self._queue: "queue.Queue" = queue.Queue()
+        self._worker = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.batches = 0
+        self.requests = 0
+        self.texts = 0
+        self.unique_texts = 0
+        self.max_batch_requests = 0
+        self.total_queue_wait = 0.0
+        self.max_queue_wait = 0.0
+        self.errors = 0
+
+    def encode(self, texts: Sequence[str]) -> np.ndarray:
+        texts = list(texts)
+        if self.max_wait <= 0:
+            return self._encode_fn(texts)
+        self._ensure_worker()
+        future: Future = Future()
+        self._queue.put((texts, future, time.perf_counter()))
+        return future.result()
+
+    def _ensure_worker(self):
+        if self._worker is None:
+            with self._start_lock:
+                if self._worker is None:
+                    self._worker = threading.Thread(
+                        target=self._run, name='intent-batch-encoder', daemon=True
+                    )
+                    self._worker.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            size = len(batch[0][0])
+            deadline = time.perf_counter() + self.max_wait
+            while size < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                batch.append(item)
+                size += len(item[0])
+            try:
+                self._process(batch)
+            except Exception as e:
+                # A failing batch must not kill the worker: its callers get the
+                # error and the loop keeps serving the rest of the queue
+                logger.error(f"Batched encode of {len(batch)} requests failed: {e}")
+                with self._stats_lock:
+                    self.errors += 1
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def _process(self, batch):
+        started = time.perf_counter()
+        # Cancelled requests are dropped; the rest can no longer be cancelled
+        batch = [item for item in batch if item[1].set_running_or_notify_cancel()]
+        if not batch:
+            return
+        # Requests often share tokens, so each distinct text is encoded once
+        unique: Dict[str, int] = {}
+        for texts, _, _ in batch:
+            for text in texts:
+                unique.setdefault(text, len(unique))
+        embeddings = np.asarray(self._encode_fn(list(unique))) if unique else None
+        if embeddings is not None and (embeddings.ndim != 2 or len(embeddings) != len(unique)):
+            raise ValueError(f"Encoder returned shape {embeddings.shape} for {len(unique)} texts")
+
+        # Every caller's rows are sliced before any future is resolved
+        results = [
+            embeddings[[unique[text] for text in texts]] if texts else np.empty((0, 0), dtype=np.float32)
+            for texts, _, _ in batch
+        ]
+        waits = []
+        for (_, future, enqueued_at), result in zip(batch, results):
+            waits.append(started - enqueued_at)
+            future.set_result(result)
+
+        with self._stats_lock:
+            self.batches += 1
+            self.requests += len(batch)
+            self.texts += sum(len(texts) for texts, _, _ in batch)
+            self.unique_texts += len(unique)
+            self.max_batch_requests = max(self.max_batch_requests, len(batch))
+            self.total_queue_wait += sum(waits)
+            self.max_queue_wait = max(self.max_queue_wait, max(waits))
+
+    def stats(self) -> Dict:
+        with self._stats_lock:
+            return {
+                "window_ms": self.max_wait * 1000.0,
+                "max_batch_size": self.max_batch_size,
+                "batches": self.batches,
+                "requests": self.requests,
+                "texts": self.texts,
+                "unique_texts": self.unique_texts,
+                "avg_requests_per_batch": self.requests / self.batches if self.batches else 0.0,
+                "avg_texts_per_batch": self.unique_texts / self.batches if self.batches else 0.0,
+                "max_requests_per_batch": self.max_batch_requests,
+                "avg_queue_wait_ms": self.total_queue_wait / self.requests * 1000.0 if self.requests else 0.0,
+                "max_queue_wait_ms": self.max_queue_wait * 1000.0,
+                "queue_depth": self._queue.qsize(),
+                "errors": self.errors,
+            }
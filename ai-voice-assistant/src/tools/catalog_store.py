@@ -0,0 +1,260 @@
+"""
+Catalog Store
+The product catalog (data/ecommerce.products.json), loaded once per process and
+shared by the product tools: numeric fields as NumPy arrays, string attributes
+dictionary-encoded, and the inverted index over the attribute values
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from typing import Callable, Dict, Hashable, List, Optional, Sequence
+
+import numpy as np
+
+from .inverted_index import (FACET_FIELDS, InvertedIndex, bitmap_count, bitmap_to_mask, bitmap_to_positions,
+                             mask_to_bitmap, positions_to_bitmap)
+from .payloads import ProductPayloads
+
+logger = logging.getLogger(__name__)
+
+CATALOG_PATH = os.getenv(
+    'PRODUCT_CATALOG_PATH',
+    os.path.normpath(os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'ecommerce.products.json'))
+)
+
+# Most frequent values returned per facet field (0 = all)
+FACET_LIMIT = int(os.getenv('SEARCH_FACET_LIMIT', '20'))
+
+NUMERIC_FIELDS = ('price', 'discount', 'final_price', 'rating', 'stock')
+# Numeric fields with a sorted secondary index for range filters
+RANGE_INDEXED_FIELDS = ('price', 'final_price', 'rating', 'stock')
+STRING_FIELDS = ('name', 'gender', 'type', 'category', 'pattern', 'colors', 'occasion', 'tags', 'sizes')
+
+_COMPARISONS = {
+    '$gte': np.greater_equal,
+    '$lte': np.less_equal,
+    '$gt': np.greater,
+    '$lt': np.less,
+}
+
+
+def normalize_product(product: Dict) -> Dict:
+    """
+    Flatten Mongo extended JSON ids ({"$oid": ...}) to plain strings and add
+    final_price (price minus discount) so it can be filtered like any field.
+    """
+    product = dict(product)
+    _id = product.get('_id')
+    if isinstance(_id, dict) and '$oid' in _id:
+        product['_id'] = _id['$oid']
+    price, discount = product.get('price'), product.get('discount') or 0
+    if isinstance(price, (int, float)) and isinstance(discount, (int, float)) and 'final_price' not in product:
+        product['final_price'] = price - discount
+    return product
+
+
+class RangeIndex:
+    """
+    Product positions sorted by a numeric column (missing values left out).
+    A range condition is two binary searches giving a contiguous slice of
+    `order`; only that slice is ever touched.
+    """
+
+    def __init__(self, column: np.ndarray):
+        present = np.flatnonzero(~np.isnan(column))
+        self.order = present[np.argsort(column[present], kind='stable')]
+        self.values = column[self.order]
+
+    def interval(self, conditions: Sequence) -> tuple:
+        """[lo, hi) slice of the sorted order satisfying every (operator, bound)."""
+        lo, hi = 0, len(self.values)
+        for operator, bound in conditions:
+            if operator == '$gte':
+                lo = max(lo, int(np.searchsorted(self.values, bound, 'left')))
+            elif operator == '$gt':
+                lo = max(lo, int(np.searchsorted(self.values, bound, 'right')))
+            elif operator == '$lte':
+                hi = min(hi, int(np.searchsorted(self.values, bound, 'right')))
+            else:
+                hi = min(hi, int(np.searchsorted(self.values, bound, 'left')))
+        return lo, max(lo, hi)
+
+    def positions(self, lo: int, hi: int) -> np.ndarray:
+        """Positions in the slice, in catalog order."""
+        return np.sort(self.order[lo:hi])
+
+
+class DictColumn:
+    """
+    A string attribute stored as codes into a dictionary of its distinct values.
+    Product i owns codes[offsets[i]:offsets[i + 1]] (one code for scalar fields,
+    any number for array fields, none when missing).
+    """
+
+    def __init__(self, products: Sequence[Dict], field: str):
+        lookup: Dict[Hashable, int] = {}
+        codes: List[int] = []
+        offsets = np.zeros(len(products) + 1, dtype=np.int64)
+        for i, product in enumerate(products):
+            value = product.get(field)
+            for item in (value if isinstance(value, list) else (value,)):
+                if isinstance(item, str):
+                    codes.append(lookup.setdefault(item, len(lookup)))
+            offsets[i + 1] = len(codes)
+        self.values = list(lookup)
+        self.lookup = lookup
+        self.codes = np.asarray(codes, dtype=np.int32)
+        self.offsets = offsets
+
+    def mask_for_codes(self, code_mask: np.ndarray) -> np.ndarray:
+        """Products having at least one value whose code is set in code_mask."""
+        hits = np.concatenate([[0], np.cumsum(code_mask[self.codes], dtype=np.int64)])
+        return hits[self.offsets[1:]] > hits[self.offsets[:-1]]
+
+    def match_mask(self, value_matches: Callable[[str], bool]) -> np.ndarray:
+        """Products having any value for which value_matches is true; evaluated once per distinct value."""
+        code_mask = np.fromiter((bool(value_matches(v)) for v in self.values), dtype=bool, count=len(self.values))
+        return self.mask_for_codes(code_mask)
+
+
+class CatalogStore:
+    """
+    Columnar view of the catalog. `products` keeps the documents (in file order)
+    for formatting results; filters run on the columns and return positions.
+    """
+
+    def __init__(self, products: Sequence[Dict], version: str = ""):
+        self.products = [normalize_product(p) for p in products]
+        self.size = len(self.products)
+        self.version = version
+        self.numeric: Dict[str, np.ndarray] = {
+            field: np.array([self._number(p.get(field)) for p in self.products], dtype=np.float64)
+            for field in NUMERIC_FIELDS
+        }
+        self.columns: Dict[str, DictColumn] = {field: DictColumn(self.products, field) for field in STRING_FIELDS}
+        self._index: Optional[InvertedIndex] = None
+        self._range_indexes: Optional[Dict[str, RangeIndex]] = None
+        self._payloads: Dict[Callable, ProductPayloads] = {}
+        self._index_lock = threading.Lock()
+
+    @staticmethod
+    def _number(value) -> float:
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return float(value)
+        return np.nan
+
+    @classmethod
+    def load(cls, path: str = CATALOG_PATH) -> "CatalogStore":
+        with open(path, 'rb') as f:
+            raw = f.read()
+        store = cls(json.loads(raw), version=hashlib.sha1(raw).hexdigest()[:16])
+        logger.info(f"Loaded {store.size} products from {path}")
+        return store
+
+    @property
+    def index(self) -> InvertedIndex:
+        """Posting lists over the attribute fields, built on first use."""
+        if self._index is None:
+            with self._index_lock:
+                if self._index is None:
+                    self._index = InvertedIndex(self.products)
+        return self._index
+
+    @property
+    def range_indexes(self) -> Dict[str, RangeIndex]:
+        """Sorted indexes over RANGE_INDEXED_FIELDS, built on first use."""
+        if self._range_indexes is None:
+            with self._index_lock:
+                if self._range_indexes is None:
+                    self._range_indexes = {field: RangeIndex(self.numeric[field]) for field in RANGE_INDEXED_FIELDS}
+        return self._range_indexes
+
+    def payloads(self, formatter: Callable[[Dict], Dict]) -> ProductPayloads:
+        """Every product's display payload for a formatter, serialized once per catalog."""
+        payloads = self._payloads.get(formatter)
+        if payloads is None:
+            with self._index_lock:
+                payloads = self._payloads.get(formatter)
+                if payloads is None:
+                    payloads = self._payloads[formatter] = ProductPayloads(self.products, formatter)
+        return payloads
+
+    def match_mask(self, field: str, value_matches: Callable[[str], bool]) -> np.ndarray:
+        return self.columns[field].match_mask(value_matches)
+
+    def range_mask(self, field: str, operator: str, bound, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """Vectorized comparison of a numeric column; missing values never match."""
+        column = self.numeric[field] if rows is None else self.numeric[field][rows]
+        return _COMPARISONS[operator](column, bound)
+
+    def query(self, plan) -> List[Dict]:
+        """
+        Products matching a CompiledFilter, in catalog order. Index terms give a
+        candidate bitmap from the posting lists and each range-indexed field a
+        slice of its sorted index; the smallest of these drives the query and
+        the others are applied to it. Remaining predicates run per product.
+        """
+        return self.take(self.query_positions(plan))
+
+    def query_positions(self, plan) -> np.ndarray:
+        """Positions of the products matching a CompiledFilter, ascending."""
+        bitmap = self.index.bitmap(plan.index_terms) if plan.index_terms else None
+        candidates = bitmap_count(bitmap) if bitmap is not None else self.size
+
+        conditions: Dict[str, list] = {}
+        column_terms = []
+        for field, operator, bound in plan.range_terms:
+            if field in RANGE_INDEXED_FIELDS:
+                conditions.setdefault(field, []).append((operator, bound))
+            else:
+                column_terms.append((field, operator, bound))
+        intervals = {field: self.range_indexes[field].interval(ops) for field, ops in conditions.items()}
+
+        driver = min(intervals, key=lambda f: intervals[f][1] - intervals[f][0], default=None)
+        if driver is not None and intervals[driver][1] - intervals[driver][0] < candidates:
+            positions = self.range_indexes[driver].positions(*intervals[driver])
+            if bitmap is not None and len(positions):
+                positions = positions[bitmap_to_mask(bitmap, self.size)[positions]]
+            for field, ops in conditions.items():
+                if field != driver:
+                    column_terms.extend((field, operator, bound) for operator, bound in ops)
+        else:
+            positions = bitmap_to_positions(bitmap, self.size) if bitmap is not None else np.arange(self.size)
+            column_terms.extend((field, operator, bound) for field, ops in conditions.items() for operator, bound in ops)
+
+        for field, operator, bound in column_terms:
+            if not len(positions):
+                break
+            positions = positions[self.range_mask(field, operator, bound, positions)]
+
+        if plan.predicates and len(positions):
+            keep = [plan.matches(self.products[i]) for i in positions.tolist()]
+            positions = positions[np.asarray(keep, dtype=bool)]
+        return positions
+
+    def facet_counts(self, rows: np.ndarray, fields: Sequence[str] = FACET_FIELDS,
+                     limit: int = FACET_LIMIT) -> Dict[str, Dict[Hashable, int]]:
+        """Facet value counts over a result set given as a boolean mask or positions."""
+        rows = np.asarray(rows)
+        bitmap = mask_to_bitmap(rows) if rows.dtype == bool else positions_to_bitmap(rows, self.size)
+        return self.index.facet_counts(bitmap, fields, limit or None)
+
+    def take(self, positions) -> List[Dict]:
+        return [self.products[i] for i in positions]
+
+
+_catalog: Optional[CatalogStore] = None
+_catalog_lock = threading.Lock()
+
+
+def get_catalog() -> CatalogStore:
+    """The process-wide catalog, loaded from CATALOG_PATH on first use."""
+    global _catalog
+    if _catalog is None:
+        with _catalog_lock:
+            if _catalog is None:
+                _catalog = CatalogStore.load(CATALOG_PATH)
+    return _catalog
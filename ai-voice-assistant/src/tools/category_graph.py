@@ -0,0 +1,63 @@
+"""
+Category Graph
+Category relationships for flexible matching, loaded once from configuration
+and precomputed into a category -> acceptable-categories map
+"""
+
+import json
+import logging
+import os
+from typing import Dict, FrozenSet, Iterable
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RELATIONSHIPS_PATH = os.path.normpath(
+    os.path.join(os.path.dirname(__file__), '..', 'config', 'category_relationships.json')
+)
+
+
+class CategoryGraph:
+    """
+    A search for category s accepts product category p when p == s, when p is
+    listed under s, or when s is listed under p. That relation is symmetric,
+    so each category gets one precomputed set of acceptable categories and a
+    match is a single set test instead of scanning the mappings both ways.
+    """
+
+    def __init__(self, mappings: Dict[str, Iterable[str]]):
+        acceptable: Dict[str, set] = {}
+        for category, related in mappings.items():
+            acceptable.setdefault(category, {category})
+            for other in related:
+                acceptable[category].add(other)
+                acceptable.setdefault(other, {other}).add(category)
+        self.acceptable: Dict[str, FrozenSet[str]] = {
+            category: frozenset(values) for category, values in acceptable.items()
+        }
+
+    def acceptable_for(self, category: str) -> FrozenSet[str]:
+        return self.acceptable.get(category) or frozenset((category,))
+
+    def related(self, search_categories: Iterable[str]) -> FrozenSet[str]:
+        """Every product category that matches any of the search categories."""
+        related = frozenset()
+        for category in search_categories:
+            related |= self.acceptable_for(category)
+        return related
+
+    def matches(self, product_category: str, search_categories) -> bool:
+        if isinstance(search_categories, str):
+            search_categories = (search_categories,)
+        return not self.acceptable_for(product_category).isdisjoint(search_categories)
+
+
+def load_category_graph(path: str = None) -> CategoryGraph:
+    """Read the relationships file (CATEGORY_RELATIONSHIPS_PATH); no relationships if unreadable."""
+    path = path or os.getenv('CATEGORY_RELATIONSHIPS_PATH', DEFAULT_RELATIONSHIPS_PATH)
+    try:
+        with open(path, encoding='utf-8') as f:
+            mappings = json.load(f)["related"]
+    except (OSError, ValueError, KeyError) as e:
+        logger.warning(f"Could not load category relationships from {path}: {e}")
+        mappings = {}
+    return CategoryGraph(mappings)
@@ -6,197 +6,54 @@ Takes JSON schema from intent analysis and uses it directly as MongoDB query fil
 
 import json
 import logging
+import os
 from typing import Dict, List, Any, Optional
 from crewai.tools import BaseTool
 from pydantic import BaseModel, Field
 
+from .catalog_store import FACET_LIMIT, NUMERIC_FIELDS, get_catalog, normalize_product
+from .category_graph import load_category_graph
+from .filter_compiler import FilterCompiler
+from .inverted_index import INDEXED_FIELDS
+from .mongo_backend import QUERY_BACKEND, MongoProductBackend
+from .payloads import DEBUG_FIELDS, dumps, render_response
+from .result_cache import ResultCache, normalize_schema, query_key
+
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Real product database - this matches the actual database content
-REAL_PRODUCTS = [
-    {
-        "_id": "prod_0903e8f3_001",
-        "name": "Floral Maxi Dress",
-        "description": "Beautiful floral maxi dress perfect for summer parties and casual outings.",
-        "price": 1299,
-        "discount": 200,
-        "gender": "women",
-        "type": "ethnicwear",
-        "category": "Dresses",
-        "pattern": "floral",
-        "occasion": ["party", "casual", "date"],
-        "colors": ["pink", "green"],
-        "sizes": ["S", "M", "L", "XL"],
-        "stock": 25,
-        "rating": 4.5,
-        "tags": ["floral", "dress", "summer", "party"],
-        "images": ["https://example.com/images/floral-maxi-dress.jpg"]
-    },
-    {
-        "_id": "prod_ee17977b_002",
-        "name": "Navy Blue Formal Shirt",
-        "description": "Classic navy blue formal shirt for office and business meetings.",
-        "price": 899,
-        "discount": 100,
-        "gender": "men",
-        "type": "topwear",
-        "category": "Formal",
-        "pattern": "solid",
-        "occasion": ["office", "formal"],
-        "colors": ["blue"],
-        "sizes": ["M", "L", "XL", "XXL"],
-        "stock": 40,
-        "rating": 4.2,
-        "tags": ["shirt", "formal", "blue", "office"],
-        "images": ["https://example.com/images/navy-formal-shirt.jpg"]
-    },
-    {
-        "_id": "prod_a4b8c7d2_003",
-        "name": "Black Leather Jacket",
-        "description": "Stylish black leather jacket for men, perfect for evening and casual outings.",
-        "price": 2599,
-        "discount": 300,
-        "gender": "men",
-        "type": "winterwear",
-        "category": "Jackets",
-        "pattern": "solid",
-        "occasion": ["evening", "casual", "party"],
-        "colors": ["black"],
-        "sizes": ["M", "L", "XL", "XXL"],
-        "stock": 15,
-        "rating": 4.7,
-        "tags": ["leather", "jacket", "black", "evening"],
-        "images": ["https://example.com/images/black-leather-jacket.jpg"]
-    },
-    {
-        "_id": "prod_f9e3a1b5_004",
-        "name": "Red Cotton T-Shirt",
-        "description": "Comfortable red cotton t-shirt for casual and daily wear.",
-        "price": 499,
-        "discount": 50,
-        "gender": "men",
-        "type": "topwear",
-        "category": "T-Shirts",
-        "pattern": "solid",
-        "occasion": ["casual", "daily"],
-        "colors": ["red"],
-        "sizes": ["S", "M", "L", "XL"],
-        "stock": 60,
-        "rating": 4.1,
-        "tags": ["tshirt", "red", "cotton", "casual"],
-        "images": ["https://example.com/images/red-cotton-tshirt.jpg"]
-    },
-    {
-        "_id": "prod_d5c2e8f7_005",
-        "name": "Blue Denim Jeans",
-        "description": "Classic blue denim jeans for men, suitable for casual and outdoor activities.",
-        "price": 1499,
-        "discount": 200,
-        "gender": "men",
-        "type": "bottomwear",
-        "category": "Casual",
-        "pattern": "solid",
-        "occasion": ["casual", "outdoor"],
-        "colors": ["blue"],
-        "sizes": ["M", "L", "XL", "XXL"],
-        "stock": 35,
-        "rating": 4.4,
-        "tags": ["jeans", "denim", "blue", "casual"],
-        "images": ["https://example.com/images/blue-denim-jeans.jpg"]
-    },
-    {
-        "_id": "prod_c7a9b4e1_006",
-        "name": "White Summer Dress",
-        "description": "Elegant white summer dress for women, perfect for beach and casual outings.",
-        "price": 899,
-        "discount": 100,
-        "gender": "women",
-        "type": "ethnicwear",
-        "category": "Dresses",
-        "pattern": "solid",
-        "occasion": ["beach", "summer", "casual"],
-        "colors": ["white"],
-        "sizes": ["S", "M", "L", "XL"],
-        "stock": 20,
-        "rating": 4.3,
-        "tags": ["dress", "white", "summer", "beach"],
-        "images": ["https://example.com/images/white-summer-dress.jpg"]
-    },
-    {
-        "_id": "prod_b8f4d6a3_007",
-        "name": "Grey Wool Sweater",
-        "description": "Warm grey wool sweater for winter and cold weather.",
-        "price": 1799,
-        "discount": 250,
-        "gender": "women",
-        "type": "winterwear",
-        "category": "Hoodies",
-        "pattern": "solid",
-        "occasion": ["winter", "casual"],
-        "colors": ["grey"],
-        "sizes": ["S", "M", "L", "XL"],
-        "stock": 18,
-        "rating": 4.6,
-        "tags": ["sweater", "grey", "wool", "winter"],
-        "images": ["https://example.com/images/grey-wool-sweater.jpg"]
-    },
-    {
-        "_id": "prod_a3e7f2c9_008",
-        "name": "Green Cargo Pants",
-        "description": "Durable green cargo pants for men, ideal for outdoor and trekking activities.",
-        "price": 1199,
-        "discount": 150,
-        "gender": "men",
-        "type": "bottomwear",
-        "category": "Outdoor",
-        "pattern": "solid",
-        "occasion": ["trekking", "casual", "outdoor"],
-        "colors": ["green"],
-        "sizes": ["M", "L", "XL", "XXL"],
-        "stock": 30,
-        "rating": 4.3,
-        "tags": ["cargo", "pants", "green", "outdoor"],
-        "images": ["https://example.com/images/green-cargo-pants.jpg"]
-    },
-    {
-        "_id": "prod_efc0b78d_009",
-        "name": "Pink Hoodie for Girls",
-        "description": "Cozy pink hoodie for girls, perfect for winter and home wear.",
-        "price": 799,
-        "discount": 100,
-        "gender": "kids",
-        "type": "winterwear",
-        "category": "Hoodies",
-        "pattern": "solid",
-        "occasion": ["winter", "home", "casual"],
-        "colors": ["pink"],
-        "sizes": ["S", "M", "L"],
-        "stock": 45,
-        "rating": 4.5,
-        "tags": ["hoodie", "pink", "winter", "girls"],
-        "images": ["https://example.com/images/pink-girls-hoodie.jpg"]
-    },
-    {
-        "_id": "prod_0b5e4421_010",
-        "name": "Printed Palazzo Pants",
-        "description": "Comfortable printed palazzo pants for daily and casual wear.",
-        "price": 599,
-        "discount": 80,
-        "gender": "women",
-        "type": "bottomwear",
-        "category": "Casual Wear",
-        "pattern": "printed",
-        "occasion": ["daily", "casual", "home"],
-        "colors": ["purple", "white"],
-        "sizes": ["S", "M", "L", "XL"],
-        "stock": 40,
-        "rating": 4.1,
-        "tags": ["palazzo", "printed", "comfortable", "daily"],
-        "images": ["https://example.com/images/printed-palazzo-pants.jpg"]
+# Real product database - the shared catalog loaded from data/ecommerce.products.json
+CATALOG = get_catalog()
+REAL_PRODUCTS = CATALOG.products
+
+
+def format_product(product: Dict) -> Dict:
+    """Display payload of a product in query results"""
+    return {
+        "id": product.get("_id"),
+        "name": product.get("name"),
+        "price": product.get("price"),
+        "discount": product.get("discount", 0),
+        "final_price": product.get("final_price"),
+        "description": product.get("description"),
+        "colors": product.get("colors"),
+        "sizes": product.get("sizes"),
+        "rating": product.get("rating"),
+        "stock": product.get("stock"),
+        "category": product.get("category"),
+        "gender": product.get("gender"),
+        "occasion": product.get("occasion"),
+        "pattern": product.get("pattern")
     }
-]
+
+
+# Serialized once here, at catalog load, and spliced into every response
+PRODUCT_PAYLOADS = CATALOG.payloads(format_product)
+
+# Fields format_product reads, fetched from MongoDB instead of whole documents
+PRODUCT_PROJECTION = ('_id', 'name', 'price', 'discount', 'description', 'colors', 'sizes',
+                      'rating', 'stock', 'category', 'gender', 'occasion', 'pattern')
 
 
 class DirectMongoDBQueryInput(BaseModel):
@@ -204,6 +61,32 @@ class DirectMongoDBQueryInput(BaseModel):
     schema_json: str = Field(..., description="JSON schema from intent analysis to use as MongoDB query filter")
 
 
+# Category relationships, precomputed once into per-category acceptable sets
+CATEGORY_GRAPH = load_category_graph()
+
+# Filters compile once per query shape into index terms (answered from the
+# catalog's posting lists), numeric range terms and cheapest-first predicates
+FILTER_COMPILER = FilterCompiler(
+    indexed_fields=INDEXED_FIELDS,
+    range_fields=NUMERIC_FIELDS,
+    flexible={'category': (CATEGORY_GRAPH.related, CATEGORY_GRAPH.matches)},
+    max_size=int(os.getenv('QUERY_PLAN_CACHE_SIZE', '256')),
+)
+
+# With PRODUCT_QUERY_BACKEND=mongo filters run on MONGO_URI; the pool connects
+# and creates the product indexes in the background at startup
+MONGO_BACKEND = None
+if QUERY_BACKEND == 'mongo':
+    MONGO_BACKEND = MongoProductBackend(flexible={'category': CATEGORY_GRAPH.related})
+    MONGO_BACKEND.start()
+
+# Responses for repeated schemas, invalidated when the catalog changes. Values
+# match case-sensitively here, so the cache key keeps their case. Only the
+# in-process catalog is cached: other processes write to MongoDB without this
+# one seeing a version change.
+RESULT_CACHE = ResultCache()
+
+
 class DirectMongoDBQueryTool(BaseTool):
     """
     Tool that takes JSON schema from intent analysis and uses it directly as MongoDB query filter
@@ -216,9 +99,13 @@ class DirectMongoDBQueryTool(BaseTool):
     )
     args_schema: type[BaseModel] = DirectMongoDBQueryInput
     
-    def _run(self, schema_json: str) -> str:
+    def _run(self, schema_json: str, limit: Optional[int] = None, debug: bool = DEBUG_FIELDS,
+             facets: bool = True) -> str:
         """
         Execute direct MongoDB query using the schema JSON
+        At most `limit` products are fetched (all when unset); facet counts
+        cover every match. With debug=True the filter and schema are echoed
+        and the output indented
         """
         try:
             # Parse the JSON schema
@@ -229,46 +116,50 @@ class DirectMongoDBQueryTool(BaseTool):
             
             logger.info(f"🔍 Direct MongoDB Query Input: {schema}")
             
+            # Results are computed from (and cached under) the normalized schema.
+            # Debug responses echo the caller's raw schema, so they are not cached
+            normalized = normalize_schema(schema, lowercase=False)
+            use_cache = MONGO_BACKEND is None and not debug
+            version = CATALOG.version
+            cache_key = query_key(normalized, limit, facets)
+            cached = RESULT_CACHE.get(cache_key, version) if use_cache else None
+            if cached is not None:
+                logger.info("✅ Direct MongoDB Query served from result cache")
+                return cached
+            
             # Build MongoDB query filter from schema
-            mongo_filter = self._build_mongo_filter(schema)
+            mongo_filter = self._build_mongo_filter(normalized)
             
             logger.info(f"🔍 MongoDB Filter: {mongo_filter}")
             
-            # Execute query on our product database
-            results = self._execute_query(mongo_filter)
-            
-            # Format results
-            formatted_results = []
-            for product in results:
-                formatted_product = {
-                    "id": product["_id"],
-                    "name": product["name"],
-                    "price": product["price"],
-                    "discount": product.get("discount", 0),
-                    "final_price": product["price"] - product.get("discount", 0),
-                    "description": product["description"],
-                    "colors": product["colors"],
-                    "sizes": product["sizes"],
-                    "rating": product["rating"],
-                    "stock": product["stock"],
-                    "category": product["category"],
-                    "gender": product["gender"],
-                    "occasion": product["occasion"],
-                    "pattern": product["pattern"]
-                }
-                formatted_results.append(formatted_product)
-            
-            result = {
+            # Execute query on MongoDB, or on the in-process catalog whose
+            # payloads were serialized at load
+            if MONGO_BACKEND is not None:
+                documents = MONGO_BACKEND.run(MONGO_BACKEND.find(mongo_filter, PRODUCT_PROJECTION, limit or 0))
+                products = [dumps(format_product(normalize_product(doc))) for doc in documents]
+                facet_counts = MONGO_BACKEND.run(MONGO_BACKEND.facet_counts(mongo_filter, limit=FACET_LIMIT)) if facets else None
+            else:
+                positions = self._execute_query_positions(mongo_filter)
+                facet_counts = CATALOG.facet_counts(positions) if facets else None
+                if limit:
+                    positions = positions[:limit]
+                products = [PRODUCT_PAYLOADS[i] for i in positions.tolist()]
+            fields = {
                 "success": True,
-                "products": formatted_results,
-                "count": len(formatted_results),
-                "mongo_filter": mongo_filter,
-                "original_schema": schema,
-                "message": f"Found {len(formatted_results)} products using direct MongoDB query"
+                "count": len(products),
+                "message": f"Found {len(products)} products using direct MongoDB query"
             }
+            if facets:
+                fields["facets"] = facet_counts
+            if debug:
+                fields["mongo_filter"] = mongo_filter
+                fields["original_schema"] = schema
             
-            logger.info(f"✅ Direct MongoDB Query Success: {len(formatted_results)} products found")
-            return json.dumps(result, indent=2)
+            logger.info(f"✅ Direct MongoDB Query Success: {len(products)} products found")
+            response = render_response(products, debug=debug, **fields)
+            if use_cache:
+                RESULT_CACHE.put(cache_key, version, response)
+            return response
             
         except Exception as e:
             logger.error(f"❌ Direct MongoDB Query failed: {e}")
@@ -369,21 +260,47 @@ class DirectMongoDBQueryTool(BaseTool):
         # Min rating shortcut
         if 'min_rating' in schema:
             mongo_filter['rating'] = {"$gte": schema['min_rating']}
-        
+
+        # Final price (price minus discount) range mapping
+        if 'final_price' in schema and isinstance(schema['final_price'], dict):
+            final_price_filter = {}
+            if 'min' in schema['final_price']:
+                final_price_filter['$gte'] = schema['final_price']['min']
+            if 'max' in schema['final_price']:
+                final_price_filter['$lte'] = schema['final_price']['max']
+            if final_price_filter:
+                mongo_filter['final_price'] = final_price_filter
+
+        if 'min_final_price' in schema:
+            mongo_filter['final_price'] = mongo_filter.get('final_price', {})
+            mongo_filter['final_price']['$gte'] = schema['min_final_price']
+
+        if 'max_final_price' in schema:
+            mongo_filter['final_price'] = mongo_filter.get('final_price', {})
+            mongo_filter['final_price']['$lte'] = schema['max_final_price']
+
+        # Stock filters
+        if schema.get('in_stock'):
+            mongo_filter['stock'] = {"$gt": 0}
+
+        if 'min_stock' in schema:
+            mongo_filter['stock'] = {"$gte": schema['min_stock']}
+
         return mongo_filter
     
     def _execute_query(self, mongo_filter: Dict) -> List[Dict]:
         """
         Execute the MongoDB-style query on our product database
-        This simulates MongoDB's find() operation
+        This simulates MongoDB's find() operation: the filter is compiled (or
+        fetched from the plan cache), attribute conditions are resolved from the
+        inverted index, price/rating/stock ranges from the sorted range indexes, and the
+        remaining predicates run on those candidates only
         """
-        results = []
-        
-        for product in REAL_PRODUCTS:
-            if self._matches_filter(product, mongo_filter):
-                results.append(product)
-        
-        return results
+        return CATALOG.take(self._execute_query_positions(mongo_filter))
+
+    def _execute_query_positions(self, mongo_filter: Dict):
+        """Catalog positions of the products matching the filter"""
+        return CATALOG.query_positions(FILTER_COMPILER.compile(mongo_filter))
     
     def _matches_filter(self, product: Dict, mongo_filter: Dict) -> bool:
         """
@@ -445,33 +362,7 @@ class DirectMongoDBQueryTool(BaseTool):
         """
         Flexible category matching that considers related categories
         """
-        # Direct match first
-        if product_category in search_categories:
-            return True
-        
-        # Category mappings for flexible matching
-        category_mappings = {
-            'T-Shirts': ['Formal', 'Casual', 'T-Shirts'],  # T-shirts can be formal or casual
-            'Shirts': ['Formal', 'Casual', 'T-Shirts'],
-            'Dresses': ['Dresses', 'Ethnic Wear', 'Casual'],
-            'Jackets': ['Jackets', 'Winterwear', 'Casual'],
-            'Pants': ['Casual', 'Formal', 'Outdoor'],
-            'Jeans': ['Casual', 'Outdoor']
-        }
-        
-        # Check if any of the search categories map to the product category
-        for search_cat in search_categories:
-            if search_cat in category_mappings:
-                if product_category in category_mappings[search_cat]:
-                    return True
-        
-        # Check reverse mapping - if product category maps to search categories
-        if product_category in category_mappings:
-            for search_cat in search_categories:
-                if search_cat in category_mappings[product_category]:
-                    return True
-        
-        return False
+        return CATEGORY_GRAPH.matches(product_category, search_categories)
 
 
 # Create tool instance
@@ -0,0 +1,135 @@
+"""
+Embedding Cache
+Bounded LRU cache of text -> embedding that sits in front of a sentence encoder
+"""
+
+import atexit
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingCache:
+    """
+    LRU cache of text embeddings. Only texts that are not cached are sent to the
+    encoder, and they are sent together in one batch. With a persist_path the cache
+    is loaded on start and saved on exit, so warm restarts skip encoding entirely.
+    """
+
+    def __init__(
+        self,
+        encode_fn: Callable[[List[str]], np.ndarray],
+        max_size: int = 10000,
+        persist_path: Optional[str] = None,
+        namespace: str = "",
+    ):
+        self._encode_fn = encode_fn
+        self.max_size = max_size
+        self.persist_path = persist_path
+        # Persisted entries are only reused when the namespace (e.g. model name) matches
+        self.namespace = namespace
+        self._entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        if persist_path:
+            self.load()
+            atexit.register(self.save)
+
+    def encode(self, texts: Sequence[str]) -> np.ndarray:
+        """Return embeddings for texts, encoding cache misses in a single batch."""
+        texts = list(texts)
+        results: List[Optional[np.ndarray]] = [None] * len(texts)
+        missing: Dict[str, List[int]] = {}
+
+        with self._lock:
+            for i, text in enumerate(texts):
+                embedding = self._entries.get(text)
+                if embedding is not None:
+                    self._entries.move_to_end(text)
+                    self.hits += 1
+                    results[i] = embedding
+                else:
+                    self.misses += 1
+                    missing.setdefault(text, []).append(i)
+
+        if missing:
+            encoded = self._encode_fn(list(missing))
+            with self._lock:
+                for text, embedding in zip(missing, encoded):
+                    for i in missing[text]:
+                        results[i] = embedding
+                    self._put(text, embedding)
+
+        if not results:
+            return np.empty((0, 0), dtype=np.float32)
+        return np.stack(results)
+
+    def _put(self, text: str, embedding: np.ndarray):
+        self._entries[text] = embedding
+        self._entries.move_to_end(text)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "persist_path": self.persist_path,
+            }
+
+    def save(self, path: Optional[str] = None):
+        """Write the cache to an .npz file (atomically replaced)."""
+        path = path or self.persist_path
+        if not path:
+            return
+        with self._lock:
+            texts = list(self._entries)
+            embeddings = np.stack([self._entries[t] for t in texts]) if texts else np.empty((0, 0))
+        tmp_path = f"{path}.tmp.npz"
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            np.savez(tmp_path, texts=np.array(texts, dtype=str), embeddings=embeddings,
+                     namespace=np.array(self.namespace))
+            os.replace(tmp_path, path)
+            logger.info(f"Saved {len(texts)} cached embeddings to {path}")
+        except OSError as e:
+            logger.warning(f"Could not save embedding cache to {path}: {e}")
+
+    def load(self, path: Optional[str] = None):
+        """Load a cache previously written by save(); ignored if the namespace differs."""
+        path = path or self.persist_path
+        if not path or not os.path.exists(path):
+            return
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                if str(data["namespace"]) != self.namespace:
+                    logger.info(f"Ignoring embedding cache {path}: built for '{data['namespace']}'")
+                    return
+                texts, embeddings = data["texts"], data["embeddings"]
+        except (OSError, KeyError, ValueError) as e:
+            logger.warning(f"Could not load embedding cache from {path}: {e}")
+            return
+        with self._lock:
+            for text, embedding in zip(texts[-self.max_size:], embeddings[-self.max_size:]):
+                self._entries[str(text)] = embedding
+        logger.info(f"Loaded {len(self._entries)} cached embeddings from {path}")
@@ -0,0 +1,245 @@
+"""
+Filter Compiler
+Turns Mongo-style filter dicts into cached plans: posting-list lookups for
+indexed attributes plus specialized predicate closures for everything else
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Iterable, Optional, Tuple
+
+# Relative cost of each predicate kind; plans evaluate the cheapest first
+_COST_SCALAR = 1
+_COST_FLEXIBLE = 2
+_COST_MEMBERSHIP = 3
+_COST_GENERIC = 4
+
+_SET_TYPES = (list, tuple, set, frozenset)
+
+
+def canonical_filter(value) -> Hashable:
+    """Hashable form of a filter, independent of dict key order."""
+    if isinstance(value, dict):
+        return ('dict', tuple(sorted((str(k), canonical_filter(v)) for k, v in value.items())))
+    if isinstance(value, (list, tuple)):
+        return ('list', tuple(canonical_filter(v) for v in value))
+    if isinstance(value, (set, frozenset)):
+        return ('set', tuple(sorted((canonical_filter(v) for v in value), key=repr)))
+    return (type(value).__name__, value)
+
+
+def _lookup(values):
+    """A frozenset for fast membership when possible, else the values as given."""
+    if isinstance(values, _SET_TYPES):
+        try:
+            return frozenset(values)
+        except TypeError:
+            return values
+    return values
+
+
+def _present(field):
+    def predicate(product):
+        return product.get(field) is not None
+    return predicate
+
+
+def _equals(field, expected):
+    def predicate(product):
+        value = product.get(field)
+        if value is None:
+            return False
+        if isinstance(value, list):
+            return expected in value
+        return value == expected
+    return predicate
+
+
+def _in(field, values):
+    lookup = _lookup(values)
+
+    def predicate(product):
+        value = product.get(field)
+        if value is None:
+            return False
+        if isinstance(value, list):
+            return any(item in lookup for item in value)
+        return value in lookup
+    return predicate
+
+
+def _flexible(field, values, related_fn, match_fn):
+    """Membership in the precomputed set of related values; other shapes use match_fn."""
+    related = None
+    if isinstance(values, _SET_TYPES):
+        try:
+            related = frozenset(related_fn(list(values)))
+        except TypeError:
+            pass
+
+    def predicate(product):
+        value = product.get(field)
+        if value is None:
+            return False
+        if related is not None and isinstance(value, str):
+            return value in related
+        return match_fn(value, values)
+    return predicate
+
+
+def _compare(field, operator, bound):
+    if operator == '$gte':
+        def predicate(product):
+            value = product.get(field)
+            return value is not None and not value < bound
+    elif operator == '$lte':
+        def predicate(product):
+            value = product.get(field)
+            return value is not None and not value > bound
+    elif operator == '$gt':
+        def predicate(product):
+            value = product.get(field)
+            return value is not None and not value <= bound
+    else:
+        def predicate(product):
+            value = product.get(field)
+            return value is not None and not value >= bound
+    return predicate
+
+
+class CompiledFilter:
+    """
+    A filter ready to run: index_terms are (field, values) pairs answered from
+    posting lists, range_terms are (field, operator, bound) comparisons run on
+    numeric columns, predicates are the remaining checks in cheapest-first order.
+    """
+
+    __slots__ = ('index_terms', 'range_terms', 'predicates')
+
+    def __init__(self, index_terms: Tuple, predicates: Tuple[Callable[[Dict], bool], ...],
+                 range_terms: Tuple = ()):
+        self.index_terms = index_terms
+        self.range_terms = range_terms
+        self.predicates = predicates
+
+    def matches(self, product: Dict) -> bool:
+        for predicate in self.predicates:
+            if not predicate(product):
+                return False
+        return True
+
+
+class FilterCompiler:
+    """
+    Compiles the output of DirectMongoDBQueryTool._build_mongo_filter with the
+    same semantics as _matches_filter. Plans are kept in an LRU keyed by the
+    canonicalized filter, so repeated query shapes skip compilation entirely.
+
+    indexed_fields: equality/$in on these fields become index terms.
+    range_fields: numeric comparisons on these fields become range terms.
+    flexible: field -> (related_fn, match_fn) for fields such as category whose
+              values also match related values.
+    """
+
+    def __init__(
+        self,
+        indexed_fields: Iterable[str] = (),
+        range_fields: Iterable[str] = (),
+        flexible: Optional[Dict[str, Tuple[Callable, Callable]]] = None,
+        max_size: int = 256,
+    ):
+        self.indexed_fields = frozenset(indexed_fields)
+        self.range_fields = frozenset(range_fields)
+        self.flexible = flexible or {}
+        self.max_size = max_size
+        self._plans: "OrderedDict[Hashable, CompiledFilter]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def compile(self, mongo_filter: Dict) -> CompiledFilter:
+        key = canonical_filter(mongo_filter)
+        with self._lock:
+            plan = self._plans.get(key)
+            if plan is not None:
+                self._plans.move_to_end(key)
+                self.hits += 1
+                return plan
+            self.misses += 1
+        plan = self._compile(mongo_filter)
+        with self._lock:
+            self._plans[key] = plan
+            self._plans.move_to_end(key)
+            while len(self._plans) > self.max_size:
+                self._plans.popitem(last=False)
+        return plan
+
+    def _index_values(self, field, condition):
+        """Values an indexed field must match, or None if the index can't answer it."""
+        if field not in self.indexed_fields:
+            return None
+        if isinstance(condition, dict):
+            if set(condition) != {'$in'} or not isinstance(condition['$in'], _SET_TYPES):
+                return None
+            values = list(condition['$in'])
+        else:
+            values = [condition]
+        try:
+            if field in self.flexible:
+                values = self.flexible[field][0](values)
+            return frozenset(values)
+        except TypeError:
+            return None
+
+    def _compile(self, mongo_filter: Dict) -> CompiledFilter:
+        index_terms = []
+        range_terms = []
+        predicates = []
+        for field, condition in mongo_filter.items():
+            values = self._index_values(field, condition)
+            if values is not None:
+                index_terms.append((field, values))
+            elif isinstance(condition, dict):
+                if not condition:
+                    predicates.append((_COST_SCALAR, _present(field)))
+                for operator, value in condition.items():
+                    if operator == '$in':
+                        if field in self.flexible:
+                            related_fn, match_fn = self.flexible[field]
+                            predicates.append((_COST_FLEXIBLE, _flexible(field, value, related_fn, match_fn)))
+                        else:
+                            predicates.append((_COST_MEMBERSHIP, _in(field, value)))
+                    elif operator in ('$gte', '$lte', '$gt', '$lt'):
+                        if (field in self.range_fields and isinstance(value, (int, float))
+                                and not isinstance(value, bool)):
+                            range_terms.append((field, operator, value))
+                        else:
+                            predicates.append((_COST_SCALAR, _compare(field, operator, value)))
+                    else:
+                        # Unknown operators only require the field to be present
+                        predicates.append((_COST_SCALAR, _present(field)))
+            elif field in self.flexible:
+                related_fn, match_fn = self.flexible[field]
+                predicates.append((_COST_FLEXIBLE, _flexible(field, [condition], related_fn, match_fn)))
+            else:
+                predicates.append((_COST_GENERIC if isinstance(condition, _SET_TYPES) else _COST_SCALAR,
+                                   _equals(field, condition)))
+        predicates.sort(key=lambda item: item[0])
+        return CompiledFilter(
+            tuple(index_terms), tuple(predicate for _, predicate in predicates), tuple(range_terms)
+        )
+
+    def clear(self):
+        with self._lock:
+            self._plans.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._plans),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
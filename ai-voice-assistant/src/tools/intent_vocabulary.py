@@ -0,0 +1,152 @@
+"""
+Intent Vocabulary
+Schema values derived from the product catalog, with an append-only embedding matrix
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Product fields the intent analyzer extracts, in the order they are reported
+SCHEMA_FIELDS = ('gender', 'type', 'category', 'pattern', 'occasion', 'colors', 'tags')
+
+
+def schema_from_products(products: Sequence[Dict], fields: Sequence[str] = SCHEMA_FIELDS) -> Dict[str, List[str]]:
+    """Distinct values per field across the catalog, in first-seen order."""
+    schema = {field: {} for field in fields}
+    for product in products:
+        for field in fields:
+            value = product.get(field)
+            for item in value if isinstance(value, list) else [value]:
+                if isinstance(item, str) and item:
+                    schema[field].setdefault(item, None)
+    return {field: list(values) for field, values in schema.items()}
+
+
+def _l2_normalize(embeddings):
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return embeddings / norms
+
+
+class VocabularyLayout:
+    """Immutable view used by matching: the embedding matrix plus per-key row indexes."""
+
+    def __init__(self, schema: Dict[str, List[str]], matrix: np.ndarray, key_rows: Dict[str, np.ndarray]):
+        self.schema = schema
+        self.keys = list(schema)
+        self.matrix = matrix
+        self.key_rows = [key_rows[key] for key in self.keys]
+
+    def key_embeddings(self, key: str) -> np.ndarray:
+        return self.matrix[self.key_rows[self.keys.index(key)]]
+
+
+class IntentVocabulary:
+    """
+    Keeps one L2-normalized embedding row per distinct schema value. When the
+    schema changes, only values never seen before are encoded and appended;
+    existing rows are reused. Each key selects its values by row index, so values
+    shared between keys (e.g. "party" in occasion and tags) are stored once.
+    Rows can be persisted per encoder so restarts encode nothing.
+    """
+
+    def __init__(
+        self,
+        encode_fn: Callable[[List[str]], np.ndarray],
+        store_dir: Optional[str] = None,
+        encoder_id: str = "",
+    ):
+        self._encode_fn = encode_fn
+        self.encoder_id = encoder_id
+        self.store_path = None
+        if store_dir:
+            digest = hashlib.sha1(encoder_id.encode('utf-8')).hexdigest()[:16]
+            self.store_path = os.path.join(store_dir, f"value_embeddings_{digest}")
+        self._lock = threading.Lock()
+        self._values: List[str] = []
+        self._row_of: Dict[str, int] = {}
+        self._buffer: Optional[np.ndarray] = None
+        self._loaded = False
+        self.layout: Optional[VocabularyLayout] = None
+        self.encoded_values = 0
+
+    def update(self, schema: Dict[str, List[str]]) -> int:
+        """Switch to a new schema, encoding only unseen values. Returns how many were encoded."""
+        with self._lock:
+            if not self._loaded:
+                self._load()
+                self._loaded = True
+            new_values = list(dict.fromkeys(
+                value for values in schema.values() for value in values if value not in self._row_of
+            ))
+            if new_values:
+                embeddings = _l2_normalize(np.asarray(self._encode_fn(new_values), dtype=np.float32))
+                self._append(new_values, embeddings)
+                self.encoded_values += len(new_values)
+                self._save()
+            key_rows = {
+                key: np.fromiter((self._row_of[v] for v in values), dtype=np.intp, count=len(values))
+                for key, values in schema.items()
+            }
+            self.layout = VocabularyLayout(
+                {key: list(values) for key, values in schema.items()},
+                self._buffer[:len(self._values)],
+                key_rows,
+            )
+            return len(new_values)
+
+    def _append(self, values: List[str], embeddings: np.ndarray):
+        count = len(self._values)
+        needed = count + len(values)
+        if self._buffer is None or needed > len(self._buffer) or not self._buffer.flags.writeable:
+            # Grow geometrically so repeated small appends stay amortised O(new values)
+            capacity = max(needed, 2 * len(self._buffer) if self._buffer is not None else 0, 64)
+            grown = np.empty((capacity, embeddings.shape[1]), dtype=np.float32)
+            if count:
+                grown[:count] = self._buffer[:count]
+            self._buffer = grown
+        self._buffer[count:needed] = embeddings
+        for offset, value in enumerate(values):
+            self._row_of[value] = count + offset
+        self._values.extend(values)
+
+    def _load(self):
+        if not self.store_path or not os.path.exists(f"{self.store_path}.npy"):
+            return
+        try:
+            with open(f"{self.store_path}.json", encoding='utf-8') as f:
+                meta = json.load(f)
+            if meta.get('encoder_id') != self.encoder_id:
+                return
+            # Memory-mapped until the first append copies it into a growable buffer
+            matrix = np.load(f"{self.store_path}.npy", mmap_mode='r')
+            values = meta['values'][:len(matrix)]
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Could not load value embeddings from {self.store_path}: {e}")
+            return
+        self._buffer = matrix
+        self._values = list(values)
+        self._row_of = {value: row for row, value in enumerate(self._values)}
+        logger.info(f"Loaded {len(self._values)} value embeddings from {self.store_path}.npy")
+
+    def _save(self):
+        if not self.store_path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.store_path), exist_ok=True)
+            tmp = f"{self.store_path}.{os.getpid()}.tmp"
+            np.save(f"{tmp}.npy", self._buffer[:len(self._values)])
+            with open(f"{tmp}.json", 'w', encoding='utf-8') as f:
+                json.dump({'encoder_id': self.encoder_id, 'values': self._values}, f)
+            os.replace(f"{tmp}.npy", f"{self.store_path}.npy")
+            os.replace(f"{tmp}.json", f"{self.store_path}.json")
+        except OSError as e:
+            logger.warning(f"Could not persist value embeddings to {self.store_path}: {e}")
@@ -0,0 +1,121 @@
+"""
+Inverted Index
+In-memory posting lists (bitmaps) per attribute value, answering Mongo-style
+equality / $in filters by set union and intersection instead of a catalog scan
+"""
+
+import logging
+from typing import Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Attribute fields with a posting list per distinct value
+INDEXED_FIELDS = ('gender', 'type', 'pattern', 'category', 'colors', 'occasion', 'tags', 'sizes')
+# Indexed fields whose value counts are returned next to search results
+FACET_FIELDS = ('colors', 'sizes', 'category', 'gender', 'pattern', 'occasion')
+
+
+def positions_to_bitmap(positions: Sequence[int], size: int) -> int:
+    """Bitmap (Python int, bit i = product i) from sorted positions, built in O(size)."""
+    flags = np.zeros(size, dtype=bool)
+    flags[np.asarray(positions, dtype=np.intp)] = True
+    return mask_to_bitmap(flags)
+
+
+def mask_to_bitmap(mask: np.ndarray) -> int:
+    """Bitmap with bit i set where the boolean mask is True."""
+    return int.from_bytes(np.packbits(mask, bitorder='little').tobytes(), 'little')
+
+
+def bitmap_to_mask(bitmap: int, size: int) -> np.ndarray:
+    """Boolean array with True at the set bits."""
+    raw = np.frombuffer(bitmap.to_bytes((size + 7) // 8, 'little'), dtype=np.uint8)
+    return np.unpackbits(raw, count=size, bitorder='little').view(bool)
+
+
+def bitmap_to_positions(bitmap: int, size: int) -> np.ndarray:
+    """Ascending positions of the set bits."""
+    if not bitmap:
+        return np.empty(0, dtype=np.intp)
+    return np.flatnonzero(bitmap_to_mask(bitmap, size))
+
+
+def bitmap_count(bitmap: int) -> int:
+    """Number of set bits."""
+    return bitmap.bit_count() if hasattr(bitmap, 'bit_count') else bin(bitmap).count('1')
+
+
+class InvertedIndex:
+    """
+    One bitmap per (field, value) over the catalog, where bit i is set when
+    product i has that value (scalar fields) or contains it (array fields).
+    Equality and $in on an indexed field become the OR of the values' bitmaps,
+    and the filter is the AND across fields, so the Python work per query is
+    proportional to the number of filter values, not the catalog size.
+
+    Conditions the index cannot answer (price/rating ranges, unindexed fields)
+    are applied by CatalogStore.query to the candidates only.
+    """
+
+    def __init__(self, products: Sequence[Dict], fields: Iterable[str] = INDEXED_FIELDS):
+        self.products = products
+        self.size = len(products)
+        self.fields = tuple(fields)
+        self.postings: Dict[str, Dict[Hashable, int]] = {}
+        # Number of products per (field, value): the facet counts of the whole catalog
+        self.cardinality: Dict[str, Dict[Hashable, int]] = {}
+
+        positions: Dict[str, Dict[Hashable, List[int]]] = {field: {} for field in self.fields}
+        for i, product in enumerate(products):
+            for field in self.fields:
+                value = product.get(field)
+                if value is None:
+                    continue
+                for item in (value if isinstance(value, list) else (value,)):
+                    try:
+                        postings = positions[field].setdefault(item, [])
+                    except TypeError:
+                        continue
+                    if not postings or postings[-1] != i:
+                        postings.append(i)
+        for field, values in positions.items():
+            self.postings[field] = {
+                value: positions_to_bitmap(rows, self.size) for value, rows in values.items()
+            }
+            self.cardinality[field] = {value: len(rows) for value, rows in values.items()}
+
+    def bitmap(self, index_terms: Iterable[Tuple[str, Iterable[Hashable]]]) -> int:
+        """Products that have, for every (field, values) term, at least one of the values."""
+        bitmap = (1 << self.size) - 1
+        for field, values in index_terms:
+            postings = self.postings[field]
+            term_bitmap = 0
+            for value in values:
+                term_bitmap |= postings.get(value, 0)
+            bitmap &= term_bitmap
+            if not bitmap:
+                break
+        return bitmap
+
+    def facet_counts(self, bitmap: int, fields: Iterable[str] = FACET_FIELDS,
+                     limit: Optional[int] = None) -> Dict[str, Dict[Hashable, int]]:
+        """
+        field -> {value: number of products in bitmap having it}, most frequent
+        first (at most limit values per field). Each count is the popcount of
+        the result bitmap AND one posting list, so no product is revisited.
+        """
+        everything = bitmap == (1 << self.size) - 1
+        facets = {}
+        for field in fields:
+            if everything:
+                counts = list(self.cardinality[field].items())
+            elif bitmap:
+                counts = [(value, bitmap_count(bitmap & posting)) for value, posting in self.postings[field].items()]
+                counts = [(value, count) for value, count in counts if count]
+            else:
+                counts = []
+            counts.sort(key=lambda item: (-item[1], str(item[0])))
+            facets[field] = dict(counts[:limit] if limit else counts)
+        return facets
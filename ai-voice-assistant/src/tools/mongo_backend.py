@@ -0,0 +1,319 @@
+"""
+MongoDB Backend
+Runs DirectMongoDBQueryTool filters against MongoDB through a pooled async Motor
+client: projections and limits pushed down to the server, the indexes the filter
+shapes need created at startup, and pool / latency metrics
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Iterable, List, Optional
+
+from pymongo import ASCENDING, IndexModel, monitoring
+
+from .inverted_index import FACET_FIELDS
+
+logger = logging.getLogger(__name__)
+
+# 'memory' answers filters from the in-process catalog, 'mongo' from MONGO_URI
+QUERY_BACKEND = os.getenv('PRODUCT_QUERY_BACKEND', 'memory')
+MONGO_URI = os.getenv('MONGO_URI', 'mongodb://localhost:27017')
+MONGO_DATABASE = os.getenv('MONGO_DATABASE', 'ecommerce')
+MONGO_PRODUCTS_COLLECTION = os.getenv('MONGO_PRODUCTS_COLLECTION', 'products')
+MONGO_MAX_POOL_SIZE = int(os.getenv('MONGO_MAX_POOL_SIZE', '10'))
+MONGO_MIN_POOL_SIZE = int(os.getenv('MONGO_MIN_POOL_SIZE', '1'))
+MONGO_TIMEOUT_MS = int(os.getenv('MONGO_TIMEOUT_MS', '30000'))
+
+# Compound indexes for the filter shapes _build_mongo_filter produces: equality
+# fields first, then the price range. At most one array (multikey) field each.
+PRODUCT_INDEXES = (
+    ('gender', 'category', 'price'),
+    ('gender', 'type', 'price'),
+    ('category', 'price'),
+    ('colors', 'gender', 'price'),
+    ('occasion', 'gender'),
+    ('sizes', 'gender'),
+    ('tags',),
+    ('pattern',),
+    ('price',),
+    ('rating',),
+    ('stock',),
+)
+
+_COMPARISONS = ('$gte', '$lte', '$gt', '$lt')
+_FINAL_PRICE = {'$subtract': ['$price', {'$ifNull': ['$discount', 0]}]}
+
+
+def translate_filter(mongo_filter: Dict, flexible: Optional[Dict[str, Callable]] = None) -> Dict:
+    """
+    Server-side query with the same semantics as
+    DirectMongoDBQueryTool._matches_filter: flexible fields (category) match
+    their related values, final_price is computed from price and discount,
+    and conditions with unknown operators only require the field to be set.
+    """
+    flexible = flexible or {}
+    query: Dict = {}
+    expressions: List[Dict] = []
+    for field, condition in mongo_filter.items():
+        if field == 'final_price' and isinstance(condition, dict):
+            expressions.extend(
+                {operator: [_FINAL_PRICE, bound]} for operator, bound in condition.items() if operator in _COMPARISONS
+            )
+            continue
+        if field in flexible:
+            values = condition['$in'] if isinstance(condition, dict) and '$in' in condition else condition
+            if not isinstance(condition, dict) or set(condition) == {'$in'}:
+                values = values if isinstance(values, (list, tuple, set, frozenset)) else [values]
+                query[field] = {'$in': sorted(flexible[field](list(values)))}
+                continue
+        if isinstance(condition, dict):
+            translated = {operator: value for operator, value in condition.items()
+                          if operator == '$in' or operator in _COMPARISONS}
+            if len(translated) < len(condition) or not condition:
+                translated['$ne'] = None
+            query[field] = translated
+        else:
+            query[field] = condition
+    if expressions:
+        # null - discount would compare below every number, so price must be set
+        if 'price' not in query:
+            query['price'] = {'$ne': None}
+        query['$expr'] = {'$and': expressions} if len(expressions) > 1 else expressions[0]
+    return query
+
+
+class PoolMetrics(monitoring.ConnectionPoolListener):
+    """Connection pool counters from PyMongo's CMAP events."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.created = 0
+        self.closed = 0
+        self.checked_out = 0
+        self.max_checked_out = 0
+        self.checkout_failures = 0
+        self.checkout_wait_ms = deque(maxlen=1024)
+        self._checkout_started: Dict = {}
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_created(self, event):
+        with self._lock:
+            self.created += 1
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.closed += 1
+
+    def connection_check_out_started(self, event):
+        self._checkout_started[threading.get_ident()] = time.perf_counter()
+
+    def connection_check_out_failed(self, event):
+        self._checkout_started.pop(threading.get_ident(), None)
+        with self._lock:
+            self.checkout_failures += 1
+
+    def connection_checked_out(self, event):
+        started = self._checkout_started.pop(threading.get_ident(), None)
+        with self._lock:
+            self.checked_out += 1
+            self.max_checked_out = max(self.max_checked_out, self.checked_out)
+            if started is not None:
+                self.checkout_wait_ms.append((time.perf_counter() - started) * 1000)
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.checked_out -= 1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            waits = sorted(self.checkout_wait_ms)
+            return {
+                "open_connections": self.created - self.closed,
+                "checked_out": self.checked_out,
+                "max_checked_out": self.max_checked_out,
+                "checkout_failures": self.checkout_failures,
+                "checkout_wait_ms_p95": round(waits[int(0.95 * (len(waits) - 1))], 3) if waits else 0.0,
+            }
+
+
+class MongoProductBackend:
+    """
+    Product queries on a MongoDB collection. The Motor client lives on a
+    dedicated event loop thread so synchronous tools can share one connection
+    pool: run() submits a coroutine to that loop and waits for the result.
+
+    client: an AsyncIOMotorClient-compatible client to use instead of
+            connecting to uri (e.g. mongomock_motor's AsyncMongoMockClient).
+    flexible: field -> related_fn for fields that also match related values.
+    """
+
+    def __init__(self, uri: str = MONGO_URI, database: str = MONGO_DATABASE,
+                 collection: str = MONGO_PRODUCTS_COLLECTION, client=None,
+                 flexible: Optional[Dict[str, Callable]] = None,
+                 max_pool_size: int = MONGO_MAX_POOL_SIZE, min_pool_size: int = MONGO_MIN_POOL_SIZE,
+                 timeout_ms: int = MONGO_TIMEOUT_MS):
+        self.uri = uri
+        self.database = database
+        self.collection_name = collection
+        self.flexible = flexible or {}
+        self.max_pool_size = max_pool_size
+        self.min_pool_size = min_pool_size
+        self.timeout_ms = timeout_ms
+        self.pool = PoolMetrics()
+        self.client = client
+        self.collection = None
+        self._connecting = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+        self._latency_ms = deque(maxlen=1024)
+        self.queries = 0
+        self.errors = 0
+
+    def _event_loop(self) -> asyncio.AbstractEventLoop:
+        if self._loop is None:
+            with self._lock:
+                if self._loop is None:
+                    loop = asyncio.new_event_loop()
+                    threading.Thread(target=loop.run_forever, name='mongo-backend', daemon=True).start()
+                    self._loop = loop
+        return self._loop
+
+    def submit(self, coroutine):
+        """Schedule a coroutine on the backend loop; returns a concurrent.futures.Future."""
+        return asyncio.run_coroutine_threadsafe(coroutine, self._event_loop())
+
+    def run(self, coroutine):
+        """Run a coroutine on the backend loop and wait for its result."""
+        return self.submit(coroutine).result(timeout=self.timeout_ms / 1000 * 2)
+
+    def start(self):
+        """Connect and create indexes in the background, without blocking startup."""
+        future = self.submit(self.connect())
+        future.add_done_callback(
+            lambda f: f.exception() and logger.error(f"❌ MongoDB backend startup failed: {f.exception()}")
+        )
+        return future
+
+    async def connect(self):
+        """Create the pooled client and the product indexes (once)."""
+        if self._connecting is None:
+            self._connecting = asyncio.ensure_future(self._connect())
+        try:
+            await self._connecting
+        except Exception:
+            self._connecting = None
+            raise
+
+    async def _connect(self):
+        if self.client is None:
+            from motor.motor_asyncio import AsyncIOMotorClient
+
+            self.client = AsyncIOMotorClient(
+                self.uri,
+                maxPoolSize=self.max_pool_size,
+                minPoolSize=self.min_pool_size,
+                serverSelectionTimeoutMS=self.timeout_ms,
+                event_listeners=[self.pool],
+            )
+        self.collection = self.client[self.database][self.collection_name]
+        await self.ensure_indexes()
+        logger.info(f"✅ MongoDB backend ready: {self.database}.{self.collection_name}")
+
+    async def ensure_indexes(self) -> List[str]:
+        models = [IndexModel([(field, ASCENDING) for field in fields]) for fields in PRODUCT_INDEXES]
+        return await self.collection.create_indexes(models)
+
+    async def find(self, mongo_filter: Dict, projection: Optional[Iterable[str]] = None,
+                   limit: int = 0) -> List[Dict]:
+        """Documents matching a _build_mongo_filter filter, with only the projected fields."""
+        await self.connect()
+        query = translate_filter(mongo_filter, self.flexible)
+        started = time.perf_counter()
+        try:
+            cursor = self.collection.find(query, list(projection) if projection else None)
+            if limit:
+                cursor = cursor.limit(limit)
+            documents = await cursor.to_list(length=None)
+        except Exception:
+            self.errors += 1
+            raise
+        finally:
+            self.queries += 1
+            self._latency_ms.append((time.perf_counter() - started) * 1000)
+        for document in documents:
+            if not isinstance(document.get('_id'), (str, int)):
+                document['_id'] = str(document['_id'])
+        return documents
+
+    async def facet_counts(self, mongo_filter: Dict, fields: Iterable[str] = FACET_FIELDS,
+                           limit: int = 0) -> Dict[str, Dict]:
+        """
+        field -> {value: matching products having it}, most frequent first (at
+        most limit values, all when 0), from one $facet aggregation; a product
+        counts once per value.
+        """
+        await self.connect()
+        facets = {
+            field: [
+                {'$unwind': f'${field}'},
+                {'$group': {'_id': {'product': '$_id', 'value': f'${field}'}}},
+                {'$group': {'_id': '$_id.value', 'count': {'$sum': 1}}},
+                {'$sort': {'count': -1, '_id': 1}},
+            ] + ([{'$limit': limit}] if limit else [])
+            for field in fields
+        }
+        pipeline = [{'$match': translate_filter(mongo_filter, self.flexible)}, {'$facet': facets}]
+        result = await self.collection.aggregate(pipeline).to_list(length=None)
+        buckets = result[0] if result else {}
+        return {field: {bucket['_id']: bucket['count'] for bucket in buckets.get(field, [])}
+                for field in fields}
+
+    async def load_products(self, products: Iterable[Dict]) -> int:
+        """Replace the collection contents with the given products."""
+        await self.connect()
+        products = list(products)
+        await self.collection.delete_many({})
+        if products:
+            await self.collection.insert_many(products)
+        return len(products)
+
+    async def close(self):
+        if self.client is not None and hasattr(self.client, 'close'):
+            self.client.close()
+        self.client = None
+        self.collection = None
+        self._connecting = None
+
+    def stats(self) -> Dict:
+        latencies = sorted(self._latency_ms)
+
+        def percentile(q):
+            return round(latencies[int(q * (len(latencies) - 1))], 3) if latencies else 0.0
+
+        return {
+            "collection": f"{self.database}.{self.collection_name}",
+            "queries": self.queries,
+            "errors": self.errors,
+            "latency_ms_p50": percentile(0.5),
+            "latency_ms_p95": percentile(0.95),
+            "latency_ms_max": round(latencies[-1], 3) if latencies else 0.0,
+            "pool": self.pool.stats(),
+        }
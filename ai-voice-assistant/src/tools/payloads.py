@@ -0,0 +1,73 @@
+"""
+Payloads
+Compact JSON for search tool responses: each product's display payload is
+serialized once per catalog, and responses splice those fragments together
+instead of rebuilding and re-encoding product dicts on every query
+"""
+
+import json
+import os
+from typing import Callable, Dict, Sequence
+
+try:
+    import orjson
+except ImportError:  # optional: the standard library encoder is used instead
+    orjson = None
+
+# Echo the query schema / Mongo filter and indent responses (for debugging)
+DEBUG_FIELDS = os.getenv('SEARCH_DEBUG_FIELDS', 'false').lower() == 'true'
+
+
+def dumps(obj, indent: bool = False) -> str:
+    """Serialize to JSON: compact by default, with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0).decode('utf-8')
+    if indent:
+        return json.dumps(obj, indent=2, ensure_ascii=False)
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False)
+
+
+def loads(data):
+    """Parse JSON (str or bytes), with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def with_fields(fragment: str, **fields) -> str:
+    """A serialized object with per-query fields (e.g. a score) appended."""
+    extra = dumps(fields)
+    if extra == '{}':
+        return fragment
+    if fragment == '{}':
+        return extra
+    return fragment[:-1] + ',' + extra[1:]
+
+
+class ProductPayloads:
+    """
+    Serialized display payloads, one per catalog position, built once with the
+    given formatter (product dict -> payload dict).
+    """
+
+    def __init__(self, products: Sequence[Dict], formatter: Callable[[Dict], Dict]):
+        self.formatter = formatter
+        self.fragments = [dumps(formatter(product)) for product in products]
+
+    def __len__(self):
+        return len(self.fragments)
+
+    def __getitem__(self, position: int) -> str:
+        return self.fragments[position]
+
+
+def render_response(products: Sequence[str], debug: bool = False, **fields) -> str:
+    """
+    Response object {"products": [...], **fields} where products are serialized
+    fragments. With debug=True the result is indented (and re-encoded, so slower).
+    """
+    if debug:
+        return dumps(dict(products=[loads(fragment) for fragment in products], **fields), indent=True)
+    rest = dumps(fields)
+    head = '{"products":[' + ','.join(products) + ']'
+    return head + ('}' if rest == '{}' else ',' + rest[1:])
@@ -0,0 +1,100 @@
+"""
+Phrase Matcher
+Exact and multi-word (n-gram) lookup of schema values before any embedding work
+"""
+
+import re
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+# Filler words that never carry a product attribute; skipped instead of being embedded
+STOPWORDS = frozenset({
+    'a', 'an', 'the', 'i', 'im', 'me', 'my', 'we', 'us', 'our', 'you', 'your', 'it',
+    'is', 'am', 'are', 'was', 'be', 'been', 'have', 'has', 'had', 'do', 'does', 'did',
+    'want', 'wanted', 'need', 'needs', 'like', 'would', 'could', 'can', 'will', 'should',
+    'show', 'find', 'give', 'get', 'buy', 'looking', 'look', 'search', 'searching', 'see',
+    'some', 'something', 'anything', 'any', 'more', 'most', 'very', 'really', 'just',
+    'please', 'for', 'to', 'of', 'in', 'on', 'at', 'with', 'and', 'or', 'but', 'from',
+    'by', 'about', 'that', 'this', 'these', 'those', 'there', 'here', 'what', 'which',
+    'tonight', 'today', 'tomorrow', 'clothes', 'clothing', 'wear', 'outfit', 'outfits',
+})
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase alphanumeric tokens; punctuation and hyphens split words ("T-Shirts" -> t, shirts)."""
+    return _TOKEN_RE.findall(text.lower())
+
+
+def _inflections(word: str) -> Iterable[str]:
+    """The word plus simple singular/plural variants."""
+    yield word
+    if word.endswith(('s', 'x', 'z', 'ch', 'sh')):
+        yield word + 'es'
+    else:
+        yield word + 's'
+    if word.endswith('es') and word[:-2].endswith(('s', 'x', 'z', 'ch', 'sh')):
+        yield word[:-2]
+    elif word.endswith('s') and not word.endswith('ss'):
+        yield word[:-1]
+
+
+class PhraseIndex:
+    """
+    Hash of token tuples -> (schema key, value) pairs, covering every schema value
+    and synonym (plus singular/plural forms of the last word). Matching is a greedy
+    longest-phrase-first scan, so multi-word values like "navy blue" or "ethnic wear"
+    win over their individual words.
+    """
+
+    def __init__(self, schema: Dict[str, Sequence[str]], synonyms: Dict[str, Dict[str, str]] = None):
+        self._phrases: Dict[Tuple[str, ...], List[Tuple[str, str]]] = {}
+        self.max_len = 1
+        for key, values in schema.items():
+            for value in values:
+                self.add(value, key, value)
+        for key, mapping in (synonyms or {}).items():
+            # Synonyms only apply to values the (catalog-derived) schema actually has
+            values = set(schema.get(key, ()))
+            for phrase, value in mapping.items():
+                if value in values:
+                    self.add(phrase, key, value)
+        # A word that is itself a schema value or synonym is never treated as a stopword
+        self.stopwords = STOPWORDS - {p[0] for p in self._phrases if len(p) == 1}
+
+    def add(self, phrase: str, key: str, value: str):
+        tokens = tokenize(phrase)
+        if not tokens:
+            return
+        # "T-Shirts" is indexed both as ("t", "shirts") and as the joined ("tshirts",)
+        forms = {tuple(tokens)}
+        if len(tokens) > 1:
+            forms.add((''.join(tokens),))
+        for form in forms:
+            for last in _inflections(form[-1]):
+                variant = form[:-1] + (last,)
+                matches = self._phrases.setdefault(variant, [])
+                if (key, value) not in matches:
+                    matches.append((key, value))
+                self.max_len = max(self.max_len, len(variant))
+
+    def match(self, tokens: Sequence[str]) -> Tuple[List[Tuple[str, str]], List[str]]:
+        """
+        Resolve tokens to (key, value) matches. Returns the matches in prompt order
+        and the leftover tokens (no phrase match, not a stopword) for embedding.
+        """
+        matches: List[Tuple[str, str]] = []
+        leftover: List[str] = []
+        i = 0
+        while i < len(tokens):
+            for n in range(min(self.max_len, len(tokens) - i), 0, -1):
+                found = self._phrases.get(tuple(tokens[i:i + n]))
+                if found:
+                    matches.extend(found)
+                    i += n
+                    break
+            else:
+                if tokens[i] not in self.stopwords:
+                    leftover.append(tokens[i])
+                i += 1
+        return matches, leftover
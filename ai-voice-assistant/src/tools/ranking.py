@@ -0,0 +1,125 @@
+"""
+Ranking
+Relevance-ranked top-k over filter candidates: a bounded heap fed in order of
+each product's static score, stopping once no remaining candidate can enter
+"""
+
+import heapq
+import threading
+import weakref
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+# Score = sum of matched intent attributes (weighted by their similarity)
+#         + RATING_WEIGHT * rating / 5 + STOCK_WEIGHT * in stock
+ATTRIBUTE_WEIGHT = 1.0
+RATING_WEIGHT = 1.0
+STOCK_WEIGHT = 0.5
+# Candidates are scored this many at a time between early-stop checks
+BLOCK_SIZE = 1024
+
+
+class TopK:
+    """
+    The k best (score, position) pairs seen so far, in a min-heap of size k.
+    Equal scores prefer the lower catalog position, so results are deterministic.
+    """
+
+    def __init__(self, k: int):
+        self.k = k
+        self._heap: List[Tuple[float, int]] = []
+
+    def __len__(self):
+        return len(self._heap)
+
+    @property
+    def floor(self) -> float:
+        """Score a candidate has to beat to get in; -inf until the heap is full."""
+        return self._heap[0][0] if len(self._heap) >= self.k else -np.inf
+
+    def push(self, score: float, position: int):
+        item = (score, -position)
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, item)
+        elif item > self._heap[0]:
+            heapq.heapreplace(self._heap, item)
+
+    def results(self) -> List[Tuple[int, float]]:
+        """[(position, score)], best first."""
+        return [(-neg, score) for score, neg in sorted(self._heap, reverse=True)]
+
+
+def static_scores(catalog) -> np.ndarray:
+    """Query-independent part of the score: rating and availability."""
+    rating = np.nan_to_num(catalog.numeric['rating'], nan=0.0)
+    in_stock = np.nan_to_num(catalog.numeric['stock'], nan=0.0) > 0
+    return RATING_WEIGHT * np.clip(rating, 0, 5) / 5 + STOCK_WEIGHT * in_stock
+
+
+_static_order: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+_static_lock = threading.Lock()
+
+
+def static_order(catalog) -> Tuple[np.ndarray, np.ndarray]:
+    """(static scores, positions sorted by descending static score), computed once per catalog."""
+    cached = _static_order.get(catalog)
+    if cached is None:
+        with _static_lock:
+            cached = _static_order.get(catalog)
+            if cached is None:
+                scores = static_scores(catalog)
+                cached = (scores, np.argsort(-scores, kind='stable'))
+                _static_order[catalog] = cached
+    return cached
+
+
+def rank(catalog, candidates: np.ndarray, attributes: Sequence[Tuple[np.ndarray, float]],
+         k: int) -> List[Tuple[int, float]]:
+    """
+    Top-k [(position, score)] among the candidate mask, best first.
+
+    attributes: (mask over the catalog, similarity) per intent attribute; a
+    product matching it gains ATTRIBUTE_WEIGHT * similarity.
+
+    Candidates are visited in descending static score, so the best any later
+    candidate can reach is max attribute score + the next static score; once
+    the heap floor is above that bound the remaining candidates are skipped.
+    Negative similarities can only lower a score, so they don't count toward it.
+    """
+    if k <= 0:
+        return []
+    scores, order = static_order(catalog)
+    max_attribute_score = sum(ATTRIBUTE_WEIGHT * max(similarity, 0.0) for _, similarity in attributes)
+    top = TopK(k)
+
+    for start in range(0, len(order), BLOCK_SIZE):
+        if top.floor > max_attribute_score + scores[order[start]]:
+            break
+        block = order[start:start + BLOCK_SIZE]
+        block = block[candidates[block]]
+        if not len(block):
+            continue
+        block_scores = scores[block].copy()
+        for mask, similarity in attributes:
+            block_scores += ATTRIBUTE_WEIGHT * similarity * mask[block]
+        floor = top.floor
+        for position, score in zip(block.tolist(), block_scores.tolist()):
+            if score >= floor:
+                top.push(score, position)
+                floor = top.floor
+    return top.results()
+
+
+def attribute_similarity(intent_scores: Dict, key: str, values) -> float:
+    """
+    Best similarity the intent analysis reported for any of the values (1.0 if
+    unknown), case-insensitive; clamped at 0 so a match never costs score.
+    """
+    by_value = (intent_scores or {}).get(key) or {}
+    if isinstance(by_value, (int, float)):
+        return max(float(by_value), 0.0)
+    by_value = {str(value).lower(): score for value, score in by_value.items()}
+    values = values if isinstance(values, list) else [values]
+    known = [float(by_value[str(v).lower()]) for v in values if str(v).lower() in by_value]
+    return max(max(known), 0.0) if known else 1.0
@@ -0,0 +1,118 @@
+"""
+Result Cache
+Bounded LRU + TTL cache of product search responses, keyed by the normalized
+query and tagged with the catalog version so catalog updates invalidate it
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Optional
+
+from .filter_compiler import canonical_filter
+
+RESULT_CACHE_SIZE = int(os.getenv('QUERY_RESULT_CACHE_SIZE', '1024'))
+RESULT_CACHE_TTL_S = float(os.getenv('QUERY_RESULT_CACHE_TTL_S', '300'))
+
+_SET_TYPES = (list, tuple, set, frozenset)
+
+
+def normalize_schema(value, lowercase: bool = True):
+    """
+    Canonical form of a search schema: dict keys sorted, list values
+    deduplicated and sorted, strings stripped (and lowercased unless the
+    search is case-sensitive). Equal normal forms must give equal results.
+    """
+    if isinstance(value, dict):
+        return {key: normalize_schema(value[key], lowercase) for key in sorted(value, key=str)}
+    if isinstance(value, _SET_TYPES):
+        unique = {}
+        for item in value:
+            item = normalize_schema(item, lowercase)
+            unique.setdefault(canonical_filter(item), item)
+        return [unique[key] for key in sorted(unique, key=repr)]
+    if isinstance(value, str):
+        value = value.strip()
+        return value.lower() if lowercase else value
+    return value
+
+
+def query_key(*parts) -> Hashable:
+    """Hashable cache key from already normalized query parts."""
+    return canonical_filter(list(parts))
+
+
+class ResultCache:
+    """
+    LRU cache of search responses with a time-to-live. Entries belong to the
+    catalog version they were computed against; a lookup with a newer version
+    drops every entry, so an updated catalog is never answered from the cache.
+    """
+
+    def __init__(self, max_size: int = RESULT_CACHE_SIZE, ttl_s: float = RESULT_CACHE_TTL_S,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_size = max_size
+        self.ttl_s = ttl_s
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()  # key -> (stored_at, response)
+        self._version: Optional[str] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def _check_version(self, version: str):
+        if version != self._version:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self._version = version
+
+    def get(self, key: Hashable, version: str) -> Optional[str]:
+        with self._lock:
+            self._check_version(version)
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= self._clock():
+                del self._entries[key]
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Hashable, version: str, value: str):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._check_version(version)
+            self._entries[key] = (self._clock() + self.ttl_s, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_s": self.ttl_s,
+                "version": self._version,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
@@ -1,24 +1,62 @@
+import json
+import threading
+import time
 import numpy as np
-from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
 from crewai.tools import BaseTool
 import os
 
+from .embedding_cache import EmbeddingCache
+from .batch_encoder import BatchingEncoder
+from .text_encoders import encoder_id, load_encoder, resolve_backend
+from .phrase_matcher import PhraseIndex, tokenize
+from .intent_vocabulary import IntentVocabulary, schema_from_products
+from . import catalog_store
+
 # --- Optimized Initialization ---
-# This setup ensures the expensive model loading and embedding calculations
-# only happen once when the application starts, not every time the tool is used.
+# Importing this module is cheap: the model is loaded lazily (or on a background
+# warm-up thread) and value embeddings are read memory-mapped from a .npy file
+# keyed by model name, so each schema value is only ever encoded once.
 
 # Suppress a harmless warning from the sentence-transformers library
 #os.environ["TOKENIZERS_PARALLELISM"] = "false"
 
-print("INTENT_TOOL: Loading sentence transformer model...")
-# Load a pre-trained model optimized for semantic similarity.
-MODEL = SentenceTransformer('all-MiniLM-L6-v2')
-print("INTENT_TOOL: Model loaded.")
+MODEL_NAME = os.getenv('INTENT_MODEL_NAME', 'all-MiniLM-L6-v2')
+# 'torch' (SentenceTransformer on PyTorch) or 'onnx' (int8-quantized, ONNX Runtime on CPU)
+ENCODER_BACKEND = resolve_backend(os.getenv('INTENT_ENCODER_BACKEND', 'torch'))
+ONNX_FILE = os.getenv('INTENT_ONNX_FILE') or None
+ENCODER_ID = encoder_id(MODEL_NAME, ENCODER_BACKEND, ONNX_FILE)
+SCHEMA_CACHE_DIR = os.getenv(
+    'INTENT_SCHEMA_CACHE_DIR',
+    os.path.normpath(os.path.join(os.path.dirname(__file__), '..', '..', '.cache', 'intent'))
+)
+# Product catalog the schema values are read from, and how often (seconds) to check it for changes
+CATALOG_PATH = os.getenv('INTENT_CATALOG_PATH', catalog_store.CATALOG_PATH)
+CATALOG_REFRESH_S = float(os.getenv('INTENT_CATALOG_REFRESH_S', '30'))
+# 'background' starts loading on import without blocking it, 'lazy' waits for first use
+WARMUP_MODE = os.getenv('INTENT_MODEL_WARMUP', 'background')
+
+_model = None
+_model_lock = threading.Lock()
+_warmup_lock = threading.Lock()
+_warmup_thread = None
+_ready = threading.Event()
+
 
-# --- Define all possible values from your database schema ---
-DB_SCHEMA = {
-    'gender': ['men', 'women', 'boys', 'girls'],
+def get_model():
+    """Load the sentence transformer on first use (thread-safe)."""
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                print(f"INTENT_TOOL: Loading sentence transformer model ({ENCODER_BACKEND})...")
+                # Load a pre-trained model optimized for semantic similarity.
+                _model = load_encoder(MODEL_NAME, ENCODER_BACKEND, ONNX_FILE)
+                print("INTENT_TOOL: Model loaded.")
+    return _model
+
+# --- Schema values used when the product catalog cannot be read ---
+FALLBACK_SCHEMA = {
+    'gender': ['men', 'women', 'kids'],
     'type': ['bottomwear', 'ethnicwear', 'topwear', 'winterwear'],
     'category': [
         'Casual', 'Dresses', 'Ethnic Wear', 'Formal', 'Hoodies', 'Jackets',
@@ -53,12 +91,208 @@ DB_SCHEMA = {
     ]
 }
 
-# --- Pre-compute embeddings for all database values for maximum efficiency ---
-print("INTENT_TOOL: Pre-computing database schema embeddings...")
-DB_EMBEDDINGS = {
-    key: MODEL.encode(values) for key, values in DB_SCHEMA.items()
+# --- Synonyms resolved by the lexical fast path (phrase -> schema value) ---
+SCHEMA_SYNONYMS = {
+    'gender': {
+        'man': 'men', 'male': 'men', 'gents': 'men', 'woman': 'women', 'female': 'women',
+        'ladies': 'women', 'lady': 'women', 'boy': 'kids', 'boys': 'kids', 'girl': 'kids',
+        'girls': 'kids', 'kid': 'kids', 'child': 'kids', 'children': 'kids',
+    },
+    'type': {
+        'top wear': 'topwear', 'bottom wear': 'bottomwear',
+        'ethnic wear': 'ethnicwear', 'winter wear': 'winterwear',
+    },
+    'category': {
+        't shirt': 'T-Shirts', 'tee': 'T-Shirts', 'dress': 'Dresses', 'hoodie': 'Hoodies',
+        'jacket': 'Jackets', 'ethnic': 'Ethnic Wear', 'night wear': 'Nightwear',
+        'sportswear': 'Sports', 'sports wear': 'Sports',
+    },
+    'colors': {
+        'navy blue': 'navy', 'gray': 'grey', 'multi color': 'multicolor',
+        'multicolour': 'multicolor', 'multi colour': 'multicolor',
+    },
+    'tags': {
+        't shirt': 'tshirt', 'polka dot': 'polka', 'polka dots': 'polka', 'pyjama': 'pajama',
+    },
 }
-print("INTENT_TOOL: Embeddings computed successfully.")
+
+def load_catalog_schema(path=None):
+    """Distinct values of each schema field in the product catalog, or None if it can't be read."""
+    path = path or CATALOG_PATH
+    try:
+        with open(path, encoding='utf-8') as f:
+            products = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"INTENT_TOOL: Could not read catalog {path}: {e}")
+        return None
+    schema = schema_from_products(products)
+    if not any(schema.values()):
+        return None
+    return schema
+
+
+def _catalog_mtime():
+    try:
+        return os.path.getmtime(CATALOG_PATH)
+    except OSError:
+        return None
+
+
+# --- Vocabulary derived from the catalog at load time ---
+_catalog_checked_at = time.monotonic()
+_catalog_mtime_seen = _catalog_mtime()
+_schema_lock = threading.Lock()
+DB_SCHEMA = load_catalog_schema() or FALLBACK_SCHEMA
+SCHEMA_KEYS = list(DB_SCHEMA)
+
+# Exact and multi-word matches are resolved here in microseconds; only the
+# remaining non-stopword tokens go through embedding similarity.
+PHRASE_INDEX = PhraseIndex(DB_SCHEMA, SCHEMA_SYNONYMS)
+
+def _l2_normalize(embeddings):
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return embeddings / norms
+
+
+# --- One normalized matrix of every distinct schema value ---
+# Each key selects its values' rows by index, so every token is scored against
+# every key with a single matrix multiply. When the catalog gains values, only
+# those are encoded and appended to the matrix.
+VOCABULARY = IntentVocabulary(
+    lambda values: get_model().encode(values), store_dir=SCHEMA_CACHE_DIR, encoder_id=ENCODER_ID
+)
+SCHEMA_MATRIX = None
+DB_EMBEDDINGS = {}
+
+
+def load_schema_embeddings():
+    """Bring the value matrix up to date with DB_SCHEMA, encoding only unseen values."""
+    global SCHEMA_MATRIX, DB_EMBEDDINGS
+    encoded = VOCABULARY.update(DB_SCHEMA)
+    if encoded:
+        print(f"INTENT_TOOL: Encoded {encoded} new schema values.")
+    layout = VOCABULARY.layout
+    DB_EMBEDDINGS = {key: layout.key_embeddings(key) for key in layout.keys}
+    SCHEMA_MATRIX = layout.matrix
+
+
+def set_schema(schema):
+    """Switch matching to a new schema; existing value embeddings are reused."""
+    global DB_SCHEMA, SCHEMA_KEYS, PHRASE_INDEX
+    with _schema_lock:
+        phrase_index = PhraseIndex(schema, SCHEMA_SYNONYMS)
+        DB_SCHEMA, SCHEMA_KEYS = schema, list(schema)
+        if VOCABULARY.layout is not None:
+            load_schema_embeddings()
+        PHRASE_INDEX = phrase_index
+
+
+def refresh_vocabulary(force=False):
+    """
+    Pick up catalog changes. Checks the file's mtime at most every
+    CATALOG_REFRESH_S seconds; returns True if the schema changed.
+    """
+    global _catalog_checked_at, _catalog_mtime_seen
+    now = time.monotonic()
+    if not force and (CATALOG_REFRESH_S <= 0 or now - _catalog_checked_at < CATALOG_REFRESH_S):
+        return False
+    _catalog_checked_at = now
+    mtime = _catalog_mtime()
+    if not force and mtime == _catalog_mtime_seen:
+        return False
+    _catalog_mtime_seen = mtime
+    schema = load_catalog_schema()
+    if schema is None or schema == DB_SCHEMA:
+        return False
+    print("INTENT_TOOL: Catalog changed, updating schema vocabulary.")
+    set_schema(schema)
+    return True
+
+
+def ensure_ready():
+    """Block until the schema matrix and model are loaded, loading them if needed."""
+    if _ready.is_set():
+        return
+    with _warmup_lock:
+        if not _ready.is_set():
+            if SCHEMA_MATRIX is None:
+                with _schema_lock:
+                    load_schema_embeddings()
+            get_model()
+            _ready.set()
+
+
+def is_ready():
+    """True once the intent tool can serve requests without loading anything."""
+    return _ready.is_set()
+
+
+def start_warmup():
+    """Load the model and schema embeddings on a daemon thread."""
+    global _warmup_thread
+    if _warmup_thread is None and not _ready.is_set():
+        _warmup_thread = threading.Thread(target=ensure_ready, name='intent-warmup', daemon=True)
+        _warmup_thread.start()
+    return _warmup_thread
+
+
+# --- Cross-request micro-batching ---
+# Concurrent Flask threads hand their cache misses to one worker that encodes
+# them in a single batched forward pass after a short window.
+BATCH_ENCODER = BatchingEncoder(
+    lambda texts: get_model().encode(texts),
+    max_wait_ms=float(os.getenv('INTENT_BATCH_WINDOW_MS', '5')),
+    max_batch_size=int(os.getenv('INTENT_MAX_BATCH_SIZE', '64')),
+)
+
+# --- Token embedding cache ---
+# Shopping queries reuse a small vocabulary, so most tokens are served from this
+# LRU cache and only unseen tokens reach the encoder (in one batch). Set
+# INTENT_EMBEDDING_CACHE_PATH to persist it across restarts.
+EMBEDDING_CACHE = EmbeddingCache(
+    BATCH_ENCODER.encode,
+    max_size=int(os.getenv('INTENT_EMBEDDING_CACHE_SIZE', '10000')),
+    persist_path=os.getenv('INTENT_EMBEDDING_CACHE_PATH') or None,
+    namespace=ENCODER_ID,
+)
+
+
+def match_intent(prompt_tokens, token_embeddings, similarity_threshold=0.55, layout=None, scores=None):
+    """
+    Map each token to its best value per schema key (cosine similarity),
+    keeping matches at or above the threshold. If a `scores` dict is given,
+    it receives the best similarity per matched value as scores[key][value].
+    """
+    if layout is None:
+        layout = VOCABULARY.layout
+    similarities = _l2_normalize(np.asarray(token_embeddings)) @ layout.matrix.T
+
+    # Best value and score per (token, key) from each key's columns of the single product
+    rows = np.arange(len(prompt_tokens))
+    best_index = np.empty((len(prompt_tokens), len(layout.keys)), dtype=np.intp)
+    best_score = np.empty((len(prompt_tokens), len(layout.keys)), dtype=similarities.dtype)
+    for k, key_rows in enumerate(layout.key_rows):
+        if not len(key_rows):
+            best_score[:, k] = -np.inf
+            continue
+        block = similarities[:, key_rows]
+        best_index[:, k] = block.argmax(axis=1)
+        best_score[:, k] = block[rows, best_index[:, k]]
+
+    intent_json = {}
+    for i in range(len(prompt_tokens)):
+        for k, key in enumerate(layout.keys):
+            if best_score[i, k] >= similarity_threshold:
+                matched_value = layout.schema[key][best_index[i, k]]
+                if key not in intent_json:
+                    intent_json[key] = set()
+                intent_json[key].add(matched_value)
+                if scores is not None:
+                    by_value = scores.setdefault(key, {})
+                    by_value[matched_value] = max(by_value.get(matched_value, 0.0), float(best_score[i, k]))
+
+    return {key: list(values) for key, values in intent_json.items()}
 
 
 class IntentAnalysisTool(BaseTool):
@@ -75,30 +309,45 @@ class IntentAnalysisTool(BaseTool):
         The core logic of the tool. It takes the user's raw text and converts it to a
         structured dictionary of search filters.
         """
+        return self.analyze(user_prompt)[0]
+
+    def analyze(self, user_prompt: str):
+        """
+        Like _run, but also returns how sure each match is: scores[key][value]
+        is 1.0 for exact phrase matches and the cosine similarity otherwise.
+        """
         similarity_threshold = 0.55
-        prompt_tokens = user_prompt.lower().replace(',', '').replace('.', '').split()
+        refresh_vocabulary()
+        prompt_tokens = tokenize(user_prompt)
 
         if not prompt_tokens:
-            return {}
+            return {}, {}
 
         intent_json = {}
-        token_embeddings = MODEL.encode(prompt_tokens)
-
-        for i, token in enumerate(prompt_tokens):
-            token_embedding = token_embeddings[i:i+1]
+        scores = {}
+        lexical_matches, leftover_tokens = PHRASE_INDEX.match(prompt_tokens)
+        for key, value in lexical_matches:
+            if key not in intent_json:
+                intent_json[key] = set()
+            intent_json[key].add(value)
+            scores.setdefault(key, {})[value] = 1.0
 
-            for key, db_values in DB_SCHEMA.items():
-                db_embeddings = DB_EMBEDDINGS[key]
-                similarities = cosine_similarity(token_embedding, db_embeddings)
-                best_match_index = np.argmax(similarities)
-                best_match_score = similarities[0, best_match_index]
+        if leftover_tokens:
+            ensure_ready()
+            token_embeddings = EMBEDDING_CACHE.encode(leftover_tokens)
+            semantic_scores = {}
+            semantic = match_intent(leftover_tokens, token_embeddings, similarity_threshold, scores=semantic_scores)
+            for key, values in semantic.items():
+                if key not in intent_json:
+                    intent_json[key] = set()
+                intent_json[key].update(values)
+                for value in values:
+                    by_value = scores.setdefault(key, {})
+                    by_value[value] = max(by_value.get(value, 0.0), semantic_scores[key][value])
 
-                if best_match_score >= similarity_threshold:
-                    matched_value = db_values[best_match_index]
-                    if key not in intent_json:
-                        intent_json[key] = set()
-                    intent_json[key].add(matched_value)
-
-        return {key: list(values) for key, values in intent_json.items()}
+        return {key: list(values) for key, values in intent_json.items()}, scores
     
-intent_analyzer_tool = IntentAnalysisTool()
\ No newline at end of file
+intent_analyzer_tool = IntentAnalysisTool()
+
+if WARMUP_MODE == 'background':
+    start_warmup()
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Semantic Product Search Tool
+Top-k product retrieval by meaning ("something comfy for a lazy Sunday") over a
+prebuilt, on-disk vector index of the catalog
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, List
+
+import numpy as np
+from crewai.tools import BaseTool
+
+from .catalog_store import get_catalog
+from .payloads import DEBUG_FIELDS, render_response, with_fields
+from .schema_intent_tool import BATCH_ENCODER, ENCODER_ID, SCHEMA_CACHE_DIR, get_model
+from .vector_index import build_index, load_index
+
+logger = logging.getLogger(__name__)
+
+# 'auto' (exact below 20k products, IVF above), 'flat' or 'ivf'
+INDEX_BACKEND = os.getenv('PRODUCT_INDEX_BACKEND', 'auto')
+INDEX_NPROBE = int(os.getenv('PRODUCT_INDEX_NPROBE', '16'))
+INDEX_DIR = os.getenv(
+    'PRODUCT_INDEX_DIR', os.path.join(os.path.dirname(SCHEMA_CACHE_DIR), 'products')
+)
+
+
+def product_text(product: Dict) -> str:
+    """Text that is embedded for a product: name, description and tags."""
+    return ". ".join(filter(None, [
+        product.get("name", ""),
+        product.get("description", ""),
+        " ".join(product.get("tags", [])),
+    ]))
+
+
+def format_product(product: Dict) -> Dict:
+    """Display payload of a product; the per-query score is appended to it"""
+    return {
+        "id": product.get("_id", ""),
+        "name": product.get("name", ""),
+        "type": product.get("type", ""),
+        "color": product["colors"][0] if product.get("colors") else "",
+        "category": product.get("category", ""),
+        "gender": product.get("gender", ""),
+        "price": product.get("price"),
+        "occasion": product.get("occasion", []),
+        "description": product.get("description", ""),
+        "availability": "in_stock" if product.get("stock", 0) > 0 else "out_of_stock",
+        "image_url": product["images"][0] if product.get("images") else "",
+    }
+
+
+class ProductVectorIndex:
+    """
+    Catalog products plus a vector index over their embeddings. The index is
+    stored under INDEX_DIR keyed by encoder and catalog version, so it is
+    encoded once and memory-mapped on every later start.
+    """
+
+    def __init__(self, catalog=None, index_dir: str = INDEX_DIR,
+                 backend: str = INDEX_BACKEND, nprobe: int = INDEX_NPROBE):
+        self.catalog = catalog
+        self.index_dir = index_dir
+        self.backend = backend
+        self.nprobe = nprobe
+        self.products: List[Dict] = []
+        self.payloads = None
+        self.index = None
+        self._lock = threading.Lock()
+
+    def index_path(self, catalog_version: str) -> str:
+        fingerprint = hashlib.sha1(
+            f"{ENCODER_ID}\0{self.backend}\0{catalog_version}".encode('utf-8')
+        ).hexdigest()[:16]
+        return os.path.join(self.index_dir, f"products_{fingerprint}")
+
+    def ensure_loaded(self):
+        if self.index is not None:
+            return
+        with self._lock:
+            if self.index is not None:
+                return
+            catalog = self.catalog or get_catalog()
+            products = catalog.products
+            path = self.index_path(catalog.version)
+            index = load_index(path)
+            if index is None or len(index) != len(products):
+                started = time.perf_counter()
+                embeddings = np.asarray(
+                    get_model().encode([product_text(p) for p in products]), dtype=np.float32
+                )
+                norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+                norms[norms == 0] = 1.0
+                index = build_index(embeddings / norms, self.backend, nprobe=self.nprobe)
+                try:
+                    index.save(path)
+                except OSError as e:
+                    logger.warning(f"Could not persist product index to {path}: {e}")
+                logger.info(f"Built {index.kind} index over {len(products)} products "
+                            f"in {time.perf_counter() - started:.1f}s")
+            if index.kind == "ivf":
+                index.nprobe = self.nprobe
+            self.products = products
+            self.payloads = catalog.payloads(format_product)
+            self.index = index
+
+    def search_positions(self, query: str, limit: int = 10):
+        """Return [(catalog position, score)] for the limit products closest to the query."""
+        self.ensure_loaded()
+        embedding = BATCH_ENCODER.encode([query])[0]
+        ids, scores = self.index.search(embedding, limit)
+        return [(int(i), float(score)) for i, score in zip(ids, scores)]
+
+    def search(self, query: str, limit: int = 10):
+        """Return [(product, score)] for the limit products closest to the query."""
+        return [(self.products[i], score) for i, score in self.search_positions(query, limit)]
+
+
+PRODUCT_INDEX = ProductVectorIndex()
+
+
+class SemanticProductSearchTool(BaseTool):
+    """
+    Semantic product search over the catalog's vector index
+    """
+    name: str = "SemanticProductSearchTool"
+    description: str = """
+    Find products whose name, description and tags best match the meaning of a
+    free-form request, even when no attribute matches exactly.
+
+    Input: query (string) - the shopper's request in natural language
+    Returns: The top matching products with similarity scores
+    """
+
+    def _run(self, query: str, limit: int = 10, debug: bool = DEBUG_FIELDS) -> str:
+        """Return the top-k products for a free-form query"""
+        try:
+            logger.info(f"🔍 Semantic product search: {query}")
+            started = time.perf_counter()
+            results = PRODUCT_INDEX.search_positions(query, limit)
+            formatted_products = [
+                with_fields(PRODUCT_INDEX.payloads[i], score=round(score, 4)) for i, score in results
+            ]
+            result = {
+                "success": True,
+                "count": len(formatted_products),
+                "query": query,
+                "index": PRODUCT_INDEX.index.kind,
+                "search_time_ms": round((time.perf_counter() - started) * 1000, 2),
+                "message": f"Found {len(formatted_products)} products semantically similar to the query",
+            }
+            logger.info(f"✅ Found {len(formatted_products)} semantic matches")
+            return render_response(formatted_products, debug=debug, **result)
+
+        except Exception as e:
+            logger.error(f"❌ Semantic product search failed: {e}")
+            return json.dumps({
+                "error": f"Semantic product search failed: {str(e)}",
+                "products": [],
+                "count": 0,
+            })
+
+# Create tool instance
+semantic_product_search_tool = SemanticProductSearchTool()
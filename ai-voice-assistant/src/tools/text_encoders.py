@@ -0,0 +1,89 @@
+"""
+Text Encoder Backends
+Pluggable sentence encoders for intent analysis: PyTorch or int8-quantized ONNX Runtime
+"""
+
+import importlib.util
+import logging
+import platform
+import re
+from importlib import metadata
+
+logger = logging.getLogger(__name__)
+
+ENCODER_BACKENDS = ("torch", "onnx")
+# SentenceTransformer(..., backend="onnx") was added in sentence-transformers 3.2
+ONNX_MIN_SENTENCE_TRANSFORMERS = (3, 2)
+ONNX_MODULES = ("onnxruntime", "optimum")
+
+
+def _version_tuple(version: str) -> tuple:
+    return tuple(int(part) for part in re.findall(r"\d+", version)[:2])
+
+
+def onnx_unavailable_reason():
+    """Why the ONNX backend cannot be loaded here, or None if it can."""
+    try:
+        installed = metadata.version("sentence-transformers")
+    except metadata.PackageNotFoundError:
+        return "sentence-transformers is not installed"
+    if _version_tuple(installed) < ONNX_MIN_SENTENCE_TRANSFORMERS:
+        required = ".".join(map(str, ONNX_MIN_SENTENCE_TRANSFORMERS))
+        return f"sentence-transformers {installed} is older than {required}"
+    missing = [name for name in ONNX_MODULES if importlib.util.find_spec(name) is None]
+    if missing:
+        return f"{', '.join(missing)} not installed"
+    return None
+
+
+def resolve_backend(backend: str) -> str:
+    """
+    The backend that will actually be loaded: 'onnx' falls back to 'torch' (with a
+    warning) when its dependencies are missing. Resolved before loading so the
+    encoder_id that keys cached embeddings always names the weights really used.
+    """
+    if backend not in ENCODER_BACKENDS:
+        raise ValueError(f"Unknown encoder backend '{backend}', expected one of {ENCODER_BACKENDS}")
+    if backend == "onnx":
+        reason = onnx_unavailable_reason()
+        if reason:
+            logger.warning(f"⚠️ ONNX encoder backend unavailable ({reason}); using torch. "
+                           f"Install it with: pip install 'sentence-transformers[onnx]>=3.2'")
+            return "torch"
+    return backend
+
+
+def default_onnx_file() -> str:
+    """Quantized export matching the CPU architecture (shipped in the model repo)."""
+    if platform.machine().lower() in ("arm64", "aarch64"):
+        return "onnx/model_qint8_arm64.onnx"
+    return "onnx/model_quint8_avx2.onnx"
+
+
+def encoder_id(model_name: str, backend: str, onnx_file: str = None) -> str:
+    """
+    Identifies the exact weights used to produce embeddings. Cached/persisted
+    embeddings are keyed by it, since the quantized model gives slightly different vectors.
+    """
+    if backend == "onnx":
+        return f"{model_name}:onnx:{onnx_file or default_onnx_file()}"
+    return model_name
+
+
+def load_encoder(model_name: str, backend: str = "torch", onnx_file: str = None):
+    """
+    Load a SentenceTransformer for the chosen backend.
+
+    torch: the regular PyTorch model.
+    onnx:  an int8-quantized ONNX export run through ONNX Runtime on CPU
+           (requires `pip install sentence-transformers[onnx]`).
+    """
+    from sentence_transformers import SentenceTransformer
+
+    if backend not in ENCODER_BACKENDS:
+        raise ValueError(f"Unknown encoder backend '{backend}', expected one of {ENCODER_BACKENDS}")
+    if backend == "onnx":
+        onnx_file = onnx_file or default_onnx_file()
+        logger.info(f"Loading {model_name} with ONNX Runtime ({onnx_file})")
+        return SentenceTransformer(model_name, backend="onnx", model_kwargs={"file_name": onnx_file})
+    return SentenceTransformer(model_name)
@@ -0,0 +1,121 @@
+"""
+Text Index
+Full-text product search: a stemmed inverted index over name, description,
+tags and category, scored with BM25 in one pass over the query's posting lists
+"""
+
+import logging
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .phrase_matcher import STOPWORDS, tokenize
+from .vector_index import top_k
+
+logger = logging.getLogger(__name__)
+
+# Field -> weight of a term occurrence in that field (BM25F-style)
+TEXT_FIELDS = {'name': 2.0, 'category': 1.5, 'tags': 1.5, 'description': 1.0}
+
+_DOUBLE_CONSONANTS = frozenset('bdgmnprt')
+
+
+def stem(token: str) -> str:
+    """
+    Light suffix-stripping stemmer (plural, -ing, -ed, final e / y), so "dresses",
+    "dress" and "dressed", "hiking" and "hike" or "hoodies" and "hoodie" share one term.
+    """
+    if len(token) <= 3 or token.isdigit():
+        return token
+    if token.endswith('ies') and len(token) > 4:
+        token = token[:-1]
+    elif token.endswith('sses'):
+        token = token[:-2]
+    elif token.endswith('es') and token[:-2].endswith(('sh', 'ch', 'x', 'z')):
+        token = token[:-2]
+    elif token.endswith('s') and not token.endswith(('ss', 'us', 'is')):
+        token = token[:-1]
+
+    for suffix in ('ing', 'ed'):
+        if token.endswith(suffix) and len(token) - len(suffix) >= 3:
+            token = token[:-len(suffix)]
+            if len(token) > 3 and token[-1] == token[-2] and token[-1] in _DOUBLE_CONSONANTS:
+                token = token[:-1]
+            break
+
+    if token.endswith('e') and len(token) > 3:
+        token = token[:-1]
+    elif token.endswith('y') and len(token) > 3 and token[-2] not in 'aeiou':
+        token = token[:-1] + 'i'
+    return token
+
+
+def analyze(text: str) -> List[str]:
+    """Stemmed, non-stopword terms of a text."""
+    return [stem(token) for token in tokenize(text) if token not in STOPWORDS]
+
+
+def _field_text(value) -> str:
+    if isinstance(value, list):
+        return ' '.join(str(item) for item in value)
+    return str(value) if value is not None else ''
+
+
+class BM25Index:
+    """
+    term -> (product positions, precomputed BM25 term-frequency component).
+    A query sums idf * component over the postings of its terms, so its cost
+    is the total length of those postings, independent of the catalog size.
+    """
+
+    def __init__(self, products: Sequence[Dict], fields: Optional[Dict[str, float]] = None,
+                 k1: float = 1.2, b: float = 0.75):
+        self.fields = dict(fields or TEXT_FIELDS)
+        self.k1 = k1
+        self.b = b
+        self.size = len(products)
+
+        frequencies: Dict[str, Dict[int, float]] = {}
+        lengths = np.zeros(self.size, dtype=np.float64)
+        for position, product in enumerate(products):
+            for field, weight in self.fields.items():
+                terms = analyze(_field_text(product.get(field)))
+                lengths[position] += weight * len(terms)
+                for term in terms:
+                    postings = frequencies.setdefault(term, {})
+                    postings[position] = postings.get(position, 0.0) + weight
+
+        average_length = lengths.mean() if self.size and lengths.mean() > 0 else 1.0
+        norms = k1 * (1 - b + b * lengths / average_length)
+        self.postings: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self.idf: Dict[str, float] = {}
+        for term, postings in frequencies.items():
+            positions = np.fromiter(postings, dtype=np.int64, count=len(postings))
+            tf = np.fromiter(postings.values(), dtype=np.float64, count=len(postings))
+            self.postings[term] = (positions, (tf * (k1 + 1) / (tf + norms[positions])).astype(np.float32))
+            df = len(postings)
+            self.idf[term] = float(np.log(1 + (self.size - df + 0.5) / (df + 0.5)))
+
+    def __len__(self):
+        return self.size
+
+    def score(self, terms: Iterable[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """(positions, BM25 scores) of every product containing at least one term."""
+        ids, weights = [], []
+        for term in dict.fromkeys(terms):
+            posting = self.postings.get(term)
+            if posting is not None:
+                ids.append(posting[0])
+                weights.append(posting[1] * np.float32(self.idf[term]))
+        if not ids:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        if len(ids) == 1:
+            return ids[0], weights[0]
+        positions, inverse = np.unique(np.concatenate(ids), return_inverse=True)
+        return positions, np.bincount(inverse, weights=np.concatenate(weights)).astype(np.float32)
+
+    def search(self, query: str, limit: int = 10) -> List[Tuple[int, float]]:
+        """[(position, score)] of the limit best matches for a raw text query, best first."""
+        positions, scores = self.score(analyze(query))
+        best = top_k(scores, limit)
+        return [(int(positions[i]), float(scores[i])) for i in best]
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Product Text Search Tool
+Answers raw text queries ("red dress for party") with BM25 full-text ranking
+over product names, descriptions, tags and categories
+"""
+
+import json
+import logging
+import threading
+from typing import Optional
+
+from crewai.tools import BaseTool
+
+from .catalog_store import get_catalog
+from .payloads import DEBUG_FIELDS, render_response, with_fields
+from .real_mcp_product_tool import format_product
+from .result_cache import ResultCache, query_key
+from .text_index import BM25Index, analyze
+from .vector_index import top_k
+
+logger = logging.getLogger(__name__)
+
+CATALOG = get_catalog()
+
+_text_index: Optional[BM25Index] = None
+_text_index_lock = threading.Lock()
+
+
+def get_text_index() -> BM25Index:
+    """BM25 index over the shared catalog, built on first use."""
+    global _text_index
+    if _text_index is None:
+        with _text_index_lock:
+            if _text_index is None:
+                _text_index = BM25Index(CATALOG.products)
+                logger.info(f"Built full-text index over {_text_index.size} products "
+                            f"({len(_text_index.postings)} terms)")
+    return _text_index
+
+
+# Responses keyed by the query's stemmed terms, so "Red dresses for party"
+# and "party red dress" are answered once
+RESULT_CACHE = ResultCache()
+
+
+class ProductTextSearchTool(BaseTool):
+    """
+    Full-text product search for raw text queries
+    """
+    name: str = "ProductTextSearchTool"
+    description: str = """
+    Search products by the words of a plain text request, ranked by BM25
+    relevance over name, description, tags and category.
+
+    Input: query (string) - the shopper's request as plain text
+    Returns: The best matching products with relevance scores
+    """
+
+    def _run(self, query: str, limit: int = 10, debug: bool = DEBUG_FIELDS, facets: bool = True) -> str:
+        """Return the top-k products for a raw text query"""
+        try:
+            logger.info(f"🔍 Text product search: {query}")
+            terms = sorted(set(analyze(query)))
+            # Debug responses echo the raw query, so they are not cached
+            cache_key = query_key(terms, limit, facets)
+            cached = None if debug else RESULT_CACHE.get(cache_key, CATALOG.version)
+            if cached is not None:
+                logger.info("✅ Text product search served from result cache")
+                return cached
+
+            index = get_text_index()
+            positions, scores = index.score(terms)
+            payloads = CATALOG.payloads(format_product)
+            formatted_products = [
+                with_fields(payloads[int(positions[i])], score=round(float(scores[i]), 4))
+                for i in top_k(scores, limit)
+            ]
+            fields = {
+                "success": True,
+                "count": len(formatted_products),
+                "total_found": int(len(positions)),
+                "message": f"Found {len(positions)} products matching the query, showing the top {len(formatted_products)}",
+            }
+            if facets:
+                fields["facets"] = CATALOG.facet_counts(positions)
+            if debug:
+                fields["query"] = query
+                fields["terms"] = terms
+
+            logger.info(f"✅ Found {len(positions)} text matches")
+            response = render_response(formatted_products, debug=debug, **fields)
+            if not debug:
+                RESULT_CACHE.put(cache_key, CATALOG.version, response)
+            return response
+
+        except Exception as e:
+            logger.error(f"❌ Text product search failed: {e}")
+            return json.dumps({
+                "error": f"Text product search failed: {str(e)}",
+                "products": [],
+                "count": 0,
+            })
+
+# Create tool instance
+product_text_search_tool = ProductTextSearchTool()
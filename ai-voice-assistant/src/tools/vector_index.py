@@ -0,0 +1,174 @@
+"""
+Vector Index
+On-disk top-k inner-product search over normalized embeddings: exact NumPy brute
+force, or an IVF (inverted file) index that only scans the clusters nearest the query
+"""
+
+import json
+import logging
+import os
+from typing import Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+INDEX_BACKENDS = ("auto", "flat", "ivf")
+# Below this many vectors a full scan is already sub-millisecond, so 'auto' stays exact
+IVF_MIN_VECTORS = 20000
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indexes of the k highest scores, best first (argpartition + sort of k items)."""
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    if k < len(scores):
+        candidates = np.argpartition(-scores, k - 1)[:k]
+    else:
+        candidates = np.arange(len(scores))
+    return candidates[np.argsort(-scores[candidates], kind='stable')]
+
+
+def _as_query(query) -> np.ndarray:
+    query = np.asarray(query, dtype=np.float32).reshape(-1)
+    norm = np.linalg.norm(query)
+    return query / norm if norm else query
+
+
+class FlatIndex:
+    """Exact search: one matrix-vector product over every stored vector."""
+
+    kind = "flat"
+    array_names = ("vectors",)
+
+    def __init__(self, vectors: np.ndarray):
+        self.vectors = vectors
+
+    def __len__(self):
+        return len(self.vectors)
+
+    def search(self, query, k: int = 10) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (row ids, cosine scores) of the k nearest vectors."""
+        scores = self.vectors @ _as_query(query)
+        best = top_k(scores, k)
+        return best, scores[best]
+
+    def _arrays(self):
+        return {name: getattr(self, name) for name in self.array_names}
+
+    def _meta(self):
+        return {}
+
+    def save(self, path: str):
+        """Write the index as .npy files next to a JSON header; the header is written last."""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        for name, array in self._arrays().items():
+            tmp = f"{path}.{name}.{os.getpid()}.tmp.npy"
+            np.save(tmp, array)
+            os.replace(tmp, f"{path}.{name}.npy")
+        meta = dict(self._meta(), kind=self.kind, count=len(self))
+        tmp = f"{path}.{os.getpid()}.tmp.json"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(tmp, f"{path}.json")
+
+    @classmethod
+    def _from_arrays(cls, arrays, meta):
+        return cls(arrays["vectors"])
+
+
+class IVFIndex(FlatIndex):
+    """
+    Approximate search. Vectors are clustered with spherical k-means and stored
+    contiguously per cluster; a query scores the nlist centroids, then only the
+    vectors of its nprobe closest clusters. Cost is roughly nprobe / nlist of a
+    full scan, and recall grows with nprobe.
+    """
+
+    kind = "ivf"
+    array_names = ("vectors", "ids", "centroids", "offsets")
+
+    def __init__(self, vectors, ids, centroids, offsets, nprobe: int = 16):
+        super().__init__(vectors)
+        self.ids = ids
+        self.centroids = centroids
+        self.offsets = offsets
+        self.nprobe = nprobe
+
+    @classmethod
+    def build(cls, vectors, nlist: Optional[int] = None, nprobe: int = 16,
+              iterations: int = 10, seed: int = 0):
+        vectors = np.asarray(vectors, dtype=np.float32)
+        n = len(vectors)
+        nlist = max(1, min(nlist or int(4 * np.sqrt(n)), n))
+        rng = np.random.default_rng(seed)
+        # k-means is trained on a sample (32 points per cluster), then every vector is assigned
+        sample = vectors[rng.choice(n, min(n, 32 * nlist), replace=False)]
+
+        centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+        for _ in range(iterations):
+            assignment = (sample @ centroids.T).argmax(axis=1)
+            order = np.argsort(assignment, kind='stable')
+            counts = np.bincount(assignment, minlength=nlist)
+            # Empty clusters keep their previous centroid
+            filled = np.flatnonzero(counts)
+            starts = np.concatenate([[0], np.cumsum(counts)[:-1]])[filled]
+            sums = np.add.reduceat(sample[order], starts, axis=0)
+            centroids[filled] = sums / np.maximum(np.linalg.norm(sums, axis=1, keepdims=True), 1e-12)
+
+        assignment = np.concatenate([
+            (vectors[start:start + 65536] @ centroids.T).argmax(axis=1)
+            for start in range(0, n, 65536)
+        ]) if n else np.empty(0, dtype=np.intp)
+        ids = np.argsort(assignment, kind='stable')
+        offsets = np.concatenate([[0], np.cumsum(np.bincount(assignment, minlength=nlist))])
+        return cls(vectors[ids], ids.astype(np.int64), centroids, offsets.astype(np.int64), nprobe)
+
+    def search(self, query, k: int = 10, nprobe: Optional[int] = None):
+        query = _as_query(query)
+        probes = top_k(self.centroids @ query, nprobe or self.nprobe)
+        rows = np.concatenate([
+            np.arange(self.offsets[c], self.offsets[c + 1]) for c in probes
+        ]) if len(probes) else np.empty(0, dtype=np.intp)
+        scores = self.vectors[rows] @ query
+        best = top_k(scores, k)
+        return self.ids[rows[best]], scores[best]
+
+    def _meta(self):
+        return {"nlist": len(self.centroids), "nprobe": self.nprobe}
+
+    @classmethod
+    def _from_arrays(cls, arrays, meta):
+        return cls(arrays["vectors"], arrays["ids"], arrays["centroids"],
+                   arrays["offsets"], meta.get("nprobe", 16))
+
+
+_INDEX_TYPES = {cls.kind: cls for cls in (FlatIndex, IVFIndex)}
+
+
+def build_index(vectors, backend: str = "auto", nprobe: int = 16) -> FlatIndex:
+    """Build an index over L2-normalized vectors; 'auto' picks IVF for large collections."""
+    if backend not in INDEX_BACKENDS:
+        raise ValueError(f"Unknown index backend '{backend}', expected one of {INDEX_BACKENDS}")
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if backend == "ivf" or (backend == "auto" and len(vectors) >= IVF_MIN_VECTORS):
+        return IVFIndex.build(vectors, nprobe=nprobe)
+    return FlatIndex(vectors)
+
+
+def load_index(path: str) -> Optional[FlatIndex]:
+    """Memory-map an index written by save(), or None if it does not exist or is unreadable."""
+    if not os.path.exists(f"{path}.json"):
+        return None
+    try:
+        with open(f"{path}.json", encoding='utf-8') as f:
+            meta = json.load(f)
+        cls = _INDEX_TYPES[meta["kind"]]
+        arrays = {name: np.load(f"{path}.{name}.npy", mmap_mode='r') for name in cls.array_names}
+        if len(arrays["vectors"]) != meta["count"]:
+            raise ValueError("vector count does not match header")
+    except (OSError, ValueError, KeyError) as e:
+        logger.warning(f"Could not load vector index {path}: {e}")
+        return None
+    return cls._from_arrays(arrays, meta)
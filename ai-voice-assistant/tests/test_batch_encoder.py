@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Test cross-request micro-batching of encoder calls
+"""
+
+import hashlib
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.tools.batch_encoder import BatchingEncoder
+
+
+def vector(text):
+    seed = int(hashlib.md5(text.encode()).hexdigest()[:8], 16)
+    return np.random.default_rng(seed).standard_normal(4).astype(np.float32)
+
+
+class RecordingEncoder:
+    """Direct encoder that records its batches and can be told to fail."""
+
+    def __init__(self):
+        self.batches = []
+        self.fail_on = None
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def __call__(self, texts):
+        self.gate.wait(5)
+        self.batches.append(list(texts))
+        if self.fail_on is not None and self.fail_on in texts:
+            raise RuntimeError(f"cannot encode {self.fail_on}")
+        return np.stack([vector(t) for t in texts])
+
+
+def concurrent_encode(encoder, requests):
+    with ThreadPoolExecutor(max_workers=len(requests)) as pool:
+        futures = [pool.submit(encoder.encode, texts) for texts in requests]
+        return [f.exception() or f.result() for f in futures]
+
+
+def test_batched_results_match_direct_encode():
+    direct = RecordingEncoder()
+    encoder = BatchingEncoder(direct, max_wait_ms=50, max_batch_size=1000)
+    requests = [["red", "dress"], ["red", "party"], [], ["dress"], ["blue", "jeans", "blue"]]
+    direct.gate.clear()
+    # The first request occupies the worker so the others queue up into one batch
+    first = threading.Thread(target=encoder.encode, args=(["warmup"],))
+    first.start()
+    results = []
+    with ThreadPoolExecutor(max_workers=len(requests)) as pool:
+        futures = [pool.submit(encoder.encode, texts) for texts in requests]
+        direct.gate.set()
+        results = [f.result(timeout=5) for f in futures]
+    first.join()
+
+    for texts, result in zip(requests, results):
+        if texts:
+            assert np.array_equal(result, np.stack([vector(t) for t in texts]))
+        else:
+            assert result.shape == (0, 0)
+    # Every distinct text is encoded once
+    encoded = [text for batch in direct.batches for text in batch]
+    assert sorted(encoded) == sorted({"warmup", "red", "dress", "party", "blue", "jeans"})
+    assert encoder.stats()["batches"] < len(requests) + 1
+
+
+def test_zero_window_encodes_directly():
+    direct = RecordingEncoder()
+    encoder = BatchingEncoder(direct, max_wait_ms=0)
+    assert np.array_equal(encoder.encode(["a", "a"]), np.stack([vector("a"), vector("a")]))
+    assert direct.batches == [["a", "a"]]
+    assert encoder._worker is None
+
+
+def test_encoder_errors_reach_every_caller_in_the_batch():
+    direct = RecordingEncoder()
+    direct.fail_on = "boom"
+    encoder = BatchingEncoder(direct, max_wait_ms=100, max_batch_size=1000)
+    results = concurrent_encode(encoder, [["boom"], ["fine"], ["also", "fine"]])
+    failed = [r for r in results if isinstance(r, RuntimeError)]
+    # Requests batched with the failing text get its error; none are left waiting
+    assert failed and all("boom" in str(e) for e in failed)
+    assert encoder.stats()["errors"] >= 1
+
+
+def test_worker_survives_a_failing_batch():
+    direct = RecordingEncoder()
+    direct.fail_on = "boom"
+    encoder = BatchingEncoder(direct, max_wait_ms=1)
+    with pytest.raises(RuntimeError):
+        encoder.encode(["boom"])
+    assert np.array_equal(encoder.encode(["ok"]), vector("ok")[None])
+    assert encoder._worker.is_alive()
+
+
+def test_bad_encoder_output_fails_callers_not_the_worker():
+    calls = []
+
+    def wrong_shape(texts):
+        calls.append(texts)
+        if len(calls) == 1:
+            return np.zeros((len(texts) - 1, 4))
+        return np.stack([vector(t) for t in texts])
+
+    encoder = BatchingEncoder(wrong_shape, max_wait_ms=1)
+    with pytest.raises(ValueError):
+        encoder.encode(["a", "b"])
+    assert np.array_equal(encoder.encode(["c"]), vector("c")[None])
+
+
+def test_cancelled_requests_do_not_break_the_worker():
+    from concurrent.futures import Future
+
+    direct = RecordingEncoder()
+    encoder = BatchingEncoder(direct, max_wait_ms=1)
+    encoder._ensure_worker()
+    cancelled = Future()
+    cancelled.cancel()
+    encoder._queue.put((["skipped"], cancelled, 0.0))
+    assert np.array_equal(encoder.encode(["kept"]), vector("kept")[None])
+    assert ["skipped"] not in direct.batches
+    assert encoder._worker.is_alive()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Test the shared columnar catalog store
+"""
+
+import os
+import sys
+
+import numpy as np
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.tools.catalog_store import CatalogStore, get_catalog
+
+PRODUCTS = [
+    {"_id": {"$oid": "a1"}, "name": "Red Dress", "gender": "women", "colors": ["red", "pink"], "price": 999},
+    {"_id": "b2", "name": "Blue Shirt", "gender": "men", "colors": ["blue"], "price": 499, "rating": 4.5},
+    {"_id": "c3", "name": "Plain Tee", "gender": "men", "colors": []},
+]
+
+
+def test_columns_are_dictionary_encoded():
+    store = CatalogStore(PRODUCTS)
+    assert store.products[0]["_id"] == "a1"
+    gender = store.columns["gender"]
+    assert gender.values == ["women", "men"]
+    assert list(gender.codes) == [0, 1, 1]
+    assert list(store.match_mask("colors", lambda c: c.startswith("b"))) == [False, True, False]
+    assert list(store.match_mask("colors", lambda c: True)) == [True, True, False]
+
+
+def test_numeric_columns_treat_missing_as_no_match():
+    store = CatalogStore(PRODUCTS)
+    assert np.isnan(store.numeric["price"][2])
+    assert list(store.range_mask("price", "$lte", 999)) == [True, True, False]
+    assert list(store.range_mask("rating", "$gte", 4)) == [False, True, False]
+
+
+def test_catalog_is_loaded_once_from_data_file():
+    catalog = get_catalog()
+    assert catalog is get_catalog()
+    assert catalog.size > 0 and catalog.version
+    assert all(isinstance(p["_id"], str) for p in catalog.products)
+
+
+def test_final_price_is_derived_from_discount():
+    store = CatalogStore(PRODUCTS + [{"_id": "d4", "price": 1200, "discount": 300}])
+    assert store.products[3]["final_price"] == 900
+    assert store.products[0]["final_price"] == 999
+    assert "final_price" not in store.products[2]
+
+
+def test_range_index_intervals_match_comparisons():
+    store = get_catalog()
+    for field in ("price", "final_price", "rating", "stock"):
+        index = store.range_indexes[field]
+        column = store.numeric[field]
+        for bound in np.unique(np.concatenate([column[~np.isnan(column)][:20], [-1, 1e9]])):
+            for operator in ("$gte", "$gt", "$lte", "$lt"):
+                positions = index.positions(*index.interval([(operator, bound)]))
+                assert list(positions) == list(np.flatnonzero(store.range_mask(field, operator, bound)))
+
+
+def test_range_driven_plans_match_reference_filter():
+    from src.tools.direct_mongodb_query_tool import FILTER_COMPILER, direct_mongodb_query_tool
+
+    store = get_catalog()
+    filters = [
+        {"category": "Dresses", "price": {"$lte": 1000}, "rating": {"$gte": 4}},
+        {"price": {"$gte": 500, "$lt": 800}},
+        {"final_price": {"$lte": 600}, "stock": {"$gt": 0}},
+        {"gender": "women", "rating": {"$gt": 4.5}, "stock": {"$gte": 10}},
+        {"rating": {"$gte": 6}},
+    ]
+    for mongo_filter in filters:
+        expected = [p for p in store.products if direct_mongodb_query_tool._matches_filter(p, mongo_filter)]
+        assert store.query(FILTER_COMPILER.compile(mongo_filter)) == expected, mongo_filter
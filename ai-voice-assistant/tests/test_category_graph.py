@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Test that the precomputed category closure matches the original two-way mapping scan
+"""
+
+import os
+import sys
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.tools.category_graph import CategoryGraph, load_category_graph
+
+MAPPINGS = {
+    'T-Shirts': ['Formal', 'Casual', 'T-Shirts'],
+    'Shirts': ['Formal', 'Casual', 'T-Shirts'],
+    'Dresses': ['Dresses', 'Ethnic Wear', 'Casual'],
+    'Jackets': ['Jackets', 'Winterwear', 'Casual'],
+    'Pants': ['Casual', 'Formal', 'Outdoor'],
+    'Jeans': ['Casual', 'Outdoor'],
+}
+
+
+def scan_match(product_category, search_categories):
+    """The per-call matching the graph replaces."""
+    if product_category in search_categories:
+        return True
+    for search_cat in search_categories:
+        if product_category in MAPPINGS.get(search_cat, ()):
+            return True
+    return any(search_cat in MAPPINGS.get(product_category, ()) for search_cat in search_categories)
+
+
+def test_graph_agrees_with_mapping_scan():
+    graph = CategoryGraph(MAPPINGS)
+    categories = sorted(set(MAPPINGS) | {c for related in MAPPINGS.values() for c in related} | {'Hoodies'})
+    for product_category in categories:
+        for search in [[c] for c in categories] + [['Jeans', 'Dresses'], ['Hoodies', 'Shirts'], []]:
+            assert graph.matches(product_category, search) == scan_match(product_category, search)
+            assert (product_category in graph.related(search)) == scan_match(product_category, search)
+
+
+def test_relationships_load_from_config():
+    graph = load_category_graph()
+    assert graph.related(['Jeans']) == {'Jeans', 'Casual', 'Outdoor'}
+    assert graph.related(['Unknown']) == {'Unknown'}
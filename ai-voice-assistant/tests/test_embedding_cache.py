@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Test the LRU token embedding cache in front of the intent encoder
+"""
+
+import hashlib
+import os
+import sys
+import threading
+
+import numpy as np
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.tools.embedding_cache import EmbeddingCache
+from src.tools.phrase_matcher import tokenize
+
+
+class FakeEncoder:
+    """Deterministic per-text vectors; records every batch it is asked to encode."""
+
+    def __init__(self):
+        self.batches = []
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def vector(text):
+        seed = int(hashlib.md5(text.encode()).hexdigest()[:8], 16)
+        return np.random.default_rng(seed).standard_normal(8).astype(np.float32)
+
+    def __call__(self, texts):
+        with self._lock:
+            self.batches.append(list(texts))
+        return np.stack([self.vector(t) for t in texts])
+
+
+def test_cached_vectors_match_uncached_encode():
+    encoder = FakeEncoder()
+    cache = EmbeddingCache(encoder, max_size=100)
+    texts = ["red", "dress", "red", "party"]
+    first = cache.encode(texts)
+    second = cache.encode(texts)
+    expected = np.stack([FakeEncoder.vector(t) for t in texts])
+    assert np.array_equal(first, expected)
+    assert np.array_equal(second, expected)
+    # Misses go to the encoder once, deduplicated, in one batch
+    assert encoder.batches == [["red", "dress", "party"]]
+
+
+def test_lru_eviction_order_and_counters():
+    encoder = FakeEncoder()
+    cache = EmbeddingCache(encoder, max_size=2)
+    cache.encode(["a", "b"])
+    cache.encode(["a"])
+    cache.encode(["c"])
+    assert list(cache._entries) == ["a", "c"]
+    cache.encode(["b"])
+    assert list(cache._entries) == ["c", "b"]
+    assert encoder.batches == [["a", "b"], ["c"], ["b"]]
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"], stats["size"]) == (1, 4, 2, 2)
+    assert stats["hit_rate"] == 1 / 5
+
+
+def test_keys_are_the_normalized_tokens():
+    encoder = FakeEncoder()
+    cache = EmbeddingCache(encoder)
+    # The cache is keyed on exact text; the intent tool feeds it tokenize() output
+    cache.encode(tokenize("Red RED red!"))
+    assert list(cache._entries) == ["red"]
+    assert cache.stats()["hits"] == 0 and cache.stats()["misses"] == 3
+    assert encoder.batches == [["red"]]
+    cache.encode(["Red"])
+    assert encoder.batches[-1] == ["Red"]
+
+
+def test_empty_input():
+    cache = EmbeddingCache(FakeEncoder())
+    assert cache.encode([]).shape == (0, 0)
+
+
+def test_concurrent_encodes_stay_consistent():
+    encoder = FakeEncoder()
+    cache = EmbeddingCache(encoder, max_size=50)
+    vocabulary = [f"token{i}" for i in range(80)]
+    errors = []
+
+    def worker(seed):
+        rng = np.random.default_rng(seed)
+        for _ in range(200):
+            texts = list(rng.choice(vocabulary, size=5))
+            got = cache.encode(texts)
+            if not np.array_equal(got, np.stack([FakeEncoder.vector(t) for t in texts])):
+                errors.append(texts)
+
+    threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors
+    stats = cache.stats()
+    assert stats["hits"] + stats["misses"] == 8 * 200 * 5
+    assert stats["size"] <= 50
+
+
+def test_persisted_cache_is_reused_only_for_the_same_model(tmp_path):
+    path = str(tmp_path / "embeddings.npz")
+    cache = EmbeddingCache(FakeEncoder(), persist_path=path, namespace="model-a")
+    cache.encode(["red", "dress"])
+    cache.save()
+
+    encoder = FakeEncoder()
+    warm = EmbeddingCache(encoder, persist_path=path, namespace="model-a")
+    assert np.array_equal(warm.encode(["dress"]), FakeEncoder.vector("dress")[None])
+    assert encoder.batches == []
+
+    cold = EmbeddingCache(FakeEncoder(), persist_path=path, namespace="model-b")
+    assert cold.stats()["size"] == 0
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Test that compiled filter plans behave like _matches_filter and are cached
+"""
+
+import os
+import sys
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.tools.filter_compiler import FilterCompiler, canonical_filter
+from src.tools.direct_mongodb_query_tool import FILTER_COMPILER, REAL_PRODUCTS, DirectMongoDBQueryTool
+
+FILTERS = [
+    {"gender": "women", "price": {"$gte": 500, "$lte": 1500}},
+    {"category": {"$in": ["Shirts"]}, "rating": {"$gt": 4.2}},
+    {"category": "Jeans", "colors": {"$in": ["blue", "black"]}},
+    {"occasion": "casual", "sizes": {"$in": ["XXL"]}, "price": {"$lt": 1500}},
+    {"tags": {"$in": ["winter"]}, "material": {"$in": ["wool"]}},
+    {"pattern": {"$in": "solid"}},
+    {"rating": {}},
+]
+
+
+def test_compiled_plans_match_interpreted_filter():
+    tool = DirectMongoDBQueryTool()
+    scan_compiler = FilterCompiler(flexible=FILTER_COMPILER.flexible)
+    for mongo_filter in FILTERS:
+        expected = [p["_id"] for p in REAL_PRODUCTS if tool._matches_filter(p, mongo_filter)]
+        plan = scan_compiler.compile(mongo_filter)
+        assert [p["_id"] for p in REAL_PRODUCTS if plan.matches(p)] == expected, mongo_filter
+        assert [p["_id"] for p in tool._execute_query(mongo_filter)] == expected, mongo_filter
+
+
+def test_plans_are_cached_by_canonical_filter():
+    compiler = FilterCompiler(max_size=2)
+    plan = compiler.compile({"gender": "men", "price": {"$gte": 1, "$lte": 9}})
+    assert compiler.compile({"price": {"$lte": 9, "$gte": 1}, "gender": "men"}) is plan
+    assert compiler.stats()["hits"] == 1
+    compiler.compile({"gender": "women"})
+    compiler.compile({"gender": "kids"})
+    assert compiler.stats()["size"] == 2
+    assert canonical_filter({"price": 1}) != canonical_filter({"price": True})
+
+
+def test_predicates_run_cheapest_first():
+    plan = FilterCompiler().compile({"tags": {"$in": ["a", "b"]}, "price": {"$lte": 5}})
+    # The range check rejects before the membership test is ever called
+    assert plan.predicates[0]({"price": 9}) is False
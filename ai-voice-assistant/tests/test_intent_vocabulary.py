@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Test the catalog-derived intent vocabulary and its incremental embedding updates
+"""
+
+import os
+import sys
+
+import numpy as np
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.tools.intent_vocabulary import IntentVocabulary, schema_from_products
+
+
+class CountingEncoder:
+    """Deterministic fake encoder that records every text it is asked to encode."""
+
+    def __init__(self):
+        self.seen = []
+
+    def __call__(self, texts):
+        self.seen.extend(texts)
+        return np.array([[len(t), sum(map(ord, t)) % 7, 1.0] for t in texts], dtype=np.float32)
+
+
+def test_schema_from_products_collects_distinct_values_in_order():
+    products = [
+        {'gender': 'women', 'colors': ['red', 'blue'], 'tags': ['party']},
+        {'gender': 'men', 'colors': ['blue'], 'tags': [], 'category': 'Casual'},
+    ]
+    schema = schema_from_products(products, fields=('gender', 'category', 'colors', 'tags'))
+    assert schema == {
+        'gender': ['women', 'men'], 'category': ['Casual'],
+        'colors': ['red', 'blue'], 'tags': ['party'],
+    }
+
+
+def test_update_only_encodes_new_values():
+    encoder = CountingEncoder()
+    vocabulary = IntentVocabulary(encoder)
+    assert vocabulary.update({'colors': ['red', 'blue'], 'tags': ['red']}) == 2
+    first_matrix = np.array(vocabulary.layout.matrix)
+
+    assert vocabulary.update({'colors': ['red', 'blue', 'teal'], 'tags': ['red', 'linen']}) == 2
+    assert encoder.seen == ['red', 'blue', 'teal', 'linen']
+    # Existing rows are untouched; new values are appended after them
+    layout = vocabulary.layout
+    assert np.array_equal(layout.matrix[:2], first_matrix)
+    assert [layout.schema['tags'][i] for i in range(2)] == ['red', 'linen']
+    assert np.array_equal(layout.key_embeddings('tags')[0], layout.key_embeddings('colors')[0])
+
+
+def test_persisted_values_are_not_reencoded(tmp_path):
+    IntentVocabulary(CountingEncoder(), str(tmp_path), 'model-a').update({'colors': ['red']})
+
+    encoder = CountingEncoder()
+    restarted = IntentVocabulary(encoder, str(tmp_path), 'model-a')
+    assert restarted.update({'colors': ['red', 'blue']}) == 1
+    assert encoder.seen == ['blue']
+
+    other_model = CountingEncoder()
+    IntentVocabulary(other_model, str(tmp_path), 'model-b').update({'colors': ['red']})
+    assert other_model.seen == ['red']
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Test that the inverted index answers filters exactly like the catalog scan
+"""
+
+import os
+import sys
+from collections import Counter
+
+import numpy as np
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.tools.catalog_store import CatalogStore
+from src.tools.inverted_index import FACET_FIELDS, bitmap_to_positions, mask_to_bitmap, positions_to_bitmap
+from src.tools.filter_compiler import FilterCompiler
+from src.tools.direct_mongodb_query_tool import REAL_PRODUCTS, DirectMongoDBQueryTool
+
+SCHEMAS = [
+    {},
+    {"gender": ["women"]},
+    {"gender": ["men", "women"], "colors": ["blue", "black"]},
+    {"category": ["T-Shirts"]},
+    {"category": "Jeans", "sizes": ["XXL"]},
+    {"occasion": ["casual"], "max_price": 1500},
+    {"tags": ["winter", "formal"], "min_rating": 4.5},
+    {"color": "pink", "pattern": ["floral", "solid"]},
+    {"colors": ["no-such-color"]},
+]
+
+
+def test_bitmap_round_trip():
+    positions = [0, 3, 64, 99]
+    assert list(bitmap_to_positions(positions_to_bitmap(positions, 100), 100)) == positions
+    assert list(bitmap_to_positions(0, 100)) == []
+    mask = np.zeros(100, dtype=bool)
+    mask[positions] = True
+    assert mask_to_bitmap(mask) == positions_to_bitmap(positions, 100)
+
+
+def test_index_matches_full_scan():
+    tool = DirectMongoDBQueryTool()
+    for schema in SCHEMAS:
+        mongo_filter = tool._build_mongo_filter(schema)
+        expected = [p["_id"] for p in REAL_PRODUCTS if tool._matches_filter(p, mongo_filter)]
+        assert [p["_id"] for p in tool._execute_query(mongo_filter)] == expected, schema
+
+
+def test_unindexed_conditions_run_on_candidates():
+    products = [{"gender": "men", "price": 10}, {"gender": "men", "price": 50}, {"gender": "women"}]
+    store = CatalogStore(products)
+    compiler = FilterCompiler(indexed_fields=store.index.fields, range_fields=("price",))
+    plan = compiler.compile({"gender": "men", "price": {"$lte": 20}, "stock": {"$gt": 0}})
+    assert plan.index_terms == (("gender", frozenset({"men"})),)
+    assert plan.range_terms == (("price", "$lte", 20),)
+    assert store.index.bitmap(plan.index_terms) == 0b011
+    assert store.query(plan) == []
+    assert store.query(compiler.compile({"price": {"$lte": 20}})) == store.products[:1]
+
+
+def test_facet_counts_match_full_scan():
+    tool = DirectMongoDBQueryTool()
+    store = CatalogStore(REAL_PRODUCTS)
+    for schema in SCHEMAS:
+        positions = tool._execute_query_positions(tool._build_mongo_filter(schema))
+        facets = store.index.facet_counts(positions_to_bitmap(positions, store.size))
+        assert list(facets) == list(FACET_FIELDS)
+        for field in FACET_FIELDS:
+            expected = Counter()
+            for i in positions.tolist():
+                value = store.products[i].get(field)
+                expected.update(set(value) if isinstance(value, list) else {value} - {None})
+            assert facets[field] == dict(expected), (schema, field)
+            counts = list(facets[field].values())
+            assert counts == sorted(counts, reverse=True)
+
+
+def test_facet_counts_limit_keeps_most_frequent():
+    products = [{"colors": ["red", "blue"]}, {"colors": ["red"]}, {"colors": ["green", "red"]}, {"colors": "blue"}]
+    store = CatalogStore(products)
+    assert store.facet_counts(np.ones(4, dtype=bool), fields=("colors",), limit=2) == {"colors": {"red": 3, "blue": 2}}
+    assert store.facet_counts(np.array([2, 3]), fields=("colors",), limit=0) == {
+        "colors": {"blue": 1, "green": 1, "red": 1}
+    }
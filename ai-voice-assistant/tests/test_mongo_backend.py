@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Test the MongoDB product backend against mongomock (or a local mongod via
+MONGO_TEST_URI)
+"""
+
+import json
+import os
+import sys
+
+import pytest
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+pytest.importorskip("pymongo")
+
+from src.tools.mongo_backend import PRODUCT_INDEXES, MongoProductBackend, translate_filter
+
+SCHEMAS = [
+    {"gender": ["women"], "category": ["Dresses"], "colors": ["red", "pink"]},
+    {"gender": ["men"], "occasion": ["office", "business"], "max_price": 2000},
+    {"category": "T-Shirts", "min_rating": 4.0},
+    {"colors": "blue", "sizes": ["M"]},
+    {"max_final_price": 800, "in_stock": True},
+    {"type": ["topwear"], "price": {"min": 500, "max": 1500}},
+]
+
+
+@pytest.fixture(scope="module")
+def backend():
+    from src.tools.direct_mongodb_query_tool import CATALOG, CATEGORY_GRAPH
+
+    uri = os.getenv("MONGO_TEST_URI")
+    if uri:
+        backend = MongoProductBackend(uri=uri, database="ecommerce_test",
+                                      flexible={"category": CATEGORY_GRAPH.related})
+    else:
+        mongomock_motor = pytest.importorskip("mongomock_motor")
+        backend = MongoProductBackend(client=mongomock_motor.AsyncMongoMockClient(),
+                                      flexible={"category": CATEGORY_GRAPH.related})
+    raw = [{k: v for k, v in p.items() if k != "final_price"} for p in CATALOG.products]
+    backend.run(backend.load_products(raw))
+    yield backend
+    backend.run(backend.close())
+
+
+def test_translated_filter_expands_categories_and_final_price():
+    query = translate_filter(
+        {"category": "Shirts", "final_price": {"$lte": 500}, "colors": {"$in": ["red"]}, "tags": {"$regex": "x"}},
+        flexible={"category": lambda values: {"Shirts", "T-Shirts"}},
+    )
+    assert query["category"] == {"$in": ["Shirts", "T-Shirts"]}
+    assert query["colors"] == {"$in": ["red"]}
+    assert query["tags"] == {"$ne": None}
+    assert query["price"] == {"$ne": None}
+    assert "$expr" in query
+
+
+def test_backend_matches_in_memory_catalog(backend):
+    from src.tools.direct_mongodb_query_tool import direct_mongodb_query_tool as tool
+
+    assert len(backend.run(backend.collection.index_information())) >= len(PRODUCT_INDEXES)
+    for schema in SCHEMAS:
+        mongo_filter = tool._build_mongo_filter(schema)
+        expected = sorted(p["_id"] for p in tool._execute_query(mongo_filter))
+        documents = backend.run(backend.find(mongo_filter, ("name", "price")))
+        assert sorted(d["_id"] for d in documents) == expected, schema
+        assert all(set(d) <= {"_id", "name", "price"} for d in documents)
+
+
+def test_limit_is_pushed_down_and_latency_recorded(backend):
+    documents = backend.run(backend.find({"gender": "women"}, ("name",), limit=3))
+    assert len(documents) == 3
+    stats = backend.stats()
+    assert stats["queries"] >= 1 and stats["errors"] == 0
+    assert stats["latency_ms_max"] >= stats["latency_ms_p50"] > 0
+
+
+def test_facet_counts_match_in_memory_catalog(backend):
+    from src.tools.direct_mongodb_query_tool import CATALOG, direct_mongodb_query_tool as tool
+
+    for schema in SCHEMAS:
+        mongo_filter = tool._build_mongo_filter(schema)
+        expected = CATALOG.facet_counts(tool._execute_query_positions(mongo_filter), limit=0)
+        assert backend.run(backend.facet_counts(mongo_filter)) == expected, schema
+
+
+def test_tool_sees_writes_made_outside_this_process(backend, monkeypatch):
+    from src.tools import direct_mongodb_query_tool as module
+
+    monkeypatch.setattr(module, "MONGO_BACKEND", backend)
+    schema = json.dumps({"gender": ["kids"], "colors": ["purple"]})
+    before = json.loads(module.direct_mongodb_query_tool._run(schema))
+    # Another app writing to the collection directly, not through load_products
+    backend.run(backend.collection.insert_one(
+        {"_id": "external-1", "name": "Purple Raincoat", "gender": "kids", "colors": ["purple"], "price": 900}))
+    try:
+        after = json.loads(module.direct_mongodb_query_tool._run(schema))
+        assert after["count"] == before["count"] + 1
+        assert "external-1" in {p["id"] for p in after["products"]}
+    finally:
+        backend.run(backend.collection.delete_one({"_id": "external-1"}))
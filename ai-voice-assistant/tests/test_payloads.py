@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Test pre-serialized product payloads and compact tool responses
+"""
+
+import json
+import os
+import sys
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.tools.payloads import ProductPayloads, dumps, render_response, with_fields
+
+
+def test_fragments_splice_into_valid_json():
+    payloads = ProductPayloads([{"name": "Tee", "price": 299}, {"name": "Kurta ✨"}], lambda p: dict(p))
+    products = [with_fields(payloads[0], score=0.5), payloads[1]]
+    response = render_response(products, success=True, count=2)
+    assert "\n" not in response
+    assert json.loads(response) == {
+        "products": [{"name": "Tee", "price": 299, "score": 0.5}, {"name": "Kurta ✨"}],
+        "success": True,
+        "count": 2,
+    }
+    assert json.loads(render_response([])) == {"products": []}
+    assert with_fields("{}", score=1) == dumps({"score": 1})
+
+
+def test_debug_responses_are_indented():
+    response = render_response([dumps({"a": 1})], debug=True, mongo_filter={"gender": "men"})
+    assert response.startswith("{\n")
+    assert json.loads(response) == {"products": [{"a": 1}], "mongo_filter": {"gender": "men"}}
+
+
+def test_direct_query_debug_fields_are_opt_in():
+    from src.tools.direct_mongodb_query_tool import CATALOG, direct_mongodb_query_tool
+
+    schema = json.dumps({"gender": ["women"], "max_price": 1500})
+    compact = json.loads(direct_mongodb_query_tool._run(schema))
+    assert "mongo_filter" not in compact and "original_schema" not in compact
+    verbose = json.loads(direct_mongodb_query_tool._run(schema, debug=True))
+    assert verbose["mongo_filter"] == {"gender": "women", "price": {"$lte": 1500}}
+    assert verbose["products"] == compact["products"]
+
+    by_id = {p["_id"]: p for p in CATALOG.products}
+    for payload in compact["products"]:
+        product = by_id[payload["id"]]
+        assert payload["final_price"] == product["price"] - product.get("discount", 0)
+        assert product["gender"] == "women" and product["price"] <= 1500
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Test the lexical fast path used by the intent analyzer
+"""
+
+import os
+import sys
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.tools.phrase_matcher import PhraseIndex, tokenize
+
+SCHEMA = {
+    'category': ['Dresses', 'Ethnic Wear', 'T-Shirts'],
+    'colors': ['navy', 'blue', 'red'],
+    'occasion': ['party'],
+}
+SYNONYMS = {'colors': {'navy blue': 'navy'}}
+
+
+def test_tokenize_splits_punctuation_and_hyphens():
+    assert tokenize("Red T-Shirts, please.") == ['red', 't', 'shirts', 'please']
+
+
+def test_multi_word_phrases_win_over_single_words():
+    index = PhraseIndex(SCHEMA, SYNONYMS)
+    matches, leftover = index.match(tokenize("navy blue t-shirts"))
+    assert matches == [('colors', 'navy'), ('category', 'T-Shirts')]
+    assert leftover == []
+
+
+def test_plural_forms_and_joined_hyphenated_values_match():
+    index = PhraseIndex(SCHEMA, SYNONYMS)
+    assert index.match(['dress'])[0] == [('category', 'Dresses')]
+    assert index.match(['tshirt'])[0] == [('category', 'T-Shirts')]
+    assert index.match(['ethnic', 'wear'])[0] == [('category', 'Ethnic Wear')]
+
+
+def test_stopwords_are_skipped_and_unknown_words_left_for_embeddings():
+    index = PhraseIndex(SCHEMA, SYNONYMS)
+    matches, leftover = index.match(tokenize("I want something special for the party"))
+    assert matches == [('occasion', 'party')]
+    assert leftover == ['special']
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Test relevance-ranked top-k retrieval
+"""
+
+import json
+import os
+import sys
+
+import numpy as np
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.tools import ranking
+from src.tools.catalog_store import CatalogStore, get_catalog
+from src.tools.ranking import TopK, rank, static_scores
+
+
+def full_sort(catalog, candidates, attributes, k):
+    """Reference: score every candidate and sort (score desc, position asc)."""
+    scores = static_scores(catalog)
+    for mask, similarity in attributes:
+        scores = scores + ranking.ATTRIBUTE_WEIGHT * similarity * mask
+    positions = np.flatnonzero(candidates)
+    ordered = sorted(positions.tolist(), key=lambda p: (-scores[p], p))[:k]
+    return [(p, scores[p]) for p in ordered]
+
+
+def test_top_k_keeps_best_and_breaks_ties_by_position():
+    top = TopK(3)
+    for position, score in enumerate([0.5, 0.9, 0.5, 0.1, 0.9, 0.5]):
+        top.push(score, position)
+    assert top.results() == [(1, 0.9), (4, 0.9), (0, 0.5)]
+
+
+def test_rank_matches_full_sort():
+    catalog = get_catalog()
+    rng = np.random.default_rng(0)
+    red = catalog.match_mask("colors", lambda c: c == "red")
+    cotton = catalog.match_mask("tags", lambda t: t == "cotton")
+    for k in (1, 5, 10, catalog.size):
+        for attributes in ([], [(red, 0.7)], [(red, 1.0), (cotton, 0.6)]):
+            candidates = rng.random(catalog.size) < 0.6
+            expected = full_sort(catalog, candidates, attributes, k)
+            found = rank(catalog, candidates, attributes, k)
+            assert [p for p, _ in found] == [p for p, _ in expected]
+            assert np.allclose([s for _, s in found], [s for _, s in expected])
+
+
+def test_rank_stops_early(monkeypatch):
+    products = [{"_id": str(i), "rating": 5.0 - i / 1000, "stock": 1} for i in range(5000)]
+    store = CatalogStore(products)
+    monkeypatch.setattr(ranking, "BLOCK_SIZE", 100)
+    visited = []
+
+    class Spy(np.ndarray):
+        def __getitem__(self, item):
+            if isinstance(item, np.ndarray) and item.dtype != bool:
+                visited.append(len(item))
+            return super().__getitem__(item)
+
+    candidates = np.ones(store.size, dtype=bool).view(Spy)
+    found = rank(store, candidates, [], 10)
+    assert [p for p, _ in found] == list(range(10))
+    assert 0 < sum(visited) <= 200
+
+
+def test_negative_similarity_does_not_stop_ranking_early(monkeypatch):
+    products = [{"_id": str(i), "rating": 5.0 - i / 1000, "stock": 1} for i in range(5000)]
+    store = CatalogStore(products)
+    monkeypatch.setattr(ranking, "BLOCK_SIZE", 100)
+    last = np.zeros(store.size, dtype=bool)
+    last[-1] = True
+    first = np.zeros(store.size, dtype=bool)
+    first[:10] = True
+    # The lowest-rated product wins on its attribute, despite a negative one elsewhere
+    attributes = [(last, 1.0), (first, -5.0)]
+    candidates = np.ones(store.size, dtype=bool)
+    expected = full_sort(store, candidates, attributes, 10)
+    found = rank(store, candidates, attributes, 10)
+    assert found[0][0] == store.size - 1
+    assert [p for p, _ in found] == [p for p, _ in expected]
+
+
+def test_attribute_similarity_is_clamped_at_zero():
+    assert ranking.attribute_similarity({"colors": {"Red": -0.3, "blue": 0.4}}, "colors", ["red"]) == 0.0
+    assert ranking.attribute_similarity({"colors": {"red": -0.3, "blue": 0.4}}, "colors", ["red", "blue"]) == 0.4
+    assert ranking.attribute_similarity({"colors": -1.0}, "colors", ["red"]) == 0.0
+    assert ranking.attribute_similarity(None, "colors", ["red"]) == 1.0
+
+
+def test_tool_returns_ranked_top_k():
+    from src.tools.real_mcp_product_tool import real_mcp_product_search_tool
+
+    result = json.loads(real_mcp_product_search_tool._run(json.dumps({"gender": "women"}), limit=5))
+    assert result["count"] == 5
+    assert result["total_found"] >= 5
+    scores = [p["score"] for p in result["products"]]
+    assert scores == sorted(scores, reverse=True)
+
+
+def test_tool_accepts_list_valued_intent_schemas():
+    from src.tools.real_mcp_product_tool import real_mcp_product_search_tool
+
+    def search(schema, **kwargs):
+        return json.loads(real_mcp_product_search_tool._run(json.dumps(schema), limit=200, **kwargs))
+
+    # The intent analyzer emits lists; one-element lists match like scalars
+    scalar = search({"gender": "women", "color": "red"})
+    listed = search({"gender": ["Women"], "colors": ["red"]})
+    assert "error" not in listed
+    assert listed["products"] == scalar["products"]
+
+    # Several values for one key match any of them
+    red, blue = search({"gender": ["women"], "colors": ["red"]}), search({"gender": ["women"], "colors": ["blue"]})
+    either = search({"gender": ["women"], "colors": ["red", "blue"]})
+    assert {p["id"] for p in either["products"]} == {p["id"] for p in red["products"] + blue["products"]}
+
+
+def test_intent_scores_weight_the_ranking():
+    from src.tools.real_mcp_product_tool import real_mcp_product_search_tool
+
+    schema = json.dumps({"gender": ["women"], "colors": ["pink", "black"], "pattern": ["floral"]})
+    sure = json.loads(real_mcp_product_search_tool._run(schema, limit=20))
+    unsure = json.loads(real_mcp_product_search_tool._run(
+        schema, limit=20, intent_scores={"colors": {"pink": 0.3, "black": 0.3}, "pattern": {"floral": 1.0}}))
+    sure_scores = {p["id"]: p["score"] for p in sure["products"]}
+    lowered = [p["score"] < sure_scores[p["id"]] for p in unsure["products"] if p["id"] in sure_scores]
+    assert any(lowered)
+    scores = [p["score"] for p in unsure["products"]]
+    assert scores == sorted(scores, reverse=True)
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Test the LRU + TTL product search result cache
+"""
+
+import json
+import os
+import sys
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.tools.result_cache import ResultCache, normalize_schema, query_key
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_equivalent_schemas_share_a_key():
+    a = {"colors": ["Red", "pink", "red "], "gender": "Women"}
+    b = {"gender": "women", "colors": ["pink", "red"]}
+    assert query_key(normalize_schema(a)) == query_key(normalize_schema(b))
+    assert normalize_schema(a) == {"colors": ["pink", "red"], "gender": "women"}
+    assert normalize_schema({"category": "Dresses"}, lowercase=False) == {"category": "Dresses"}
+    assert query_key(normalize_schema({"max_price": 1000})) != query_key(normalize_schema({"max_price": 1001}))
+
+
+def test_lru_eviction_and_ttl():
+    clock = FakeClock()
+    cache = ResultCache(max_size=2, ttl_s=10, clock=clock)
+    cache.put("a", "v1", "A")
+    cache.put("b", "v1", "B")
+    assert cache.get("a", "v1") == "A"
+    cache.put("c", "v1", "C")
+    assert cache.get("b", "v1") is None
+    clock.now = 11
+    assert cache.get("a", "v1") is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"], stats["expirations"]) == (1, 2, 1, 1)
+
+
+def test_catalog_version_change_invalidates():
+    cache = ResultCache()
+    cache.put("a", "v1", "A")
+    assert cache.get("a", "v2") is None
+    cache.put("a", "v2", "A2")
+    assert cache.get("a", "v2") == "A2"
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_tools_answer_repeated_queries_from_cache():
+    from src.tools.direct_mongodb_query_tool import RESULT_CACHE, direct_mongodb_query_tool
+    from src.tools.real_mcp_product_tool import RESULT_CACHE as SEARCH_CACHE, real_mcp_product_search_tool
+
+    RESULT_CACHE.clear()
+    first = direct_mongodb_query_tool._run(json.dumps({"gender": ["women"], "colors": ["red", "pink"]}))
+    hits = RESULT_CACHE.stats()["hits"]
+    again = direct_mongodb_query_tool._run(json.dumps({"colors": ["pink", "red", "red"], "gender": ["women"]}))
+    assert again == first and RESULT_CACHE.stats()["hits"] == hits + 1
+    assert json.loads(first)["count"] > 0
+
+    SEARCH_CACHE.clear()
+    first = real_mcp_product_search_tool._run(json.dumps({"gender": "women", "color": "red"}), limit=5)
+    hits = SEARCH_CACHE.stats()["hits"]
+    again = real_mcp_product_search_tool._run(json.dumps({"color": "Red ", "gender": "Women"}), limit=5)
+    assert again == first and SEARCH_CACHE.stats()["hits"] == hits + 1
+    assert real_mcp_product_search_tool._run(json.dumps({"gender": "women"}), limit=3) != first
+
+
+def test_debug_responses_echo_their_own_input():
+    from src.tools.direct_mongodb_query_tool import direct_mongodb_query_tool
+    from src.tools.text_search_tool import ProductTextSearchTool
+
+    # Both schemas normalize to the same cache key
+    first = json.loads(direct_mongodb_query_tool._run(
+        json.dumps({"gender": ["women"], "colors": ["red", "pink"]}), debug=True))
+    second = json.loads(direct_mongodb_query_tool._run(
+        json.dumps({"colors": ["pink", "red"], "gender": ["women"]}), debug=True))
+    assert first["original_schema"]["colors"] == ["red", "pink"]
+    assert second["original_schema"]["colors"] == ["pink", "red"]
+    assert second["products"] == first["products"]
+
+    tool = ProductTextSearchTool()
+    assert json.loads(tool._run("red dress", debug=True))["query"] == "red dress"
+    assert json.loads(tool._run("dresses RED", debug=True))["query"] == "dresses RED"
+
+
+def test_direct_query_results_follow_the_cache_key():
+    from src.tools.direct_mongodb_query_tool import RESULT_CACHE, direct_mongodb_query_tool
+
+    RESULT_CACHE.clear()
+    padded = json.loads(direct_mongodb_query_tool._run(json.dumps({"gender": " women"})))
+    hits = RESULT_CACHE.stats()["hits"]
+    exact = json.loads(direct_mongodb_query_tool._run(json.dumps({"gender": "women"})))
+    # Both normalize to one key, so they must also have been answered the same way
+    assert RESULT_CACHE.stats()["hits"] == hits + 1
+    assert padded == exact and exact["count"] > 0
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Test the intent analyzer's warmup, readiness and single-matmul intent matching
+"""
+
+import hashlib
+import os
+import sys
+import threading
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.tools import schema_intent_tool
+from src.tools.embedding_cache import EmbeddingCache
+from src.tools.intent_vocabulary import IntentVocabulary
+
+SCHEMA = {
+    'gender': ['men', 'women', 'kids'],
+    'colors': ['red', 'blue', 'navy', 'green'],
+    'occasion': ['party', 'office', 'beach'],
+    'tags': ['red', 'party', 'cotton', 'denim'],
+}
+
+
+def vector(text, dim=16):
+    seed = int(hashlib.md5(text.encode()).hexdigest()[:8], 16)
+    return np.random.default_rng(seed).standard_normal(dim).astype(np.float32)
+
+
+class CountingModel:
+    """Deterministic fake sentence encoder that records every text it is asked to encode."""
+
+    def __init__(self):
+        self.seen = []
+
+    def encode(self, texts):
+        self.seen.extend(texts)
+        return np.stack([vector(t) for t in texts])
+
+
+@pytest.fixture
+def fresh_tool(tmp_path, monkeypatch):
+    """
+    Fresh warmup state with a fake model and a tmp embedding store. Returns the
+    models loaded so far and reset(store_dir), which simulates a restart.
+    """
+    models = []
+
+    def load_encoder(*args, **kwargs):
+        models.append(CountingModel())
+        return models[-1]
+
+    def reset(store_dir=str(tmp_path)):
+        monkeypatch.setattr(schema_intent_tool, "_model", None)
+        monkeypatch.setattr(schema_intent_tool, "_ready", threading.Event())
+        monkeypatch.setattr(schema_intent_tool, "_warmup_thread", None)
+        monkeypatch.setattr(schema_intent_tool, "SCHEMA_MATRIX", None)
+        monkeypatch.setattr(schema_intent_tool, "DB_EMBEDDINGS", {})
+        monkeypatch.setattr(schema_intent_tool, "VOCABULARY", IntentVocabulary(
+            lambda values: schema_intent_tool.get_model().encode(values), store_dir=store_dir, encoder_id="fake"))
+        monkeypatch.setattr(schema_intent_tool, "EMBEDDING_CACHE", EmbeddingCache(
+            lambda texts: schema_intent_tool.get_model().encode(texts)))
+
+    monkeypatch.setattr(schema_intent_tool, "load_encoder", load_encoder)
+    monkeypatch.setattr(schema_intent_tool, "CATALOG_REFRESH_S", 0)
+    reset()
+    return SimpleNamespace(models=models, reset=reset)
+
+
+def per_key_match(prompt_tokens, token_embeddings, schema, key_embeddings, similarity_threshold=0.55):
+    """Reference: one cosine similarity computation per (token, schema key)."""
+    intent_json = {}
+    for i in range(len(prompt_tokens)):
+        token = token_embeddings[i] / np.linalg.norm(token_embeddings[i])
+        for key, values in schema.items():
+            embeddings = key_embeddings[key]
+            similarities = embeddings @ token / np.linalg.norm(embeddings, axis=1)
+            best = int(np.argmax(similarities))
+            if similarities[best] >= similarity_threshold:
+                intent_json.setdefault(key, set()).add(values[best])
+    return intent_json
+
+
+def test_first_analyze_warms_the_tool(fresh_tool):
+    assert not schema_intent_tool.is_ready()
+    # Phrase matches are answered without loading anything
+    intent, scores = schema_intent_tool.intent_analyzer_tool.analyze("red dress for women")
+    assert intent["gender"] == ["women"] and scores["gender"] == {"women": 1.0}
+    assert not schema_intent_tool.is_ready() and not fresh_tool.models
+
+    # Leftover tokens need the model, so the first such call loads it
+    schema_intent_tool.intent_analyzer_tool.analyze("something sparkly")
+    assert schema_intent_tool.is_ready()
+    assert len(fresh_tool.models) == 1
+    assert schema_intent_tool.SCHEMA_MATRIX is not None
+    schema_intent_tool.intent_analyzer_tool.analyze("another sparkly outfit")
+    assert len(fresh_tool.models) == 1
+
+
+def test_background_warmup_sets_ready(fresh_tool):
+    thread = schema_intent_tool.start_warmup()
+    thread.join(timeout=10)
+    assert schema_intent_tool.is_ready()
+    assert schema_intent_tool.start_warmup() is thread
+    schema_intent_tool.ensure_ready()
+    assert len(fresh_tool.models) == 1
+
+
+def test_schema_embeddings_are_loaded_from_disk(fresh_tool, tmp_path):
+    schema_intent_tool.ensure_ready()
+    encoded = set(fresh_tool.models[0].seen)
+    assert encoded and encoded <= {str(v) for values in schema_intent_tool.DB_SCHEMA.values() for v in values}
+    matrix = np.array(schema_intent_tool.SCHEMA_MATRIX)
+
+    # A restart with the same store reuses the persisted value embeddings
+    fresh_tool.reset(str(tmp_path))
+    schema_intent_tool.ensure_ready()
+    assert fresh_tool.models[1].seen == []
+    assert np.array_equal(schema_intent_tool.SCHEMA_MATRIX, matrix)
+
+
+def test_match_intent_matches_per_key_loop():
+    vocabulary = IntentVocabulary(lambda values: np.stack([vector(v) for v in values]))
+    vocabulary.update(SCHEMA)
+    layout = vocabulary.layout
+    key_embeddings = {key: layout.key_embeddings(key) for key in layout.keys}
+
+    rng = np.random.default_rng(0)
+    tokens = ["red", "party", "navy", "women", "xyz", "cotton", "blue"]
+    # Noisy copies of value embeddings, so some tokens clear the threshold and some don't
+    embeddings = np.stack([vector(t) + rng.normal(0, 0.6 if i % 2 else 0.2, 16) for i, t in enumerate(tokens)])
+    scores = {}
+    matched = schema_intent_tool.match_intent(tokens, embeddings, layout=layout, scores=scores)
+    expected = per_key_match(tokens, embeddings, SCHEMA, key_embeddings)
+    assert expected
+    assert {key: set(values) for key, values in matched.items()} == expected
+    assert {key: set(by_value) for key, by_value in scores.items()} == expected
+    assert all(0.55 <= score <= 1.0 + 1e-6 for by_value in scores.values() for score in by_value.values())
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Test encoder backend selection and ONNX / PyTorch encoder parity
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.tools import text_encoders
+from src.tools.text_encoders import encoder_id, resolve_backend
+
+QUERIES = [
+    "red dress for a party",
+    "men's formal shirts for office",
+    "blue denim jeans for college",
+    "warm black hoodie for winter",
+    "floral summer dress for the beach",
+    "kids ethnic wear for a wedding",
+]
+
+
+def test_onnx_falls_back_to_torch_when_dependencies_are_missing(monkeypatch):
+    monkeypatch.setattr(text_encoders, "onnx_unavailable_reason", lambda: "onnxruntime not installed")
+    assert resolve_backend("onnx") == "torch"
+    monkeypatch.setattr(text_encoders, "onnx_unavailable_reason", lambda: None)
+    assert resolve_backend("onnx") == "onnx"
+    assert resolve_backend("torch") == "torch"
+    with pytest.raises(ValueError):
+        resolve_backend("tensorrt")
+
+
+def test_old_sentence_transformers_is_reported(monkeypatch):
+    monkeypatch.setattr(text_encoders.metadata, "version", lambda name: "3.1.1")
+    assert "older than 3.2" in text_encoders.onnx_unavailable_reason()
+    monkeypatch.setattr(text_encoders.metadata, "version", lambda name: "3.2.0")
+    monkeypatch.setattr(text_encoders.importlib.util, "find_spec", lambda name: object())
+    assert text_encoders.onnx_unavailable_reason() is None
+
+
+def test_encoder_id_names_the_weights():
+    assert encoder_id("m", "torch") == "m"
+    assert encoder_id("m", "onnx", "onnx/model.onnx") == "m:onnx:onnx/model.onnx"
+
+
+def test_onnx_encoder_matches_torch():
+    pytest.importorskip("onnxruntime")
+    pytest.importorskip("optimum")
+    if text_encoders.onnx_unavailable_reason():
+        pytest.skip(text_encoders.onnx_unavailable_reason())
+    from src.tools.intent_vocabulary import IntentVocabulary
+    from src.tools.phrase_matcher import tokenize
+    from src.tools.schema_intent_tool import DB_SCHEMA, MODEL_NAME, _l2_normalize, match_intent
+
+    try:
+        encoders = {backend: text_encoders.load_encoder(MODEL_NAME, backend) for backend in ("torch", "onnx")}
+    except OSError as e:
+        pytest.skip(f"model weights unavailable: {e}")
+    layouts = {}
+    for backend, model in encoders.items():
+        vocabulary = IntentVocabulary(model.encode)
+        vocabulary.update(DB_SCHEMA)
+        layouts[backend] = vocabulary.layout
+
+    for query in QUERIES:
+        tokens = tokenize(query)
+        embeddings = {backend: _l2_normalize(model.encode(tokens)) for backend, model in encoders.items()}
+        cosine = np.sum(embeddings["torch"] * embeddings["onnx"], axis=1)
+        assert cosine.min() >= 0.99, query
+        # Top-1 schema value agrees for every token that matches an intent attribute
+        similarities = {backend: embeddings[backend] @ layouts[backend].matrix.T for backend in encoders}
+        relevant = similarities["torch"].max(axis=1) >= 0.55
+        top1 = {backend: similarities[backend][relevant].argmax(axis=1) for backend in encoders}
+        assert np.array_equal(top1["torch"], top1["onnx"]), query
+        matched = {
+            backend: {k: set(v) for k, v in match_intent(tokens, embeddings[backend], layout=layouts[backend]).items()}
+            for backend in encoders
+        }
+        assert matched["torch"] == matched["onnx"], query
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Test the BM25 full-text product index and search tool
+"""
+
+import json
+import math
+import os
+import sys
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.tools.catalog_store import get_catalog
+from src.tools.text_index import TEXT_FIELDS, BM25Index, analyze, stem
+
+PRODUCTS = [
+    {"name": "Red Party Dress", "description": "A red dress for parties", "tags": ["party"], "category": "Dresses"},
+    {"name": "Blue Hoodie", "description": "Warm hoodie for hiking", "tags": ["winter"], "category": "Hoodies"},
+    {"name": "Red Hoodies Pack", "description": "Two hoodies", "tags": [], "category": "Hoodies"},
+    {"name": "White Shirt", "description": "Formal shirt for the office", "tags": ["formal"], "category": "Formal"},
+]
+
+
+def brute_force_bm25(products, query, k1=1.2, b=0.75):
+    """Reference: textbook BM25F-weighted scoring of every product."""
+    docs = []
+    for product in products:
+        tf = {}
+        for field, weight in TEXT_FIELDS.items():
+            value = product.get(field)
+            text = ' '.join(value) if isinstance(value, list) else str(value or '')
+            for term in analyze(text):
+                tf[term] = tf.get(term, 0.0) + weight
+        docs.append(tf)
+    lengths = [sum(tf.values()) for tf in docs]
+    average = sum(lengths) / len(lengths)
+    scores = {}
+    for term in set(analyze(query)):
+        df = sum(1 for tf in docs if term in tf)
+        if not df:
+            continue
+        idf = math.log(1 + (len(docs) - df + 0.5) / (df + 0.5))
+        for position, tf in enumerate(docs):
+            if term in tf:
+                f = tf[term]
+                norm = k1 * (1 - b + b * lengths[position] / average)
+                scores[position] = scores.get(position, 0.0) + idf * f * (k1 + 1) / (f + norm)
+    return scores
+
+
+def test_stem_conflates_inflections():
+    assert stem("dresses") == stem("dress")
+    assert stem("hoodies") == stem("hoodie")
+    assert stem("hiking") == stem("hike")
+    assert stem("shirts") == stem("shirt")
+    assert stem("jeans") == stem("jean")
+
+
+def test_analyze_drops_stopwords():
+    assert analyze("a red dress for the party") == [stem("red"), stem("dress"), stem("party")]
+
+
+def test_search_ranks_by_bm25():
+    index = BM25Index(PRODUCTS)
+    results = index.search("red dress", limit=4)
+    assert results[0][0] == 0
+    assert {position for position, _ in results} == {0, 2}
+
+    expected = brute_force_bm25(PRODUCTS, "red dress")
+    for position, score in results:
+        assert math.isclose(score, expected[position], rel_tol=1e-5)
+
+
+def test_search_matches_brute_force_on_catalog():
+    catalog = get_catalog()
+    index = BM25Index(catalog.products)
+    for query in ["red dress for party", "warm winter hoodies", "formal cotton shirt", "zzz"]:
+        expected = brute_force_bm25(catalog.products, query)
+        positions, scores = index.score(analyze(query))
+        assert sorted(positions.tolist()) == sorted(expected)
+        for position, score in zip(positions.tolist(), scores.tolist()):
+            assert math.isclose(score, expected[position], rel_tol=1e-4)
+
+
+def test_text_search_tool_returns_ranked_products():
+    from src.tools.text_search_tool import RESULT_CACHE, ProductTextSearchTool
+
+    RESULT_CACHE.clear()
+    tool = ProductTextSearchTool()
+    response = json.loads(tool._run("red dress for party", limit=3))
+    assert response["success"] is True
+    assert response["count"] == len(response["products"]) <= 3
+    assert response["total_found"] >= response["count"]
+    scores = [product["score"] for product in response["products"]]
+    assert scores == sorted(scores, reverse=True)
+    assert sum(response["facets"]["gender"].values()) == response["total_found"]
+    assert "facets" not in json.loads(tool._run("red dress for party", limit=3, facets=False))
+
+    # Same terms in another order and inflection are answered from the cache
+    hits = RESULT_CACHE.hits
+    assert tool._run("party dresses red", limit=3) == tool._run("red dress for party", limit=3)
+    assert RESULT_CACHE.hits == hits + 2
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Test the brute-force and IVF vector indexes used for semantic product search
+"""
+
+import os
+import sys
+
+import numpy as np
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.tools.vector_index import FlatIndex, IVFIndex, build_index, load_index, top_k
+
+
+def random_unit_vectors(n, dim=16, seed=0):
+    vectors = np.random.default_rng(seed).normal(size=(n, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def test_top_k_orders_best_first():
+    scores = np.array([0.1, 0.9, 0.5, 0.7])
+    assert list(top_k(scores, 3)) == [1, 3, 2]
+    assert list(top_k(scores, 10)) == [1, 3, 2, 0]
+
+
+def test_flat_search_finds_the_query_vector_itself():
+    vectors = random_unit_vectors(500)
+    ids, scores = FlatIndex(vectors).search(vectors[42], k=5)
+    assert ids[0] == 42
+    assert np.isclose(scores[0], 1.0)
+    assert np.all(np.diff(scores) <= 0)
+
+
+def test_ivf_with_all_lists_probed_is_exact():
+    vectors = random_unit_vectors(2000)
+    ivf = IVFIndex.build(vectors, nlist=20)
+    flat = FlatIndex(vectors)
+    for query in vectors[:20]:
+        assert list(ivf.search(query, 10, nprobe=20)[0]) == list(flat.search(query, 10)[0])
+
+
+def test_saved_index_round_trips(tmp_path):
+    vectors = random_unit_vectors(300)
+    path = str(tmp_path / "products")
+    build_index(vectors, backend="ivf").save(path)
+    loaded = load_index(path)
+    assert isinstance(loaded, IVFIndex)
+    assert loaded.search(vectors[7], 1)[0][0] == 7
+    assert load_index(str(tmp_path / "missing")) is None